@@ -0,0 +1,73 @@
+"""
+상품 100k 건의 가격/상태 변경을 row 단위 save 와 UPDATE ... FROM (VALUES ...) 로 비교
+설정된 DB 에 상품을 만들고 끝나면 삭제한다.
+
+    cd src && python -m benchmarks.bulk_update
+"""
+
+import os
+import random
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import transaction  # noqa: E402
+
+from product.models import Product, ProductStatus  # noqa: E402
+from product.service.product import product_service  # noqa: E402
+
+
+PRODUCTS = 100_000
+PER_ROW_SAMPLE = 5_000
+
+
+def main() -> None:
+    products = Product.objects.bulk_create(
+        [
+            Product(
+                name=f"benchmark {i}",
+                price=random.randint(1, 100_000),
+                status=ProductStatus.ACTIVE,
+                sku=f"benchmark-bulk-update-{i}",
+            )
+            for i in range(PRODUCTS)
+        ],
+        batch_size=10_000,
+    )
+    try:
+        sample = products[:PER_ROW_SAMPLE]
+        start = time.perf_counter()
+        with transaction.atomic():
+            for product in sample:
+                product.price += 1
+                product.save(update_fields=["price"])
+        per_row: float = (time.perf_counter() - start) / len(sample) * PRODUCTS
+
+        changes = [
+            {
+                "product_id": product.id,
+                "price": product.price + 1,
+                "status": random.choice([ProductStatus.ACTIVE, ProductStatus.PAUSED]),
+            }
+            for product in products
+        ]
+        start = time.perf_counter()
+        product_service.bulk_update(
+            changes=changes, chunk_size=settings.PRODUCT_BULK_UPDATE_CHUNK_SIZE
+        )
+        bulk: float = time.perf_counter() - start
+
+        print(f"per-row save (extrapolated from {PER_ROW_SAMPLE}): {per_row:.2f}s")
+        print(
+            f"bulk update ({PRODUCTS} rows): {bulk:.2f}s ({PRODUCTS / bulk:.0f} rows/s)"
+        )
+    finally:
+        Product.objects.filter(sku__startswith="benchmark-bulk-update-").delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+상품 목록 응답 크기별로 encoding 마다 전송 bytes 와 요청당 압축 CPU 시간을 비교한다.
+precompress 는 read model 발행 시 한 번만 드는 비용이고, 요청 시에는 압축하지 않는다.
+
+    cd src && python -m benchmarks.compression
+"""
+
+import os
+import random
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from ninja.renderers import JSONRenderer  # noqa: E402
+
+from config.compression import COMPRESSORS, compress  # noqa: E402
+from config.response import response  # noqa: E402
+
+
+SIZES = (100, 1_000, 10_000)
+REPEAT = 20
+
+
+def cpu_ms(func) -> float:
+    start: float = time.process_time()
+    for _ in range(REPEAT):
+        func()
+    return (time.process_time() - start) / REPEAT * 1000
+
+
+def main() -> None:
+    print(
+        f"{'products':>9} {'encoding':<9}{'bytes':>10}{'ratio':>8}"
+        f"{'request ms':>12}{'precompressed bytes':>21}{'precompress ms':>16}"
+    )
+    for size in SIZES:
+        payload: bytes = (
+            JSONRenderer()
+            .render(
+                None,
+                response(
+                    {
+                        "products": [
+                            {
+                                "id": i,
+                                "name": f"상품 {i} 기본 티셔츠",
+                                "price": random.randint(1, 100_000),
+                            }
+                            for i in range(1, size + 1)
+                        ]
+                    }
+                ),
+                response_status=200,
+            )
+            .encode()
+        )
+        print(f"{size:>9} {'identity':<9}{len(payload):>10}{1:>8.2f}{0:>12.2f}")
+        for encoding in COMPRESSORS:
+            dynamic: bytes = compress(payload, encoding)
+            precompressed: bytes = compress(payload, encoding, precompress=True)
+            print(
+                f"{size:>9} {encoding:<9}{len(dynamic):>10}"
+                f"{len(payload) / len(dynamic):>8.2f}"
+                f"{cpu_ms(lambda: compress(payload, encoding)):>12.2f}"
+                f"{len(precompressed):>21}"
+                f"{cpu_ms(lambda: compress(payload, encoding, precompress=True)):>16.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
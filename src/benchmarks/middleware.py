@@ -0,0 +1,110 @@
+"""
+기존 middleware stack(full)과 AdminScopedMiddleware 를 사용하는 stack(lean)의
+API 요청당 overhead 와 worker 시작 시간을 비교
+
+    cd src && python -m benchmarks.middleware
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import config.settings  # noqa: E402
+
+
+LEAN_MIDDLEWARE = config.settings.MIDDLEWARE
+
+
+def full_middleware():
+    # lean stack 과 같은 middleware 에 ADMIN_MIDDLEWARE 를 모든 요청에 적용한 stack.
+    # session 은 django 기본 순서대로 SecurityMiddleware 바로 뒤에 둔다
+    session, *admin = config.settings.ADMIN_MIDDLEWARE
+    middleware = []
+    for path in LEAN_MIDDLEWARE:
+        if path == "config.middleware.AdminScopedMiddleware":
+            middleware.extend(admin)
+            continue
+        middleware.append(path)
+        if path == "django.middleware.security.SecurityMiddleware":
+            middleware.append(session)
+    return middleware
+
+
+FULL_MIDDLEWARE = full_middleware()
+PROFILES = {"full": FULL_MIDDLEWARE, "lean": LEAN_MIDDLEWARE}
+
+REQUESTS = 5_000
+STARTUP_RUNS = 5
+
+
+def request_overhead(profile: str) -> float:
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory, override_settings
+
+    with override_settings(MIDDLEWARE=PROFILES[profile]):
+        handler = WSGIHandler()
+    environ = RequestFactory()._base_environ(
+        PATH_INFO="/", REQUEST_METHOD="GET", HTTP_HOST="localhost"
+    )
+
+    def start_response(status, headers):
+        pass
+
+    for _ in range(100):
+        handler(dict(environ), start_response)
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        handler(dict(environ), start_response)
+    return (time.perf_counter() - start) / REQUESTS
+
+
+def startup() -> None:
+    # 별도 process 에서 settings module 의 MIDDLEWARE 를 바꾼 뒤 wsgi application 을 만든다
+    config.settings.MIDDLEWARE = PROFILES[sys.argv[2]]
+    start = time.perf_counter()
+    from django.core.wsgi import get_wsgi_application
+    from django.test import RequestFactory
+
+    application = get_wsgi_application()
+    # 첫 요청에서 url conf 와 ninja router 가 import 된다
+    environ = RequestFactory()._base_environ(
+        PATH_INFO="/", REQUEST_METHOD="GET", HTTP_HOST="localhost"
+    )
+    application(environ, lambda status, headers: None)
+    print(time.perf_counter() - start)
+
+
+def startup_time(profile: str) -> float:
+    return statistics.median(
+        float(
+            subprocess.check_output(
+                [sys.executable, "-m", "benchmarks.middleware", "--startup", profile]
+            )
+        )
+        for _ in range(STARTUP_RUNS)
+    )
+
+
+def main() -> None:
+    import django
+
+    django.setup()
+    print(f"{'profile':<8}{'request (us)':>14}{'startup (ms)':>14}")
+    for profile in PROFILES:
+        print(
+            f"{profile:<8}"
+            f"{request_overhead(profile) * 1_000_000:>14.1f}"
+            f"{startup_time(profile) * 1_000:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--startup"]:
+        startup()
+    else:
+        main()
@@ -0,0 +1,159 @@
+"""
+월 단위 partition 된 order table 과 단일 table 을 같은 데이터(24개월)로 만들어서
+최근 데이터 위주의 조회와 오래된 데이터 정리 비용을 비교한다.
+별도 schema(benchmark_partition)를 만들고 끝나면 삭제한다.
+
+    cd src && python -m benchmarks.order_partitions [rows]
+"""
+
+import os
+import sys
+import time
+from datetime import date, datetime, timezone
+from typing import Callable, List
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from product.service.order_partition import add_months, month_start  # noqa: E402
+
+
+SCHEMA = "benchmark_partition"
+MONTHS = 24
+USERS = 100_000
+REPEAT = 200
+COLUMNS = """
+    id bigint NOT NULL,
+    user_id bigint NOT NULL,
+    status varchar(16) NOT NULL,
+    total_price integer NOT NULL,
+    created_at timestamp with time zone NOT NULL
+"""
+
+
+def timed(cursor, sql: str, params: List, repeat: int = REPEAT) -> float:
+    start: float = time.perf_counter()
+    for _ in range(repeat):
+        cursor.execute(sql, params)
+        cursor.fetchall()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def setup(cursor, rows: int, first_month: date) -> None:
+    start, end = month_start(first_month), month_start(add_months(first_month, MONTHS))
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    cursor.execute(f"CREATE TABLE {SCHEMA}.plain ({COLUMNS}, PRIMARY KEY (id))")
+    cursor.execute(
+        f"CREATE TABLE {SCHEMA}.partitioned ({COLUMNS}, PRIMARY KEY (id, created_at)) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    for i in range(MONTHS):
+        month: date = add_months(first_month, i)
+        cursor.execute(
+            f"CREATE TABLE {SCHEMA}.partitioned_{i} PARTITION OF {SCHEMA}.partitioned "
+            "FOR VALUES FROM (%s) TO (%s)",
+            [month_start(month), month_start(add_months(month, 1))],
+        )
+    # id 순서대로 created_at 이 증가하고, 최근 1% 만 pending
+    cursor.execute(
+        f"""
+        INSERT INTO {SCHEMA}.plain
+        SELECT g, 1 + (hashint8(g) & 2147483647) %% %s,
+               CASE WHEN g > %s * 0.99 THEN 'pending' ELSE 'paid' END,
+               1000, %s + (%s - %s) * (g::float8 / (%s + 1))
+        FROM generate_series(1, %s) g
+        """,
+        [USERS, rows, start, end, start, rows, rows],
+    )
+    cursor.execute(f"INSERT INTO {SCHEMA}.partitioned SELECT * FROM {SCHEMA}.plain")
+    for table in ("plain", "partitioned"):
+        cursor.execute(f"CREATE INDEX ON {SCHEMA}.{table} (user_id, status)")
+        cursor.execute(
+            f"CREATE INDEX ON {SCHEMA}.{table} (created_at) WHERE status = 'pending'"
+        )
+        cursor.execute(f"ANALYZE {SCHEMA}.{table}")
+
+
+def main() -> None:
+    rows: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    first_month: date = add_months(
+        datetime.now(timezone.utc).date().replace(day=1), -(MONTHS - 1)
+    )
+    last_month_start = month_start(add_months(first_month, MONTHS - 1))
+
+    with connection.cursor() as cursor:
+        start: float = time.perf_counter()
+        setup(cursor, rows=rows, first_month=first_month)
+        print(f"loaded {rows} rows in {time.perf_counter() - start:.1f}s")
+
+        recent_id: int = rows - 10
+        cursor.execute(
+            f"SELECT created_at FROM {SCHEMA}.plain WHERE id = %s", [recent_id]
+        )
+        (recent_created_at,) = cursor.fetchone()
+
+        cases: List[tuple[str, str, List]] = [
+            ("id lookup", "SELECT * FROM {table} WHERE id = %s", [recent_id]),
+            (
+                "id lookup + created_at range",
+                "SELECT * FROM {table} WHERE id = %s AND created_at >= %s",
+                [recent_id, last_month_start],
+            ),
+            (
+                "confirm UPDATE (id, created_at)",
+                "UPDATE {table} SET status = status WHERE id = %s "
+                "AND created_at = %s RETURNING id",
+                [recent_id, recent_created_at],
+            ),
+            (
+                "user orders, last month",
+                "SELECT id FROM {table} WHERE user_id = %s AND status = 'paid' "
+                "AND created_at >= %s",
+                [42, last_month_start],
+            ),
+            (
+                "expiry scan (pending, LIMIT 500)",
+                "SELECT id FROM {table} WHERE status = 'pending' AND created_at < %s "
+                "ORDER BY created_at LIMIT 500",
+                [recent_created_at],
+            ),
+        ]
+        print(f"{'query':<36}{'plain ms':>12}{'partitioned ms':>16}")
+        for name, sql, params in cases:
+            results: List[float] = [
+                timed(cursor, sql.format(table=f"{SCHEMA}.{table}"), params)
+                for table in ("plain", "partitioned")
+            ]
+            print(f"{name:<36}{results[0]:>12.3f}{results[1]:>16.3f}")
+
+        # 가장 오래된 한 달 정리: 단일 table 은 DELETE, partition 은 DETACH
+        def clean_plain() -> None:
+            cursor.execute(
+                f"DELETE FROM {SCHEMA}.plain WHERE created_at < %s",
+                [month_start(add_months(first_month, 1))],
+            )
+
+        def clean_partitioned() -> None:
+            cursor.execute(
+                f"ALTER TABLE {SCHEMA}.partitioned DETACH PARTITION {SCHEMA}.partitioned_0"
+            )
+
+        cleanups: List[tuple[str, Callable[[], None]]] = [
+            ("DELETE oldest month (plain)", clean_plain),
+            ("DETACH oldest month (partitioned)", clean_partitioned),
+        ]
+        for name, cleanup in cleanups:
+            start = time.perf_counter()
+            cleanup()
+            print(f"{name:<36}{(time.perf_counter() - start) * 1000:>12.1f} ms")
+
+        cursor.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+동시 주문 생성(thread 64 개)을 요청마다 transaction 으로 처리할 때와
+group commit writer 로 모아서 처리할 때의 처리량과 latency 를 비교한다.
+벤치마크용 사용자/상품을 만들고 끝나면 생성한 주문과 함께 삭제한다.
+
+    cd src && python -m benchmarks.order_writer [orders_per_thread]
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+from typing import Callable, List
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from product.models import Order, OrderLine, Product, ProductStatus  # noqa: E402
+from product.service.order import order_service  # noqa: E402
+from product.service.order_writer import OrderBatchWriter  # noqa: E402
+from user.models import ServiceUser  # noqa: E402
+
+
+THREADS = 64
+WRITERS = {
+    "wait 1ms": dict(max_batch_size=100, max_wait_ms=1),
+    "wait 5ms": dict(max_batch_size=100, max_wait_ms=5),
+    "wait 20ms": dict(max_batch_size=200, max_wait_ms=20),
+}
+
+
+def run(create: Callable[[], None], orders_per_thread: int) -> None:
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        local: List[float] = []
+        for _ in range(orders_per_thread):
+            start = time.perf_counter()
+            create()
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+        connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    print(
+        f"{len(latencies) / seconds:>12.0f}"
+        f"{statistics.median(latencies) * 1000:>10.2f}"
+        f"{latencies[int(len(latencies) * 0.99)] * 1000:>10.2f}"
+    )
+
+
+def main() -> None:
+    orders_per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    user, _ = ServiceUser.objects.get_or_create(
+        email="benchmark-order-writer@example.com"
+    )
+    products = [
+        Product.objects.create(
+            name=f"벤치마크 {i}", price=1000, status=ProductStatus.ACTIVE
+        )
+        for i in range(3)
+    ]
+    quantities = {product.id: 1 for product in products}
+
+    print(f"{'mode':<12}{'orders/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    try:
+        print(f"{'direct':<12}", end="")
+        run(
+            lambda: order_service.create_order(
+                user=user, products=products, product_id_to_quantity=quantities
+            ),
+            orders_per_thread,
+        )
+        for name, options in WRITERS.items():
+            writer = OrderBatchWriter(queue_size=10_000, timeout=30, **options)
+            print(f"{name:<12}", end="")
+            run(
+                lambda: writer.create_order(
+                    user=user, products=products, product_id_to_quantity=quantities
+                ),
+                orders_per_thread,
+            )
+            writer.stop()
+    finally:
+        order_ids = Order.objects.filter(user=user).values_list("id", flat=True)
+        OrderLine.objects.filter(order_id__in=order_ids).delete()
+        Order.objects.filter(user=user).delete()
+        Product.objects.filter(id__in=[product.id for product in products]).delete()
+        user.delete()
+
+
+if __name__ == "__main__":
+    main()
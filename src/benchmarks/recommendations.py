@@ -0,0 +1,97 @@
+"""
+임의의 결제 주문(상품 10k 개, 주문 200k 건)으로 co-occurrence 를 sparse matrix 와
+dict of dicts 로 누적해서 시간과 memory 를 비교하고, mmap 파일 조회 시간을 잰다. DB 는 사용하지 않는다.
+
+    cd src && python -m benchmarks.recommendations
+"""
+
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from scipy import sparse  # noqa: E402
+
+from product.service.recommendation import (  # noqa: E402
+    RecommendationState,
+    RecommendationStore,
+    co_occurrence,
+)
+
+
+PRODUCTS = 10_000
+ORDERS = 200_000
+CHUNK_SIZE = 10_000
+LOOKUPS = 100_000
+
+
+def build_sparse(orders):
+    counts = sparse.csr_matrix((PRODUCTS, PRODUCTS), dtype="int32")
+    for start in range(0, len(orders), CHUNK_SIZE):
+        counts = counts + co_occurrence(orders[start : start + CHUNK_SIZE], PRODUCTS)
+    return counts
+
+
+def build_dict(orders):
+    counts = defaultdict(lambda: defaultdict(int))
+    for products in orders:
+        for a in products:
+            for b in products:
+                if a != b:
+                    counts[a][b] += 1
+    return counts
+
+
+def measure(name, build, orders):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(orders)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<8}{seconds:>10.2f}s{peak / 2**20:>10.1f} MiB")
+    return result
+
+
+def main() -> None:
+    random.seed(0)
+    # 인기 상품에 주문이 몰리도록 가중치를 둔다
+    weights = [1 / (i + 1) for i in range(PRODUCTS)]
+    orders = [
+        sorted(set(random.choices(range(PRODUCTS), weights, k=random.randint(2, 6))))
+        for _ in range(ORDERS)
+    ]
+    orders = [products for products in orders if len(products) > 1]
+
+    print(f"{'build':<8}{'time':>11}{'peak':>14}")
+    counts = measure("sparse", build_sparse, orders)
+    measure("dict", build_dict, orders)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = RecommendationStore(
+            path=os.path.join(directory, "recommendation.bin"), check_interval=60
+        )
+        state = RecommendationState(counts=counts, watermark=datetime.now(timezone.utc))
+        start = time.perf_counter()
+        store.publish(state=state, n=20)
+        print(
+            f"publish top-20 {time.perf_counter() - start:.2f}s, "
+            f"{os.path.getsize(store.path) / 2**20:.1f} MiB"
+        )
+
+        start = time.perf_counter()
+        for i in range(LOOKUPS):
+            store.get(product_id=i % PRODUCTS, limit=10)
+        print(f"lookup {(time.perf_counter() - start) / LOOKUPS * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+상품 목록 응답(10k 건)을 JSON / MessagePack, 전체 field / sparse fieldset 으로 직렬화해서
+payload 크기와 encode, decode 시간을 비교한다. DB 는 사용하지 않는다.
+
+    cd src && python -m benchmarks.serialization
+"""
+
+import json
+import os
+import random
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+import msgpack  # noqa: E402
+from ninja.renderers import JSONRenderer  # noqa: E402
+
+from config.renderers import MessagePackRenderer  # noqa: E402
+from config.response import response  # noqa: E402
+from product.service.product import PRODUCT_FIELDS  # noqa: E402
+
+
+PRODUCTS = 10_000
+REPEAT = 20
+
+RENDERERS = {
+    "json": (JSONRenderer(), json.loads),
+    "msgpack": (MessagePackRenderer(), msgpack.unpackb),
+}
+FIELDSETS = {
+    "full": PRODUCT_FIELDS,
+    "id,price": ("id", "price"),
+}
+
+
+def main() -> None:
+    products = [
+        {"id": i, "name": f"상품 {i} 기본 티셔츠", "price": random.randint(1, 100_000)}
+        for i in range(1, PRODUCTS + 1)
+    ]
+
+    print(
+        f"{'format':<10}{'fields':<12}{'bytes':>10}{'encode ms':>12}{'decode ms':>12}"
+    )
+    for fieldset_name, fields in FIELDSETS.items():
+        data = response(
+            {"products": [{f: product[f] for f in fields} for product in products]}
+        )
+        for format_name, (renderer, decode) in RENDERERS.items():
+            payload = renderer.render(None, data, response_status=200)
+            encode_ms = (
+                timeit.timeit(
+                    lambda: renderer.render(None, data, response_status=200),
+                    number=REPEAT,
+                )
+                / REPEAT
+                * 1000
+            )
+            decode_ms = (
+                timeit.timeit(lambda: decode(payload), number=REPEAT) / REPEAT * 1000
+            )
+            print(
+                f"{format_name:<10}{fieldset_name:<12}{len(payload):>10}"
+                f"{encode_ms:>12.2f}{decode_ms:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
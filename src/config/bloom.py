@@ -0,0 +1,54 @@
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    """
+    삭제를 지원하지 않는 bloom filter. 없는 값은 항상 없다고 답하고,
+    있다고 답한 값은 error_rate 확률로 false positive 일 수 있다.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, value: str):
+        # digest 하나를 두 개의 hash 로 나눠서 k 개의 위치를 만든다(double hashing)
+        digest: bytes = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, value: str) -> bool:
+        """
+        새로 켜진 bit 가 있으면 True. 이미 있는 값(또는 false positive)은 count 에 더하지 않아서
+        같은 값을 여러 번 add 해도 saturated 가 되지 않는다
+        """
+        added: bool = False
+        with self._lock:
+            for position in self._positions(value):
+                mask: int = 1 << (position & 7)
+                if not self._bits[position >> 3] & mask:
+                    self._bits[position >> 3] |= mask
+                    added = True
+            if added:
+                self.count += 1
+        return added
+
+    def __contains__(self, value: str) -> bool:
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
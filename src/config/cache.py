@@ -0,0 +1,163 @@
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple
+
+from django.core.cache import cache
+
+from config.metrics import CACHE_REQUESTS
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    compute_seconds: float
+    expires_at: float
+
+    def should_recompute(self, beta: float) -> bool:
+        # XFetch: 만료 시점에 가까울수록, 계산이 오래 걸릴수록 확률적으로 미리 재계산
+        return (
+            time.time() - self.compute_seconds * beta * math.log(1 - random.random())
+            >= self.expires_at
+        )
+
+
+class LocalLRUCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class QueryCache:
+    """
+    process 내부 LRU(local) -> django cache(shared) 순서로 조회하는 cache-aside layer
+
+    - invalidate() 는 generation 을 올려서 이전 key 전체를 한 번에 무효화한다.
+    - 같은 key 의 재계산은 process 안에서는 lock 으로, process 사이에서는 cache.add 로 한 번만 수행한다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: int,
+        local_max_entries: int,
+        beta: float = 1.0,
+        lock_timeout: int = 5,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+        self.local = LocalLRUCache(max_entries=local_max_entries)
+        self._locks_guard = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+
+    @property
+    def generation_key(self) -> str:
+        return f"{self.name}:generation"
+
+    def generation(self) -> int:
+        if (generation := cache.get(self.generation_key)) is None:
+            cache.add(self.generation_key, 1, timeout=None)
+            generation = cache.get(self.generation_key, 1)
+        return generation
+
+    def invalidate(self) -> None:
+        try:
+            cache.incr(self.generation_key)
+        except ValueError:
+            cache.add(self.generation_key, 2, timeout=None)
+
+    def make_key(self, params: Dict[str, Any]) -> str:
+        normalized: str = json.dumps(params, sort_keys=True, separators=(",", ":"))
+        digest: str = hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+        return f"{self.name}:{self.generation()}:{digest}"
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            if len(self._locks) > self.local.max_entries:
+                self._locks = {k: v for k, v in self._locks.items() if v.locked()}
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _get_entry(self, key: str) -> CacheEntry | None:
+        if entry := self.local.get(key):
+            return entry
+        if entry := cache.get(key):
+            entry = CacheEntry(*entry)
+            self.local.set(key, entry)
+        return entry
+
+    def _compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        start: float = time.time()
+        value = compute()
+        now: float = time.time()
+        entry = CacheEntry(
+            value=value, compute_seconds=now - start, expires_at=now + self.timeout
+        )
+        cache.set(key, tuple(entry), timeout=self.timeout)
+        self.local.set(key, entry)
+        return value
+
+    def get_or_set(self, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        key: str = self.make_key(params)
+        entry: CacheEntry | None = self._get_entry(key)
+        if entry and not entry.should_recompute(beta=self.beta):
+            CACHE_REQUESTS.labels(cache=self.name, result="hit").inc()
+            return entry.value
+
+        CACHE_REQUESTS.labels(cache=self.name, result="miss").inc()
+        lock: threading.Lock = self._lock_for(key)
+        if entry:
+            # 아직 만료 전이면 다른 요청이 재계산하는 동안 기존 값을 그대로 응답
+            if not lock.acquire(blocking=False):
+                return entry.value
+        else:
+            lock.acquire()
+
+        try:
+            if not entry and (entry := self._get_entry(key)):
+                # lock 을 기다리는 동안 다른 thread 가 채워 넣은 경우
+                return entry.value
+
+            lock_key: str = f"{key}:lock"
+            if not (acquired := cache.add(lock_key, 1, timeout=self.lock_timeout)):
+                if entry:
+                    return entry.value
+                # 다른 process 가 계산 중이면 잠시 기다렸다가 결과를 사용
+                deadline: float = time.time() + self.lock_timeout
+                while time.time() < deadline:
+                    time.sleep(0.01)
+                    if entry := self._get_entry(key):
+                        return entry.value
+            try:
+                return self._compute(key=key, compute=compute)
+            finally:
+                if acquired:
+                    cache.delete(lock_key)
+        finally:
+            lock.release()
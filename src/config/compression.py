@@ -0,0 +1,91 @@
+import gzip
+from typing import Callable, Dict, List, Tuple
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+Compressor = Callable[[bytes, bool], bytes]
+
+
+def _gzip(data: bytes, precompress: bool) -> bytes:
+    # mtime 을 고정해야 같은 payload 가 항상 같은 bytes(ETag)로 압축된다
+    return gzip.compress(data, compresslevel=9 if precompress else 6, mtime=0)
+
+
+def _brotli(data: bytes, precompress: bool) -> bytes:
+    return brotli.compress(data, quality=11 if precompress else 4)
+
+
+def _zstd(data: bytes, precompress: bool) -> bytes:
+    return zstandard.ZstdCompressor(level=19 if precompress else 3).compress(data)
+
+
+# 서버가 선호하는 순서. 설치되지 않은 library 의 encoding 은 제외한다.
+COMPRESSORS: Dict[str, Compressor] = {
+    **({"zstd": _zstd} if zstandard else {}),
+    **({"br": _brotli} if brotli else {}),
+    "gzip": _gzip,
+}
+
+
+def parse_quality_values(header: str) -> Dict[str, float]:
+    """
+    Accept, Accept-Encoding 처럼 q 값을 가진 header 를 {값: q} 로 읽는다
+    """
+    encodings: Dict[str, float] = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        quality: float = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[coding.lower()] = quality
+    return encodings
+
+
+def choose_encoding(header: str, available: List[str] | None = None) -> str | None:
+    """
+    Accept-Encoding 에서 q 값이 가장 높은 encoding 을 고르고, 같으면 COMPRESSORS 순서를 따른다.
+    """
+    accepted: Dict[str, float] = parse_quality_values(header)
+    wildcard: float = accepted.get("*", 0.0)
+    candidates: List[Tuple[float, int, str]] = [
+        (quality, -order, encoding)
+        for order, encoding in enumerate(available or COMPRESSORS)
+        if (quality := accepted.get(encoding, wildcard)) > 0
+    ]
+    if not candidates:
+        return None
+    return max(candidates)[2]
+
+
+def compress(data: bytes, encoding: str, precompress: bool = False) -> bytes:
+    return COMPRESSORS[encoding](data, precompress)
+
+
+def precompress(data: bytes) -> Dict[str, bytes]:
+    """
+    cache 에 저장할 payload 를 최고 압축률로 미리 압축한다.
+    압축해도 크기가 줄지 않는 작은 payload 는 원본만 사용한다.
+    """
+    if len(data) < settings.COMPRESSION_MIN_SIZE:
+        return {}
+    return {
+        encoding: compress(data, encoding, precompress=True) for encoding in COMPRESSORS
+    }
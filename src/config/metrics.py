@@ -0,0 +1,99 @@
+import os
+import time
+from typing import Any, Callable
+
+from django.http import HttpRequest, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+# gunicorn 등 multi worker 환경에서는 PROMETHEUS_MULTIPROC_DIR 를 지정해야
+# worker 별 값이 파일로 기록되고 /metrics 에서 합산된다.
+MULTIPROCESS_ENABLED: bool = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed",
+    multiprocess_mode="livesum",
+)
+RESPONSES = Counter(
+    "http_responses",
+    "HTTP responses by route and status code",
+    ["method", "route", "status"],
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Database query execution time",
+    ["alias"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Cache lookups by cache name and result(hit | miss)",
+    ["cache", "result"],
+)
+RATE_LIMITED = Counter(
+    "rate_limited_requests",
+    "Requests rejected by the rate limiter",
+    ["scope"],
+)
+ORDER_CONFIRM_CONFLICTS = Counter(
+    "order_confirm_conflicts",
+    "Order confirmations rejected by points or version conflicts",
+    ["version", "reason"],
+)
+
+
+def registry() -> CollectorRegistry:
+    if not MULTIPROCESS_ENABLED:
+        return REGISTRY
+
+    # worker 별 파일을 읽어서 합산하므로 매 요청마다 새로운 registry 를 사용
+    multiprocess_registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(multiprocess_registry)
+    return multiprocess_registry
+
+
+def metrics_response() -> HttpResponse:
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+def resolve_route(request: HttpRequest) -> str:
+    # path 대신 url pattern 을 label 로 사용해서 cardinality 를 제한
+    if not (resolver_match := getattr(request, "resolver_match", None)):
+        return UNMATCHED_ROUTE
+    return resolver_match.route or UNMATCHED_ROUTE
+
+
+def db_query_timer(
+    alias: str,
+    slow_threshold: float = 0.0,
+    on_slow: Callable[[str, Any, float], None] | None = None,
+):
+    def wrapper(execute, sql, params, many, context):
+        start: float = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed: float = time.perf_counter() - start
+            DB_QUERY_LATENCY.labels(alias=alias).observe(elapsed)
+            # executemany 는 query 하나의 시간이 아니므로 느린 query 로 기록하지 않는다
+            if on_slow and not many and elapsed >= slow_threshold:
+                on_slow(sql, params, elapsed)
+
+    return wrapper
@@ -0,0 +1,148 @@
+import re
+import time
+
+from django.conf import settings
+from django.core.handlers.exception import convert_exception_to_response
+from django.db import connection
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+
+from config.compression import choose_encoding, compress
+from config.metrics import (
+    REQUEST_LATENCY,
+    REQUESTS_IN_FLIGHT,
+    RESPONSES,
+    db_query_timer,
+    resolve_route,
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.query_timer = db_query_timer(alias=connection.alias)
+        self.slow_query_log = (
+            import_string(settings.SLOW_QUERY_LOG) if settings.SLOW_QUERY_LOG else None
+        )
+
+    def _query_timer(self, request):
+        if not self.slow_query_log:
+            return self.query_timer
+
+        # route 는 url resolve 이후에 정해지므로 느린 query 가 기록될 때 읽는다
+        def on_slow(sql, params, seconds: float) -> None:
+            self.slow_query_log.record(
+                sql=sql, params=params, seconds=seconds, route=resolve_route(request)
+            )
+
+        return db_query_timer(
+            alias=connection.alias,
+            slow_threshold=self.slow_query_log.threshold,
+            on_slow=on_slow,
+        )
+
+    def __call__(self, request):
+        start: float = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            with connection.execute_wrapper(self._query_timer(request)):
+                response = self.get_response(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+
+        route: str = resolve_route(request)
+        REQUEST_LATENCY.labels(method=request.method, route=route).observe(
+            time.perf_counter() - start
+        )
+        RESPONSES.labels(
+            method=request.method, route=route, status=response.status_code
+        ).inc()
+        return response
+
+
+class CompressionMiddleware:
+    """
+    COMPRESSION_MIN_SIZE 이상인 응답을 client 가 지원하는 encoding(zstd > br > gzip)으로 압축한다.
+    이미 Content-Encoding 이 있는 응답(미리 압축해 둔 read model 등)은 그대로 둔다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        content_type: str = response.get("Content-Type", "").split(";")[0].strip()
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or content_type not in settings.COMPRESSION_CONTENT_TYPES
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if not (
+            encoding := choose_encoding(request.headers.get("Accept-Encoding", ""))
+        ):
+            return response
+
+        compressed: bytes = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # 압축된 body 는 원본과 byte 단위로 같지 않으므로 strong ETag 를 weak 로 바꾼다
+        if etag := response.get("ETag"):
+            response["ETag"] = re.sub(r"^(W/)?", "W/", etag)
+        return response
+
+
+class AdminScopedMiddleware:
+    """
+    settings.ADMIN_MIDDLEWARE 를 ADMIN_PATH_PREFIXES 로 시작하는 요청에만 적용한다.
+    stateless BearerAuth 를 사용하는 ninja API 요청은 session 조회, csrf 검사 등을 건너뛴다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_middleware = []
+        self.exception_middleware = []
+
+        # django BaseHandler.load_middleware 와 같은 순서로 middleware chain 을 구성
+        handler = convert_exception_to_response(get_response)
+        for middleware_path in reversed(settings.ADMIN_MIDDLEWARE):
+            instance = import_string(middleware_path)(handler)
+            if hasattr(instance, "process_view"):
+                self.view_middleware.insert(0, instance.process_view)
+            if hasattr(instance, "process_exception"):
+                self.exception_middleware.append(instance.process_exception)
+            handler = convert_exception_to_response(instance)
+        self.admin_handler = handler
+
+    @staticmethod
+    def is_admin_request(request) -> bool:
+        return request.path_info.startswith(settings.ADMIN_PATH_PREFIXES)
+
+    def __call__(self, request):
+        if self.is_admin_request(request):
+            return self.admin_handler(request)
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.is_admin_request(request):
+            return None
+        for process_view in self.view_middleware:
+            if response := process_view(request, view_func, view_args, view_kwargs):
+                return response
+        return None
+
+    def process_exception(self, request, exception):
+        if not self.is_admin_request(request):
+            return None
+        for process_exception in self.exception_middleware:
+            if response := process_exception(request, exception):
+                return response
+        return None
@@ -0,0 +1,53 @@
+import json
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+class Count(NamedTuple):
+    value: int
+    exact: bool
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """
+    실행하지 않고 planner 의 row 추정치(EXPLAIN 의 Plan Rows)를 반환한다.
+    ANALYZE 통계 기준이므로 최근 변경이나 복잡한 조건(full text 검색 등)에서는 오차가 크다.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        (plan,) = cursor.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def approximate_count(queryset: QuerySet, exact_threshold: int) -> Count:
+    """
+    추정치가 exact_threshold 보다 작으면 COUNT(*) 로 정확히 세고, 크면 추정치를 그대로 사용한다
+    """
+    if (estimate := estimate_count(queryset)) < exact_threshold:
+        return Count(value=queryset.count(), exact=True)
+    return Count(value=estimate, exact=False)
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    row 가 많은 table 의 admin 목록에서 page 마다 COUNT(*) 전체 scan 을 하지 않도록
+    APPROXIMATE_COUNT_EXACT_THRESHOLD 이상이면 planner 추정치로 page 수를 계산한다.
+    추정치가 실제보다 크면 마지막 page 들이 비어 보일 수 있다.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        return approximate_count(
+            self.object_list,
+            exact_threshold=settings.APPROXIMATE_COUNT_EXACT_THRESHOLD,
+        ).value
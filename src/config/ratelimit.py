@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from typing import Callable, NamedTuple, Tuple
+
+from django.conf import settings
+from django.http import HttpRequest, JsonResponse
+from django.utils.module_loading import import_string
+
+from config.metrics import RATE_LIMITED
+from config.response import error_response
+
+
+class RateLimitExceededException(Exception):
+    message = "Too Many Requests"
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+
+class Rate(NamedTuple):
+    capacity: int  # 한 번에 허용하는 최대 요청 수(burst)
+    refill_per_second: float
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate: str) -> Rate:
+    # "10/s", "100/m", "1000/h"
+    count, period = rate.split("/")
+    seconds: int = {"s": 1, "m": 60, "h": 60 * 60}[period]
+    return Rate(capacity=int(count), refill_per_second=int(count) / seconds)
+
+
+class LocalBackend:
+    """
+    worker process 안에서만 공유되는 token bucket
+    key 수가 max_keys 를 넘으면 가장 오래 사용되지 않은 bucket 부터 버린다.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+
+    def consume(self, key: str, rate: Rate) -> float:
+        now: float = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (rate.capacity, now))
+            tokens = min(
+                rate.capacity, tokens + (now - updated_at) * rate.refill_per_second
+            )
+            retry_after: float = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / rate.refill_per_second
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_per_second = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_per_second)
+
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / refill_per_second
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill_per_second * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisBackend:
+    """
+    여러 worker/host 가 공유하는 token bucket
+    refill 과 차감을 lua script 하나로 처리해서 round trip 한 번에 원자적으로 수행한다.
+    """
+
+    def __init__(self, url: str | None = None):
+        import redis
+
+        self.client = redis.Redis.from_url(url or settings.RATE_LIMIT_REDIS_URL)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def consume(self, key: str, rate: Rate) -> float:
+        return float(
+            self.script(
+                keys=[f"ratelimit:{key}"],
+                args=[rate.capacity, rate.refill_per_second],
+            )
+        )
+
+
+class RateLimiter:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def check(self, scope: str, key: str) -> None:
+        if not (rate := settings.RATE_LIMITS.get(scope)):
+            return
+
+        retry_after: float = self.backend.consume(
+            key=f"{scope}:{key}", rate=parse_rate(rate)
+        )
+        if retry_after:
+            RATE_LIMITED.labels(scope=scope).inc()
+            raise RateLimitExceededException(retry_after=retry_after)
+
+
+rate_limiter = RateLimiter(backend=import_string(settings.RATE_LIMIT_BACKEND)())
+
+
+def client_ip_key(request: HttpRequest) -> str:
+    # load balancer 뒤에서는 X-Forwarded-For 의 마지막 proxy 가 기록한 주소가 client 주소
+    if settings.RATE_LIMIT_NUM_PROXIES and (
+        forwarded_for := request.headers.get("X-Forwarded-For")
+    ):
+        addresses = [address.strip() for address in forwarded_for.split(",")]
+        return addresses[-min(settings.RATE_LIMIT_NUM_PROXIES, len(addresses))]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def rate_limit(
+    scope: str, key: Callable[[HttpRequest], str] = client_ip_key
+) -> Callable:
+    """
+    ninja operation 에 @decorate_view 로 적용한다.
+    인증(DB 조회)과 request body 처리보다 먼저 실행되므로 초과 요청은 DB 를 건드리지 않는다.
+    """
+
+    def decorator(run: Callable) -> Callable:
+        @wraps(run)
+        def wrapper(request: HttpRequest, *args, **kwargs):
+            try:
+                rate_limiter.check(scope=scope, key=key(request))
+            except RateLimitExceededException as e:
+                limited = JsonResponse(error_response(msg=e.message), status=429)
+                limited["Retry-After"] = str(max(1, round(e.retry_after)))
+                return limited
+            return run(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
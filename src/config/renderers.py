@@ -0,0 +1,77 @@
+from typing import Any, Dict
+
+import msgpack
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from ninja import NinjaAPI
+from ninja.renderers import BaseRenderer, JSONRenderer
+from ninja.responses import NinjaJSONEncoder
+
+from config.compression import parse_quality_values
+
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def accepts_msgpack(request: HttpRequest) -> bool:
+    """
+    msgpack 을 명시적으로(q > 0) 요청했고 JSON 보다 선호도가 낮지 않으면 True.
+    wildcard(*/*, application/*)만으로는 기본값인 JSON 으로 응답한다
+    """
+    accepted: Dict[str, float] = parse_quality_values(request.headers.get("Accept", ""))
+    msgpack_quality: float = max(
+        accepted.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES
+    )
+    if msgpack_quality <= 0:
+        return False
+    json_quality: float = accepted.get(
+        "application/json", accepted.get("application/*", accepted.get("*/*", 0.0))
+    )
+    return msgpack_quality >= json_quality
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    charset = None
+
+    def render(self, request: HttpRequest, data: Any, *, response_status: int) -> Any:
+        # datetime, Decimal, Enum, Schema 등은 JSON 응답과 같은 값으로 변환
+        return msgpack.packb(data, default=NinjaJSONEncoder().default)
+
+
+class ContentNegotiatingNinjaAPI(NinjaAPI):
+    """
+    Accept header 에 msgpack media type 이 있으면 MessagePack, 아니면 JSON 으로 응답
+    """
+
+    json_renderer = JSONRenderer()
+    msgpack_renderer = MessagePackRenderer()
+
+    def create_response(
+        self,
+        request: HttpRequest,
+        data: Any,
+        *,
+        status: int | None = None,
+        temporal_response: HttpResponse | None = None,
+    ) -> HttpResponse:
+        if not accepts_msgpack(request):
+            response = super().create_response(
+                request, data, status=status, temporal_response=temporal_response
+            )
+        else:
+            if temporal_response:
+                status = temporal_response.status_code
+            content = self.msgpack_renderer.render(
+                request, data, response_status=status
+            )
+            if temporal_response:
+                response = temporal_response
+                response.content = content
+                response["Content-Type"] = MessagePackRenderer.media_type
+            else:
+                response = HttpResponse(
+                    content, status=status, content_type=MessagePackRenderer.media_type
+                )
+        patch_vary_headers(response, ("Accept",))
+        return response
@@ -0,0 +1,91 @@
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum
+
+
+class CircuitOpenException(Exception):
+    message = "Circuit Open"
+
+
+class BulkheadFullException(Exception):
+    message = "Bulkhead Full"
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold 에 도달하면 recovery_timeout 동안 호출을 바로 거절하고,
+    이후 한 번의 시험 호출(half open) 결과에 따라 다시 닫거나 연다.
+    """
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures: int = 0
+        self._opened_at: float = 0.0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def before_call(self) -> None:
+        with self._lock:
+            state: CircuitState = self._current_state()
+            if state == CircuitState.OPEN:
+                raise CircuitOpenException
+            if state == CircuitState.HALF_OPEN:
+                # 시험 호출은 하나만 보내고 결과가 나올 때까지 나머지는 거절
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state != CircuitState.CLOSED
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+
+class Bulkhead:
+    """
+    동시에 외부 호출을 수행하는 worker thread 수를 제한해서,
+    느린 외부 서비스가 모든 worker 를 점유하지 못하게 한다.
+    """
+
+    def __init__(self, max_concurrency: int, acquire_timeout: float):
+        self.acquire_timeout = acquire_timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    @contextmanager
+    def slot(self):
+        if not self._semaphore.acquire(timeout=self.acquire_timeout):
+            raise BulkheadFullException
+        try:
+            yield
+        finally:
+            self._semaphore.release()
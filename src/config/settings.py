@@ -28,6 +28,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# 운영 도구용 API(X-Admin-Key header) key. 비어 있으면 admin API 를 사용할 수 없음
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")
+
 
 # Application definition
 
@@ -43,15 +46,27 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.middleware.MetricsMiddleware",
+    "config.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "config.middleware.AdminScopedMiddleware",
+]
+
+# admin 화면에만 필요한 middleware. ninja API 요청에는 적용하지 않는다.
+ADMIN_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+ADMIN_PATH_PREFIXES = ("/admin/",)
+
+# admin 의 session/auth/messages middleware 는 AdminScopedMiddleware 안에서 적용된다.
+SILENCED_SYSTEM_CHECKS = ["admin.E408", "admin.E409", "admin.E410"]
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -105,6 +120,131 @@ if os.getenv("PRINT_SQL"):
     }
 
 
+# Payment gateway
+
+PAYMENT_GATEWAY_URL = os.getenv("PAYMENT_GATEWAY_URL", "http://127.0.0.1:8081")
+
+PAYMENT_GATEWAY_SECRET_KEY = os.getenv("PAYMENT_GATEWAY_SECRET_KEY", "")
+
+PAYMENT_GATEWAY_CONNECT_TIMEOUT = 0.5
+
+PAYMENT_GATEWAY_READ_TIMEOUT = 3.0
+
+PAYMENT_GATEWAY_POOL_SIZE = 10
+
+# bulkhead: 동시에 결제 검증을 기다릴 수 있는 worker thread 수
+PAYMENT_GATEWAY_MAX_CONCURRENCY = 10
+
+PAYMENT_GATEWAY_BULKHEAD_TIMEOUT = 0.05
+
+# circuit breaker
+PAYMENT_GATEWAY_FAILURE_THRESHOLD = 5
+
+PAYMENT_GATEWAY_RECOVERY_TIMEOUT = 30.0
+
+
+# Rate limiting (token bucket)
+# 여러 worker/host 가 한도를 공유하려면 "config.ratelimit.RedisBackend" 사용
+
+RATE_LIMIT_BACKEND = "config.ratelimit.LocalBackend"
+
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://127.0.0.1:6379/0")
+
+# load balancer 등 앞단 proxy 수. 0 이면 X-Forwarded-For 를 신뢰하지 않음
+RATE_LIMIT_NUM_PROXIES = 0
+
+RATE_LIMITS = {
+    "user_login": "20/m",
+    "order": "60/m",
+}
+
+
+# Authentication
+# 짧은 access token 과 refresh token. 폐기된 jti 는 worker 별 bloom filter 로 확인
+
+ACCESS_TOKEN_LIFETIME_SECONDS = 15 * 60
+
+REFRESH_TOKEN_LIFETIME_SECONDS = 14 * 24 * 60 * 60
+
+TOKEN_REVOCATION_CAPACITY = 1_000_000
+
+TOKEN_REVOCATION_ERROR_RATE = 0.001
+
+# 다른 worker 에서 폐기한 token 이 반영되기까지의 최대 지연(초)
+TOKEN_REVOCATION_SYNC_INTERVAL = 5.0
+
+TOKEN_REVOCATION_REBUILD_INTERVAL = 60 * 60
+
+
+# Cart
+# LocalCartBackend 는 worker process 마다 cart 가 따로 있으므로 개발/단일 process 전용.
+# gunicorn 등 여러 worker/host 로 운영할 때는 "product.service.cart.RedisCartBackend" 를 사용해야 한다
+
+CART_BACKEND = os.getenv("CART_BACKEND", "product.service.cart.LocalCartBackend")
+
+CART_REDIS_URL = os.getenv("CART_REDIS_URL", "redis://127.0.0.1:6379/1")
+
+CART_TTL_SECONDS = 7 * 24 * 60 * 60
+
+CART_MAX_LINES = 50
+
+CART_MAX_QUANTITY = 99
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+if REDIS_CACHE_URL := os.getenv("REDIS_CACHE_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_CACHE_URL,
+    }
+
+PRODUCT_LIST_CACHE_TIMEOUT = 60
+
+# 상품 목록 가격 facet 구간 경계. [0, 10000), [10000, 30000), ... [100000, )
+PRODUCT_PRICE_FACET_BOUNDARIES = [10_000, 30_000, 50_000, 100_000]
+
+# worker process 별 local LRU 에 보관할 최대 listing 수
+PRODUCT_LIST_CACHE_LOCAL_MAX_ENTRIES = 1024
+
+# 상품 목록 total, admin 목록 page 수. planner 추정치가 이보다 작을 때만 COUNT(*) 로 정확히 센다
+APPROXIMATE_COUNT_EXACT_THRESHOLD = 10_000
+
+
+# Shared memory read model
+# refresh_read_models 가 만든 파일을 모든 worker 가 mmap 으로 공유. 지정하지 않으면 DB 에서 조회
+# ex) /dev/shm/ecommerce/read_model.bin
+
+READ_MODEL_PATH = os.getenv("READ_MODEL_PATH")
+
+# worker 가 새 generation 파일이 있는지 확인하는 주기(초)
+READ_MODEL_CHECK_INTERVAL = 1.0
+
+
+# Response compression
+# brotli, zstandard 가 설치되어 있으면 br, zstd 도 사용
+
+# 이보다 작은 응답은 압축 비용 대비 이득이 적으므로 그대로 응답
+COMPRESSION_MIN_SIZE = 1024
+
+COMPRESSION_CONTENT_TYPES = ("application/json", "application/msgpack")
+
+
+# Bulk product import
+
+PRODUCT_IMPORT_BATCH_SIZE = 10_000
+
+# bulk 가격/상태 변경 시 UPDATE ... FROM (VALUES ...) 한 번에 보내는 row 수
+PRODUCT_BULK_UPDATE_CHUNK_SIZE = 5_000
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -145,3 +285,119 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Transactional outbox
+
+OUTBOX_SINKS = [
+    "product.service.outbox.LoggingSink",
+    # 결제/취소 event 를 일별 판매 rollup 에 반영
+    "product.service.sales_rollup.SalesRollupSink",
+    "product.service.popularity.PopularitySink",
+]
+
+OUTBOX_RELAY_BATCH_SIZE = 500
+
+
+# Pending order expiry
+
+# 결제 확정되지 않은 주문을 취소하기까지의 시간(초)
+ORDER_PENDING_EXPIRY_SECONDS = 30 * 60
+
+ORDER_EXPIRY_BATCH_SIZE = 500
+
+# group commit: 동시에 들어온 주문 생성을 process 안의 writer thread 가 모아서 한 transaction 으로 INSERT
+ORDER_GROUP_COMMIT_ENABLED = os.getenv("ORDER_GROUP_COMMIT_ENABLED") == "1"
+
+ORDER_GROUP_COMMIT_MAX_BATCH_SIZE = 100
+
+ORDER_GROUP_COMMIT_MAX_WAIT_MS = 2.0
+
+ORDER_GROUP_COMMIT_QUEUE_SIZE = 5000
+
+# queue 대기와 batch 완료를 각각 기다리는 최대 시간(초). 넘으면 503
+ORDER_GROUP_COMMIT_TIMEOUT = 5.0
+
+
+# Points campaign
+
+# UPDATE ... FROM 한 번에 지급하는 사용자 수
+POINTS_CAMPAIGN_CHUNK_SIZE = 5_000
+
+# chunk 사이에 쉬는 시간(초). 주문 트래픽이 user row lock 을 잡을 틈을 준다
+POINTS_CAMPAIGN_CHUNK_PAUSE = 0.1
+
+# 주문 처리 중인 user row 를 오래 기다리지 않고 chunk 를 다시 시도
+POINTS_CAMPAIGN_LOCK_TIMEOUT = "2s"
+
+POINTS_CAMPAIGN_MAX_RETRIES = 5
+
+
+# Order partitioning
+# order, order_line 은 created_at 월 단위 partition. manage_order_partitions 를 주기적으로 실행
+
+ORDER_PARTITION_MONTHS_AHEAD = 3
+
+ORDER_PARTITION_RETENTION_MONTHS = 24
+
+# order id 로 created_at 범위를 추정할 때 partition 경계에 두는 여유(초)
+ORDER_PARTITION_LOOKUP_MARGIN_SECONDS = 300
+
+# partition 별 최소 order id 를 다시 읽는 주기(초)
+ORDER_PARTITION_BOUNDS_TTL = 60
+
+
+# Sales report
+
+SALES_REPORT_DEFAULT_DAYS = 30
+
+SALES_REPORT_MAX_DAYS = 366
+
+
+# Product popularity
+# 판매량을 half-life 로 감쇠한 점수. epoch 를 옮길 때는 rebuild_popularity 로 다시 계산
+
+POPULARITY_HALF_LIFE_DAYS = 7
+
+POPULARITY_EPOCH = "2024-01-01T00:00:00+00:00"
+
+# category 별로 memory 에 보관하는 인기 상품 수(sort=popular 의 limit 상한)
+POPULAR_TOP_K = 100
+
+POPULAR_TOP_K_REFRESH_INTERVAL = 60.0
+
+
+# Frequently bought together
+# build_recommendations 가 쓰고 worker 는 mmap 으로 읽는 상품별 co-occurrence top-N 파일
+
+RECOMMENDATION_PATH = os.getenv("RECOMMENDATION_PATH")
+
+RECOMMENDATION_CHECK_INTERVAL = 1.0
+
+RECOMMENDATION_TOP_N = 20
+
+# server side cursor 에서 한 번에 읽는 주문 수
+RECOMMENDATION_CHUNK_SIZE = 10_000
+
+# 만료 직전에 결제 확정을 시작해서 아직 commit 되지 않은 transaction 을 기다리는 여유(초)
+RECOMMENDATION_CUTOFF_MARGIN_SECONDS = 60
+
+
+# Slow query log
+# threshold 를 넘은 query 를 normalized SQL fingerprint 와 route 별로 slow_query 에 집계한다. None 이면 사용하지 않음
+
+SLOW_QUERY_LOG = (
+    os.getenv("SLOW_QUERY_LOG", "product.service.slow_query.slow_query_log") or None
+)
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+
+# 같은 fingerprint/route 의 EXPLAIN ANALYZE 는 이 간격(초)에 한 번만 실행
+SLOW_QUERY_EXPLAIN_INTERVAL = 5 * 60
+
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = 5_000
+
+# background thread 가 처리하지 못해 queue 가 가득 차면 기록을 버린다
+SLOW_QUERY_QUEUE_SIZE = 1_000
+
+SLOW_QUERY_FLUSH_INTERVAL = 5.0
@@ -0,0 +1,122 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, NamedTuple, Tuple
+
+
+class Snapshot(NamedTuple):
+    inode: int
+    generation: int
+    buffer: memoryview
+    index: Dict[str, Tuple[int, int]]
+
+
+class SharedReadModelStore:
+    """
+    refresher process 가 미리 직렬화한 응답(bytes)을 하나의 파일로 쓰고,
+    worker 들은 같은 파일을 mmap 으로 공유해서 읽는다.
+
+    file layout: header(magic, generation, index 길이) | index(json) | payloads
+    새 generation 은 임시 파일에 쓴 뒤 os.replace 로 교체하므로 reader 는 항상 완성된 파일만 본다.
+    교체 전에 mmap 한 worker 는 다음 확인 시점까지 이전 파일을 그대로 읽는다.
+    """
+
+    MAGIC = b"RDM1"
+    HEADER = struct.Struct("<4sQQ")
+
+    def __init__(self, path: str | None, check_interval: float):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Snapshot | None = None
+        self._checked_at: float = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def publish(self, entries: Dict[str, bytes]) -> int:
+        generation: int = self.generation() + 1
+
+        index: Dict[str, Tuple[int, int]] = {}
+        offset: int = 0
+        for key, payload in entries.items():
+            index[key] = (offset, len(payload))
+            offset += len(payload)
+        index_bytes: bytes = json.dumps(index, separators=(",", ":")).encode()
+
+        directory: str = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".read_model.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, generation, len(index_bytes)))
+                f.write(index_bytes)
+                for payload in entries.values():
+                    f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return generation
+
+    def _load(self, inode: int) -> Snapshot:
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(mapped)
+        magic, generation, index_length = self.HEADER.unpack_from(buffer)
+        if magic != self.MAGIC:
+            raise ValueError(f"invalid read model file: {self.path}")
+
+        data_start: int = self.HEADER.size + index_length
+        index: Dict[str, Tuple[int, int]] = {
+            key: (data_start + offset, length)
+            for key, (offset, length) in json.loads(
+                bytes(buffer[self.HEADER.size : data_start])
+            ).items()
+        }
+        return Snapshot(inode=inode, generation=generation, buffer=buffer, index=index)
+
+    def snapshot(self) -> Snapshot | None:
+        if not self.enabled:
+            return None
+
+        now: float = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._snapshot
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                inode: int = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                self._snapshot = None
+                return None
+            if not self._snapshot or self._snapshot.inode != inode:
+                # 이전 mmap 은 참조가 사라지면 GC 에서 해제된다
+                self._snapshot = self._load(inode=inode)
+            return self._snapshot
+
+    def generation(self) -> int:
+        try:
+            with open(self.path, "rb") as f:
+                _, generation, _ = self.HEADER.unpack(f.read(self.HEADER.size))
+        except FileNotFoundError:
+            return 0
+        return generation
+
+    def get(self, key: str) -> memoryview | None:
+        if not (snapshot := self.snapshot()):
+            return None
+        if not (location := snapshot.index.get(key)):
+            return None
+        offset, length = location
+        return snapshot.buffer[offset : offset + length]
@@ -1,12 +1,14 @@
 from django.contrib import admin
 from django.urls import path
-from ninja import NinjaAPI
+
+from config.metrics import metrics_response
+from config.renderers import ContentNegotiatingNinjaAPI
 
 from user.exceptions import NotAuthorizedException, UserNotFoundException
 from user.urls import router as user_router
 from product.urls import router as product_router
 
-base_api = NinjaAPI(title="Ecommerce", version="0.0.0")
+base_api = ContentNegotiatingNinjaAPI(title="Ecommerce", version="0.0.0")
 
 
 base_api.add_router("users", user_router)
@@ -18,6 +20,11 @@ def health_check_handler(request):
     return {"ping": "pong"}
 
 
+@base_api.get("metrics", include_in_schema=False)
+def metrics_handler(request):
+    return metrics_response()
+
+
 @base_api.exception_handler(NotAuthorizedException)
 def not_authorized_exception(request, exc):
     return base_api.create_response(
@@ -0,0 +1,9 @@
+from prometheus_client import multiprocess
+
+
+wsgi_app = "config.wsgi:application"
+
+
+def child_exit(server, worker):
+    # 종료된 worker 의 live gauge 값이 /metrics 합산에서 빠지도록 정리
+    multiprocess.mark_process_dead(worker.pid)
@@ -1 +1,31 @@
-# Register your models here.
+from django.contrib import admin
+
+from config.pagination import ApproximateCountPaginator
+from product.models import Order, Product
+
+
+# 목록 page 수는 planner 추정치로 계산하고, 필터 없는 전체 건수(show_full_result_count)는 세지 않는다
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    list_display = ("id", "name", "price", "status", "category_id")
+    list_filter = ("status",)
+    raw_id_fields = ("category",)
+    exclude = ("search_vector",)
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    list_display = (
+        "id",
+        "order_code",
+        "user_id",
+        "status",
+        "total_price",
+        "created_at",
+    )
+    list_filter = ("status",)
+    raw_id_fields = ("user",)
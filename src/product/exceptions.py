@@ -1,3 +1,7 @@
+class ProductInvalidFieldsException(Exception):
+    message = "Invalid fields"
+
+
 class OrderInvalidProductException(Exception):
     message = "Invalid product ID"
 
@@ -12,3 +16,31 @@ class OrderPaymentConfirmFailedException(Exception):
 
 class OrderAlreadyPaidException(Exception):
     message = "Order Already Paid Exception"
+
+
+class OrderNotCancellableException(Exception):
+    message = "Order Not Cancellable"
+
+
+class OrderWriterBusyException(Exception):
+    message = "Order Writer Busy"
+
+
+class CartEmptyException(Exception):
+    message = "Cart Is Empty"
+
+
+class CartFullException(Exception):
+    message = "Cart Is Full"
+
+
+class CartUnavailableProductException(Exception):
+    message = "Cart Has Unavailable Products"
+
+
+class PaymentGatewayUnavailableException(Exception):
+    message = "Payment Gateway Unavailable"
+
+
+class SalesInvalidDateRangeException(Exception):
+    message = "Invalid Date Range"
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from product.service.recommendation import (
+    recommendation_service,
+    recommendation_store,
+)
+
+
+class Command(BaseCommand):
+    help = "결제 주문의 상품 co-occurrence 로 함께 구매한 상품 추천 파일을 갱신"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="이전 state 를 무시하고 처음부터 다시 계산",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.RECOMMENDATION_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        if not recommendation_store.enabled:
+            raise CommandError("RECOMMENDATION_PATH is not configured")
+
+        start: float = time.perf_counter()
+        orders: int = recommendation_service.update(
+            chunk_size=options["chunk_size"], full=options["full"]
+        )
+        self.stdout.write(
+            f"accumulated {orders} orders in {time.perf_counter() - start:.3f}s"
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from product.service.order_expiry import OrderExpiryWorker
+
+
+class Command(BaseCommand):
+    help = "결제 확정되지 않고 오래된 pending 주문을 batch 단위로 취소"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--poll-interval", type=float, default=60.0)
+        parser.add_argument(
+            "--once", action="store_true", help="만료된 주문을 모두 취소하고 종료"
+        )
+
+    def handle(self, *args, **options):
+        worker = OrderExpiryWorker.from_settings(batch_size=options["batch_size"])
+        if not options["once"]:
+            worker.run(poll_interval=options["poll_interval"])
+            return
+
+        expired: int = 0
+        while count := worker.expire_batch():
+            expired += count
+        self.stdout.write(f"expired {expired} orders")
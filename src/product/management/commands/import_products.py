@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from product.service.product_import import (
+    ProductImportFormat,
+    ProductImportResult,
+    product_import_service,
+)
+
+
+class Command(BaseCommand):
+    help = "csv/ndjson 상품 catalog 를 COPY 로 적재해서 sku 기준으로 product 에 upsert"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=[import_format.value for import_format in ProductImportFormat],
+            default=None,
+            help="지정하지 않으면 파일 확장자로 판단",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.PRODUCT_IMPORT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        path: str = options["path"]
+        import_format = ProductImportFormat(
+            options["format"]
+            or (
+                ProductImportFormat.NDJSON
+                if path.endswith((".ndjson", ".jsonl"))
+                else ProductImportFormat.CSV
+            )
+        )
+
+        with open(path, "rb") as f:
+            result: ProductImportResult = product_import_service.import_products(
+                file=f, import_format=import_format, batch_size=options["batch_size"]
+            )
+
+        for error in result["errors"]:
+            self.stderr.write(f"row {error['row']} ({error['sku']}): {error['error']}")
+        self.stdout.write(
+            f"total {result['total']}, inserted {result['inserted']}, "
+            f"updated {result['updated']}, rejected {result['rejected']}, "
+            f"unresolved categories {result['unresolved_categories']} "
+            f"in {result['seconds']}s ({result['rows_per_second']} rows/s)"
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from product.service.order_partition import order_partition_service
+
+
+class Command(BaseCommand):
+    help = "앞으로 사용할 order partition 을 만들고 보관 기간이 지난 partition 을 분리"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=None)
+        parser.add_argument("--retention-months", type=int, default=None)
+        parser.add_argument(
+            "--detach", action="store_true", help="보관 기간이 지난 partition 분리"
+        )
+
+    def handle(self, *args, **options):
+        for name in order_partition_service.ensure_future_partitions(
+            months_ahead=options["months_ahead"]
+        ):
+            self.stdout.write(f"created {name}")
+
+        if options["detach"]:
+            for name in order_partition_service.detach_old_partitions(
+                retention_months=options["retention_months"]
+            ):
+                self.stdout.write(f"detached {name}")
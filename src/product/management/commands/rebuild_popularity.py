@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from product.service.popularity import popularity_service
+
+
+class Command(BaseCommand):
+    help = "최근 결제 주문으로 상품 popularity 점수를 다시 계산"
+
+    def add_arguments(self, parser):
+        # half-life 8 번이 지나면 가중치가 1/256 이하라 순위에 거의 영향이 없다
+        parser.add_argument(
+            "--days", type=int, default=settings.POPULARITY_HALF_LIFE_DAYS * 8
+        )
+
+    def handle(self, *args, **options):
+        popularity_service.rebuild(days=options["days"])
+        self.stdout.write(f"rebuilt popularity from last {options['days']} days")
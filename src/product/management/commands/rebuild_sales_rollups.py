@@ -0,0 +1,19 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from product.service.sales_rollup import sales_report_service
+
+
+class Command(BaseCommand):
+    help = "기간 내 일별 상품/category 판매 rollup 을 order 에서 다시 계산"
+
+    def add_arguments(self, parser):
+        parser.add_argument("start", type=date.fromisoformat)
+        parser.add_argument("end", type=date.fromisoformat)
+
+    def handle(self, *args, **options):
+        sales_report_service.rebuild(start=options["start"], end=options["end"])
+        self.stdout.write(
+            f"rebuilt sales rollups {options['start']} ~ {options['end']}"
+        )
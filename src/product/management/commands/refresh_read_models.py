@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from product.service.read_model import read_model_service, read_model_store
+
+
+class Command(BaseCommand):
+    help = "category tree 와 상품 목록 응답을 미리 직렬화해서 shared memory read model 로 발행"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="지정하면 종료하지 않고 주기적으로 다시 발행",
+        )
+
+    def handle(self, *args, **options):
+        if not read_model_store.enabled:
+            raise CommandError("READ_MODEL_PATH is not configured")
+
+        while True:
+            start: float = time.perf_counter()
+            generation: int = read_model_service.refresh()
+            self.stdout.write(
+                f"published generation {generation} "
+                f"in {time.perf_counter() - start:.3f}s"
+            )
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
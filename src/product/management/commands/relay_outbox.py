@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from product.service.outbox import OutboxRelay
+
+
+class Command(BaseCommand):
+    help = "outbox_event 를 batch 단위로 읽어 설정된 sink 로 전달"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--once", action="store_true", help="밀린 event 를 모두 전달하고 종료"
+        )
+
+    def handle(self, *args, **options):
+        relay = OutboxRelay.from_settings(batch_size=options["batch_size"])
+        if not options["once"]:
+            relay.run(poll_interval=options["poll_interval"])
+            return
+
+        relayed: int = 0
+        while count := relay.relay_batch():
+            relayed += count
+        self.stdout.write(f"relayed {relayed} events")
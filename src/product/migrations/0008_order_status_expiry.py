@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:20
+
+import product.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("product", "0007_product_sku"),
+        ("user", "0006_userpoints_userpoints_unique_user_version"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="status",
+            field=models.CharField(
+                default=product.models.OrderStatus["PENDING"], max_length=16
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["created_at"],
+                name="order_pending_created_idx",
+            ),
+        ),
+    ]
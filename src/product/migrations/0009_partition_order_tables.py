@@ -0,0 +1,150 @@
+from datetime import date, datetime, timezone
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+ORDER_TABLE_SQL = """
+ALTER TABLE "order" RENAME TO order_legacy;
+ALTER TABLE order_line RENAME TO order_line_legacy;
+-- 새 table 이 같은 index 이름을 사용하도록 기존 index 이름을 비운다
+ALTER TABLE order_legacy RENAME CONSTRAINT order_pkey TO order_legacy_pkey;
+ALTER INDEX order_pending_created_idx RENAME TO order_legacy_pending_created_idx;
+ALTER INDEX order_user_id_c70408_idx RENAME TO order_legacy_user_id_status_idx;
+ALTER INDEX order_user_id_e323497c RENAME TO order_legacy_user_id_idx;
+ALTER TABLE order_line_legacy
+    RENAME CONSTRAINT order_line_pkey TO order_line_legacy_pkey;
+ALTER INDEX order_line_order_id_b9148391 RENAME TO order_line_legacy_order_id_idx;
+ALTER INDEX order_line_product_id_e620902d
+    RENAME TO order_line_legacy_product_id_idx;
+
+CREATE TABLE "order" (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    total_price integer NOT NULL CHECK (total_price >= 0),
+    status varchar(16) NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    user_id bigint NOT NULL
+        REFERENCES service_user (id) DEFERRABLE INITIALLY DEFERRED,
+    order_code varchar(32) NOT NULL,
+    PRIMARY KEY (id, created_at),
+    CONSTRAINT unique_order_code_created_at UNIQUE (order_code, created_at)
+) PARTITION BY RANGE (created_at);
+CREATE INDEX order_user_id_c70408_idx ON "order" (user_id, status);
+CREATE INDEX order_user_id_e323497c ON "order" (user_id);
+CREATE INDEX order_pending_created_idx ON "order" (created_at)
+    WHERE status = 'pending';
+
+CREATE TABLE order_line (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    quantity integer NOT NULL CHECK (quantity >= 0),
+    price integer NOT NULL CHECK (price >= 0),
+    discount_ratio double precision NOT NULL,
+    order_id bigint NOT NULL,
+    product_id bigint NOT NULL
+        REFERENCES product (id) DEFERRABLE INITIALLY DEFERRED,
+    created_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, created_at),
+    FOREIGN KEY (order_id, created_at) REFERENCES "order" (id, created_at)
+        ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED
+) PARTITION BY RANGE (created_at);
+CREATE INDEX order_line_order_id_b9148391 ON order_line (order_id);
+CREATE INDEX order_line_product_id_e620902d ON order_line (product_id);
+"""
+
+COPY_SQL = """
+INSERT INTO "order" (id, total_price, status, created_at, user_id, order_code)
+SELECT id, total_price, status, created_at, user_id, order_code FROM order_legacy;
+INSERT INTO order_line
+    (id, quantity, price, discount_ratio, order_id, product_id, created_at)
+SELECT l.id, l.quantity, l.price, l.discount_ratio, l.order_id, l.product_id,
+       o.created_at
+FROM order_line_legacy l JOIN order_legacy o ON o.id = l.order_id;
+SELECT setval(
+    pg_get_serial_sequence('"order"', 'id'),
+    coalesce((SELECT max(id) FROM order_legacy), 0) + 1,
+    false
+);
+SELECT setval(
+    pg_get_serial_sequence('order_line', 'id'),
+    coalesce((SELECT max(id) FROM order_line_legacy), 0) + 1,
+    false
+);
+DROP TABLE order_line_legacy;
+DROP TABLE order_legacy;
+"""
+
+# 기존 데이터가 없어도 이전 달부터 PARTITION_MONTHS_AHEAD 개월 뒤까지 partition 을 만든다
+PARTITION_MONTHS_AHEAD = 3
+
+
+def add_months(month: date, months: int) -> date:
+    index: int = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_partitions(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(created_at) FROM order_legacy")
+        (oldest,) = cursor.fetchone()
+        this_month: date = datetime.now(timezone.utc).date().replace(day=1)
+        month: date = min(
+            add_months(this_month, -1), (oldest or datetime.now(timezone.utc)).date()
+        ).replace(day=1)
+        while month <= add_months(this_month, PARTITION_MONTHS_AHEAD):
+            start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+            end_month: date = add_months(month, 1)
+            end = datetime(end_month.year, end_month.month, 1, tzinfo=timezone.utc)
+            for table in ("order", "order_line"):
+                name: str = f"{table}_p{month.year:04d}_{month.month:02d}"
+                cursor.execute(
+                    f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                    "FOR VALUES FROM (%s) TO (%s)",
+                    [start, end],
+                )
+            month = end_month
+
+
+class Migration(migrations.Migration):
+    atomic = True
+
+    dependencies = [
+        ("product", "0008_order_status_expiry"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(ORDER_TABLE_SQL),
+                migrations.RunPython(create_partitions),
+                migrations.RunSQL(COPY_SQL),
+            ],
+            state_operations=[
+                migrations.RemoveConstraint(
+                    model_name="order",
+                    name="unique_order_code",
+                ),
+                migrations.AddConstraint(
+                    model_name="order",
+                    constraint=models.UniqueConstraint(
+                        fields=("order_code", "created_at"),
+                        name="unique_order_code_created_at",
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="orderline",
+                    name="order",
+                    field=models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="product.order",
+                    ),
+                ),
+                migrations.AddField(
+                    model_name="orderline",
+                    name="created_at",
+                    field=models.DateTimeField(),
+                    preserve_default=False,
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("product", "0009_partition_order_tables"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategorySalesDaily",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("quantity", models.BigIntegerField(default=0)),
+                ("revenue", models.BigIntegerField(default=0)),
+                ("order_count", models.IntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="product.category",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "category_sales_daily",
+            },
+        ),
+        migrations.CreateModel(
+            name="ProductSalesDaily",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("quantity", models.BigIntegerField(default=0)),
+                ("revenue", models.BigIntegerField(default=0)),
+                ("order_count", models.IntegerField(default=0)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="product.product",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "product_sales_daily",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="categorysalesdaily",
+            constraint=models.UniqueConstraint(
+                fields=("day", "category"),
+                name="unique_category_sales_day",
+                nulls_distinct=False,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="productsalesdaily",
+            constraint=models.UniqueConstraint(
+                fields=("day", "product"), name="unique_product_sales_day"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("product", "0010_sales_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="popularity",
+            field=models.FloatField(db_default=models.Value(0), default=0),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "status", "-popularity", "id"],
+                name="product_category_popular_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["status", "-popularity", "id"], name="product_popular_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("product", "0011_product_popularity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=16)),
+                ("route", models.CharField(max_length=255)),
+                ("sql", models.TextField()),
+                ("calls", models.BigIntegerField(default=0)),
+                ("total_ms", models.FloatField(default=0)),
+                ("max_ms", models.FloatField(default=0)),
+                ("plan", models.JSONField(null=True)),
+                ("plan_captured_at", models.DateTimeField(null=True)),
+                ("first_seen", models.DateTimeField(auto_now_add=True)),
+                ("last_seen", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "slow_query",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="slowquery",
+            constraint=models.UniqueConstraint(
+                fields=("fingerprint", "route"), name="unique_slow_query_route"
+            ),
+        ),
+    ]
@@ -18,13 +18,26 @@ class Product(models.Model):
     category = models.ForeignKey("Category", on_delete=models.SET_NULL, null=True)
     tags = models.CharField(max_length=128, blank=True)  # 검색 기준(영문)
     search_vector = SearchVectorField(null=True)
+    sku = models.CharField(max_length=64, null=True)  # 공급사 상품 코드
+    # POPULARITY_EPOCH 기준 forward decay 판매량. 모든 상품에 같은 감쇠가 적용되므로 순서만 의미가 있다
+    popularity = models.FloatField(default=0, db_default=0)
 
     class Meta:
         app_label = "product"
         db_table = "product"
+        constraints = [
+            models.UniqueConstraint(fields=["sku"], name="unique_product_sku"),
+        ]
         indexes = [
             models.Index(fields=["status", "price"]),
             GinIndex(fields=["search_vector"]),
+            models.Index(
+                fields=["category", "status", "-popularity", "id"],
+                name="product_category_popular_idx",
+            ),
+            models.Index(
+                fields=["status", "-popularity", "id"], name="product_popular_idx"
+            ),
         ]
 
 
@@ -52,28 +65,120 @@ class Order(models.Model):
     order_code = models.CharField(max_length=32, default="")
     total_price = models.PositiveIntegerField(default=0)
     status = models.CharField(
-        max_length=8, default=OrderStatus.PENDING
+        max_length=16, default=OrderStatus.PENDING
     )  # pending | paid | cancelled
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         app_label = "product"
         db_table = "order"
+        # created_at 월 단위 range partition. DB 의 primary key 는 (id, created_at)
+        # partition table 의 unique 제약은 partition key 를 포함해야 한다
         constraints = [
-            models.UniqueConstraint(fields=["order_code"], name="unique_order_code"),
+            models.UniqueConstraint(
+                fields=["order_code", "created_at"], name="unique_order_code_created_at"
+            ),
         ]
         indexes = [
             models.Index(fields=["user", "status"]),
+            # 만료 대상 pending 주문만 담는 partial index
+            models.Index(
+                fields=["created_at"],
+                name="order_pending_created_idx",
+                condition=models.Q(status=OrderStatus.PENDING.value),
+            ),
         ]
 
 
 class OrderLine(models.Model):
     product = models.ForeignKey("Product", on_delete=models.CASCADE)
-    order = models.ForeignKey("Order", on_delete=models.CASCADE)
+    # DB 에는 (order_id, created_at) -> order(id, created_at) foreign key 가 있다
+    order = models.ForeignKey("Order", on_delete=models.CASCADE, db_constraint=False)
     quantity = models.PositiveIntegerField(default=1)
     price = models.PositiveIntegerField()
     discount_ratio = models.FloatField(default=1)
+    # order 와 같은 partition 에 저장되도록 order.created_at 을 그대로 저장
+    created_at = models.DateTimeField()
 
     class Meta:
         app_label = "product"
         db_table = "order_line"
+
+
+class ProductSalesDaily(models.Model):
+    # 주문 생성일(UTC) 기준으로 현재 결제 완료 상태인 주문의 판매량. 취소되면 차감된다
+    day = models.DateField()
+    product = models.ForeignKey("Product", on_delete=models.CASCADE)
+    quantity = models.BigIntegerField(default=0)
+    revenue = models.BigIntegerField(default=0)
+    order_count = models.IntegerField(default=0)
+
+    class Meta:
+        app_label = "product"
+        db_table = "product_sales_daily"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "product"], name="unique_product_sales_day"
+            ),
+        ]
+
+
+class CategorySalesDaily(models.Model):
+    day = models.DateField()
+    # category 가 없는 상품은 null 로 집계
+    category = models.ForeignKey("Category", on_delete=models.CASCADE, null=True)
+    quantity = models.BigIntegerField(default=0)
+    revenue = models.BigIntegerField(default=0)
+    order_count = models.IntegerField(default=0)
+
+    class Meta:
+        app_label = "product"
+        db_table = "category_sales_daily"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "category"],
+                name="unique_category_sales_day",
+                nulls_distinct=False,
+            ),
+        ]
+
+
+class OutboxEventType(str, Enum):
+    ORDER_PAID = "order.paid"
+    ORDER_CANCELLED = "order.cancelled"
+    POINTS_CHANGED = "points.changed"
+
+
+class OutboxEvent(models.Model):
+    event_type = models.CharField(max_length=32)
+    aggregate_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = "product"
+        db_table = "outbox_event"
+
+
+class SlowQuery(models.Model):
+    # 정규화한 SQL(fingerprint)과 ninja route 별 느린 query 집계. 모든 worker 가 같은 row 에 더한다
+    fingerprint = models.CharField(max_length=16)
+    route = models.CharField(max_length=255)
+    sql = models.TextField()
+    calls = models.BigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    # EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) 결과. SELECT 만 수집
+    plan = models.JSONField(null=True)
+    plan_captured_at = models.DateTimeField(null=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        app_label = "product"
+        db_table = "slow_query"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fingerprint", "route"], name="unique_slow_query_route"
+            ),
+        ]
@@ -1,6 +1,8 @@
 from typing import List, Dict
 
-from ninja import Schema
+from ninja import Field, Schema
+
+from product.models import ProductStatus
 
 
 class OrderLineRequest(Schema):
@@ -19,5 +21,20 @@ class OrderRequestBody(Schema):
         }
 
 
+class CartLineRequestBody(Schema):
+    product_id: int
+    quantity: int = Field(1, ge=1)
+
+
 class OrderPaymentConfirmRequestBody(Schema):
     payment_key: str  # pg 고유 key
+
+
+class ProductChangeRequest(Schema):
+    product_id: int
+    price: int | None = Field(None, ge=0, le=2_147_483_647)
+    status: ProductStatus | None = None
+
+
+class ProductBulkUpdateRequestBody(Schema):
+    changes: List[ProductChangeRequest]
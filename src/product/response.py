@@ -1,4 +1,5 @@
-from typing import List
+from datetime import date, datetime
+from typing import Any, List
 
 from ninja import Schema
 
@@ -6,13 +7,48 @@ from product.models import Category
 
 
 class ProductDetailResponse(Schema):
+    # fields= 로 일부 필드만 요청하면 나머지는 응답에서 제외
     id: int
-    name: str
-    price: int
+    name: str | None = None
+    price: int | None = None
+
+
+class CategoryFacetResponse(Schema):
+    category_id: int | None
+    count: int
+
+
+class PriceFacetResponse(Schema):
+    min_price: int
+    max_price: int | None
+    count: int
+
+
+class ProductFacetsResponse(Schema):
+    categories: List[CategoryFacetResponse]
+    prices: List[PriceFacetResponse]
+
+
+class ProductCountResponse(Schema):
+    total: int
+    exact: bool  # false 면 planner 추정치
 
 
 class ProductListResponse(Schema):
     products: List[ProductDetailResponse]
+    facets: ProductFacetsResponse | None = None
+    count: ProductCountResponse | None = None
+
+
+class RecommendedProductResponse(Schema):
+    id: int
+    name: str
+    price: int
+    count: int  # 함께 결제된 주문 수
+
+
+class RecommendationListResponse(Schema):
+    products: List[RecommendedProductResponse]
 
 
 class CategoryChildResponse(Schema):
@@ -50,6 +86,116 @@ class CategoryListResponse(Schema):
         )
 
 
+class CartLineResponse(Schema):
+    product_id: int
+    name: str
+    price: int
+    quantity: int
+
+
+class CartResponse(Schema):
+    lines: List[CartLineResponse]
+    subtotal: int  # 할인 적용 금액. checkout 주문의 total_price 와 같다
+    # 판매 중이 아닌 상품. 삭제해야 checkout 할 수 있다
+    unavailable_product_ids: List[int]
+
+
+class CartErrorResponse(Schema):
+    message: str
+    product_ids: List[int] = []
+
+
 class OrderDetailResponse(Schema):
     id: int
     total_price: int
+
+
+class ProductImportErrorResponse(Schema):
+    row: int
+    sku: str | None
+    error: str
+
+
+class ProductImportResponse(Schema):
+    total: int
+    inserted: int
+    updated: int
+    rejected: int
+    unresolved_categories: int
+    seconds: float
+    rows_per_second: float
+    errors: List[ProductImportErrorResponse]
+
+
+class ProductChangeResultResponse(Schema):
+    product_id: int
+    updated: bool
+
+
+class ProductBulkUpdateResponse(Schema):
+    updated: int
+    not_found: int
+    results: List[ProductChangeResultResponse]
+
+
+class ProductSalesResponse(Schema):
+    product_id: int
+    quantity: int
+    revenue: int
+    order_count: int
+
+
+class CategorySalesResponse(Schema):
+    category_id: int | None
+    quantity: int
+    revenue: int
+    order_count: int
+
+
+class DailySalesResponse(Schema):
+    day: date
+    quantity: int
+    revenue: int
+    order_count: int
+
+
+class ProductSalesListResponse(Schema):
+    start: date
+    end: date
+    products: List[ProductSalesResponse]
+
+
+class ProductDailySalesResponse(Schema):
+    product_id: int
+    start: date
+    end: date
+    days: List[DailySalesResponse]
+
+
+class CategorySalesListResponse(Schema):
+    start: date
+    end: date
+    categories: List[CategorySalesResponse]
+
+
+class SlowQueryResponse(Schema):
+    fingerprint: str
+    route: str
+    sql: str
+    calls: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    # EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) 결과. SELECT 가 아니거나 아직 수집되지 않았으면 null
+    plan: Any = None
+    plan_captured_at: datetime | None
+    first_seen: datetime
+    last_seen: datetime
+
+    @staticmethod
+    def resolve_mean_ms(obj) -> float:
+        return obj.total_ms / obj.calls if obj.calls else 0.0
+
+
+class SlowQueryListResponse(Schema):
+    queries: List[SlowQueryResponse]
@@ -0,0 +1,222 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple, TypedDict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from product.exceptions import CartFullException, OrderInvalidProductException
+from product.models import Order, OrderLine, Product
+from product.service.order import order_service
+from product.service.product import product_service
+
+
+class CartLine(TypedDict):
+    product_id: int
+    name: str
+    price: int
+    quantity: int
+
+
+class Cart(TypedDict):
+    lines: List[CartLine]
+    # 할인 적용 금액(checkout 주문의 total_price)
+    subtotal: int
+    # 담은 뒤 판매 중지/삭제된 상품. lines 와 subtotal 에는 포함하지 않고 checkout 도 거절된다
+    unavailable_product_ids: List[int]
+
+
+class LocalCartBackend:
+    """
+    worker process 안에서만 유지되는 cart. 개발/단일 process 용
+    user 수가 max_keys 를 넘거나 ttl 이 지나면 가장 오래 사용되지 않은 cart 부터 버린다.
+    """
+
+    def __init__(self, ttl: int, max_keys: int = 100_000):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._carts: OrderedDict[int, Tuple[Dict[int, int], float]] = OrderedDict()
+
+    def _cart(self, user_id: int) -> Dict[int, int]:
+        # lock 안에서만 호출
+        items, expires_at = self._carts.pop(user_id, ({}, 0.0))
+        if expires_at <= time.monotonic():
+            items = {}
+        self._carts[user_id] = (items, time.monotonic() + self.ttl)
+        if len(self._carts) > self.max_keys:
+            self._carts.popitem(last=False)
+        return items
+
+    def add(self, user_id: int, product_id: int, quantity: int, max_lines: int) -> int:
+        with self._lock:
+            items: Dict[int, int] = self._cart(user_id)
+            if product_id not in items and len(items) >= max_lines:
+                raise CartFullException
+            items[product_id] = items.get(product_id, 0) + quantity
+            return items[product_id]
+
+    def set(self, user_id: int, product_id: int, quantity: int) -> None:
+        with self._lock:
+            self._cart(user_id)[product_id] = quantity
+
+    def remove(self, user_id: int, product_id: int) -> None:
+        with self._lock:
+            self._cart(user_id).pop(product_id, None)
+
+    def items(self, user_id: int) -> Dict[int, int]:
+        with self._lock:
+            return dict(self._cart(user_id))
+
+    def pop(self, user_id: int) -> Dict[int, int]:
+        with self._lock:
+            items, expires_at = self._carts.pop(user_id, ({}, 0.0))
+            return items if expires_at > time.monotonic() else {}
+
+    def restore(self, user_id: int, items: Dict[int, int]) -> None:
+        with self._lock:
+            cart: Dict[int, int] = self._cart(user_id)
+            for product_id, quantity in items.items():
+                cart[product_id] = cart.get(product_id, 0) + quantity
+
+
+class RedisCartBackend:
+    """
+    user 별 hash(cart:{user_id}) 에 product_id -> quantity 를 저장한다.
+    변경마다 ttl 을 연장하고, 명령은 MULTI 로 묶어서 round trip 한 번에 처리한다.
+    """
+
+    def __init__(self, ttl: int, url: str | None = None, client=None):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url or settings.CART_REDIS_URL)
+        self.client = client
+        self.ttl = ttl
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"cart:{user_id}"
+
+    def add(self, user_id: int, product_id: int, quantity: int, max_lines: int) -> int:
+        key: str = self.key(user_id)
+        pipeline = self.client.pipeline()
+        pipeline.hincrby(key, product_id, quantity)
+        pipeline.hlen(key)
+        pipeline.expire(key, self.ttl)
+        total, lines, _ = pipeline.execute()
+        if total == quantity and lines > max_lines:
+            # 새로 추가된 상품 때문에 한도를 넘으면 되돌린다
+            self.client.hdel(key, product_id)
+            raise CartFullException
+        return total
+
+    def set(self, user_id: int, product_id: int, quantity: int) -> None:
+        key: str = self.key(user_id)
+        pipeline = self.client.pipeline()
+        pipeline.hset(key, product_id, quantity)
+        pipeline.expire(key, self.ttl)
+        pipeline.execute()
+
+    def remove(self, user_id: int, product_id: int) -> None:
+        self.client.hdel(self.key(user_id), product_id)
+
+    def items(self, user_id: int) -> Dict[int, int]:
+        return {
+            int(product_id): int(quantity)
+            for product_id, quantity in self.client.hgetall(self.key(user_id)).items()
+        }
+
+    def pop(self, user_id: int) -> Dict[int, int]:
+        # 동시에 checkout 해도 한 요청만 cart 를 가져간다
+        key: str = self.key(user_id)
+        pipeline = self.client.pipeline()
+        pipeline.hgetall(key)
+        pipeline.delete(key)
+        items, _ = pipeline.execute()
+        return {
+            int(product_id): int(quantity) for product_id, quantity in items.items()
+        }
+
+    def restore(self, user_id: int, items: Dict[int, int]) -> None:
+        key: str = self.key(user_id)
+        pipeline = self.client.pipeline()
+        for product_id, quantity in items.items():
+            pipeline.hincrby(key, product_id, quantity)
+        pipeline.expire(key, self.ttl)
+        pipeline.execute()
+
+
+class CartService:
+    """
+    cart 변경은 key-value store 에만 기록하고 DB 는 조회와 checkout 때만 사용한다.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def add(self, user_id: int, product_id: int, quantity: int) -> int:
+        if not product_service.filter_by_ids(product_ids=[product_id]).exists():
+            raise OrderInvalidProductException
+        total: int = self.backend.add(
+            user_id=user_id,
+            product_id=product_id,
+            quantity=quantity,
+            max_lines=settings.CART_MAX_LINES,
+        )
+        if total > settings.CART_MAX_QUANTITY:
+            self.backend.set(
+                user_id=user_id,
+                product_id=product_id,
+                quantity=settings.CART_MAX_QUANTITY,
+            )
+            total = settings.CART_MAX_QUANTITY
+        return total
+
+    def remove(self, user_id: int, product_id: int) -> None:
+        self.backend.remove(user_id=user_id, product_id=product_id)
+
+    def get(self, user_id: int) -> Cart:
+        items: Dict[int, int] = self.backend.items(user_id=user_id)
+        # 가격은 cart 에 저장하지 않고 조회 시점에 한 번의 query 로 가져온다. 판매 중이 아닌 상품은 제외
+        products: Dict[int, Product] = {
+            product.id: product
+            for product in product_service.filter_by_ids(product_ids=list(items))
+        }
+        available: Dict[int, int] = {
+            product_id: quantity
+            for product_id, quantity in sorted(items.items())
+            if product_id in products
+        }
+        lines: List[CartLine] = [
+            {
+                "product_id": product_id,
+                "name": products[product_id].name,
+                "price": products[product_id].price,
+                "quantity": quantity,
+            }
+            for product_id, quantity in available.items()
+        ]
+        # checkout 에서 만들어질 주문의 total_price 와 같은 할인 적용 금액
+        order_lines: List[OrderLine] = order_service.build_order_lines(
+            order=Order(),
+            products=[products[product_id] for product_id in available],
+            product_id_to_quantity=available,
+        )
+        return {
+            "lines": lines,
+            "subtotal": order_service.total_price(order_lines),
+            "unavailable_product_ids": sorted(set(items) - set(products)),
+        }
+
+    def pop(self, user_id: int) -> Dict[int, int]:
+        return self.backend.pop(user_id=user_id)
+
+    def restore(self, user_id: int, items: Dict[int, int]) -> None:
+        self.backend.restore(user_id=user_id, items=items)
+
+
+cart_service = CartService(
+    backend=import_string(settings.CART_BACKEND)(ttl=settings.CART_TTL_SECONDS)
+)
@@ -1,53 +1,118 @@
-from typing import List, Dict
+from datetime import timedelta
+from typing import Callable, List, Dict
 
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
 from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
 
-from product.exceptions import OrderAlreadyPaidException
+from product.exceptions import OrderAlreadyPaidException, OrderNotCancellableException
 from product.models import Product, Order, OrderLine, OrderStatus
+from product.service.order_partition import order_partition_service
+from product.service.outbox import outbox_service
+from product.service.payment import payment_service
 from user.exceptions import UserPointsNotEnoughException, UserVersionConflictException
 from user.models import ServiceUser, UserPointsHistory, UserPoints
 
 
 class OrderService:
     @staticmethod
+    def get_user_order(user: ServiceUser, order_id: int) -> Order | None:
+        # id 로 created_at 범위를 좁혀서 해당 partition 만 조회
+        return Order.objects.filter(
+            id=order_id,
+            user=user,
+            **order_partition_service.created_at_filter(order_id),
+        ).first()
+
+    @staticmethod
+    def build_order_lines(
+        order: Order, products: List[Product], product_id_to_quantity: Dict[int, int]
+    ) -> List[OrderLine]:
+        discount_ratio: float = 0.9
+        return [
+            OrderLine(
+                order=order,
+                product=product,
+                quantity=product_id_to_quantity[product.id],
+                price=product.price,
+                discount_ratio=discount_ratio,
+                created_at=order.created_at,
+            )
+            for product in products
+        ]
+
+    @staticmethod
+    def total_price(order_lines: List[OrderLine]) -> int:
+        return int(
+            sum(
+                line.price * line.quantity * line.discount_ratio for line in order_lines
+            )
+        )
+
     @transaction.atomic
     def create_order(
+        self,
         user: ServiceUser,
         products: List[Product],
         product_id_to_quantity: Dict[int, int],
     ) -> Order:
-        total_price: int = 0
-        order = Order.objects.create(user=user)
-
-        order_lines_to_create: List[OrderLine] = []
-        for product in products:
-            price: int = product.price
-            discount_ratio: float = 0.9
-            quantity: int = product_id_to_quantity[product.id]
-
-            order_lines_to_create.append(
-                OrderLine(
-                    order=order,
-                    product=product,
-                    quantity=quantity,
-                    price=price,
-                    discount_ratio=discount_ratio,
-                )
-            )
-
-            total_price += price * quantity * discount_ratio
-
-        order.total_price = int(total_price)
+        order = Order(user=user)
+        order_lines_to_create: List[OrderLine] = self.build_order_lines(
+            order=order,
+            products=products,
+            product_id_to_quantity=product_id_to_quantity,
+        )
+        # id 만으로 UPDATE 하면 모든 partition 을 scan 하므로 total_price 를 계산한 뒤 한 번에 INSERT
+        order.total_price = self.total_price(order_lines_to_create)
         order.save()
+        for line in order_lines_to_create:
+            line.created_at = order.created_at
         OrderLine.objects.bulk_create(objs=order_lines_to_create)
         return order
 
+    @staticmethod
+    def _confirm_with_payment(
+        order: Order, payment_key: str, pay: Callable[[], None]
+    ) -> None:
+        # 외부 결제 검증은 transaction 밖에서 수행해서 network I/O 동안 row lock 을 잡지 않는다
+        if order.status != OrderStatus.PENDING:
+            raise OrderAlreadyPaidException
+
+        payment_service.confirm_payment(payment_key=payment_key, order=order)
+        try:
+            pay()
+        except Exception:
+            payment_service.cancel_payment(
+                payment_key=payment_key, reason=f"orders:{order.id}:confirm failed"
+            )
+            raise
+
+    def confirm_order(self, user_id: int, order: Order, payment_key: str) -> None:
+        self._confirm_with_payment(
+            order=order,
+            payment_key=payment_key,
+            pay=lambda: self._pay_order(user_id=user_id, order=order),
+        )
+
+    def confirm_order_v2(self, user_id: int, order: Order, payment_key: str) -> None:
+        self._confirm_with_payment(
+            order=order,
+            payment_key=payment_key,
+            pay=lambda: self._pay_order_v2(user_id=user_id, order=order),
+        )
+
     @staticmethod
     @transaction.atomic
-    def confirm_order(user_id: int, order: Order) -> None:
+    def _pay_order(user_id: int, order: Order) -> None:
+        # 만료 시간이 지난 주문은 expiry worker 가 아직 취소하지 않았더라도 결제할 수 없다
         success: int = Order.objects.filter(
-            id=order.id, status=OrderStatus.PENDING
+            id=order.id,
+            created_at=order.created_at,
+            created_at__gte=timezone.now()
+            - timedelta(seconds=settings.ORDER_PENDING_EXPIRY_SECONDS),
+            status=OrderStatus.PENDING,
         ).update(status=OrderStatus.PAID)
         if not success:
             raise OrderAlreadyPaidException
@@ -67,17 +132,24 @@ class OrderService:
         if not success:
             raise UserVersionConflictException
 
+        reason: str = f"orders:{order.id}:confirm"
         UserPointsHistory.objects.create(
             user=user,
             points_change=-order.total_price,
-            reason=f"orders:{order.id}:confirm",
+            reason=reason,
         )
+        outbox_service.publish_order_paid(order=order, user_id=user_id, reason=reason)
 
     @staticmethod
     @transaction.atomic
-    def confirm_order_v2(user_id: int, order: Order) -> None:
+    def _pay_order_v2(user_id: int, order: Order) -> None:
+        # 만료 시간이 지난 주문은 expiry worker 가 아직 취소하지 않았더라도 결제할 수 없다
         success: int = Order.objects.filter(
-            id=order.id, status=OrderStatus.PENDING
+            id=order.id,
+            created_at=order.created_at,
+            created_at__gte=timezone.now()
+            - timedelta(seconds=settings.ORDER_PENDING_EXPIRY_SECONDS),
+            status=OrderStatus.PENDING,
         ).update(status=OrderStatus.PAID)
         if not success:
             raise OrderAlreadyPaidException
@@ -88,18 +160,85 @@ class OrderService:
         if last_points.points_sum < order.total_price:
             raise UserPointsNotEnoughException
 
+        reason: str = f"orders:{order.id}:confirm"
         UserPoints.objects.create(
             user_id=user_id,
             version=last_points.version + 1,
             points_change=-order.total_price,
             points_sum=last_points.points_sum - order.total_price,
-            reason=f"orders:{order.id}:confirm",
+            reason=reason,
         )
 
         if not success:
             raise UserVersionConflictException
 
         ServiceUser.objects.filter(id=user_id).update(order_count=F("order_count") + 1)
+        outbox_service.publish_order_paid(order=order, user_id=user_id, reason=reason)
+
+    @staticmethod
+    def _refund_points(user_id: int, order: Order, points: int, reason: str) -> None:
+        """
+        주문을 결제한 경로가 차감한 곳에만 환불한다.
+        confirm_order 는 ServiceUser.points/UserPointsHistory 만, confirm_order_v2 는 UserPoints ledger 만 차감하고
+        어느 쪽이든 orders:{id}:confirm row 를 남긴다.
+
+        환불은 교환 가능한 덧셈이므로 version 을 올리지 않는다(진행 중인 confirm_order 가 충돌하지 않도록).
+        """
+        # 잔액은 읽지 않고 F() 로 더한다. user row lock 이 같은 사용자의 ledger 환불을 직렬화한다
+        paid_by_ledger: bool = UserPoints.objects.filter(
+            user_id=user_id, reason=f"orders:{order.id}:confirm"
+        ).exists()
+        ServiceUser.objects.filter(id=user_id).update(
+            order_count=Greatest(F("order_count") - 1, 0),
+            **({} if paid_by_ledger else {"points": F("points") + points}),
+        )
+        if not paid_by_ledger:
+            UserPointsHistory.objects.create(
+                user_id=user_id, points_change=points, reason=reason
+            )
+            return
+
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO user_points
+                        (user_id, version, points_change, points_sum, reason, created_at)
+                    SELECT %s, coalesce(last.version, 0) + 1, %s,
+                           coalesce(last.points_sum, 0) + %s, %s, now()
+                    FROM (SELECT 1) AS one
+                    LEFT JOIN LATERAL (
+                        SELECT version, points_sum FROM user_points
+                        WHERE user_id = %s ORDER BY version DESC LIMIT 1
+                    ) AS last ON true
+                    """,
+                    [user_id, points, points, reason, user_id],
+                )
+        except IntegrityError:
+            # confirm_order_v2 가 같은 version 을 먼저 기록한 경우
+            raise UserVersionConflictException
+
+    @transaction.atomic
+    def cancel_order(self, user_id: int, order: Order) -> None:
+        # 결제된 주문을 먼저 시도해서, 상태 확인과 변경을 조건부 UPDATE 한 번으로 처리
+        orders = Order.objects.filter(id=order.id, created_at=order.created_at)
+        if orders.filter(status=OrderStatus.PAID).update(status=OrderStatus.CANCELLED):
+            refund: int = order.total_price
+        elif orders.filter(status=OrderStatus.PENDING).update(
+            status=OrderStatus.CANCELLED
+        ):
+            refund = 0
+        else:
+            raise OrderNotCancellableException
+
+        reason: str = f"orders:{order.id}:cancel"
+        if refund:
+            self._refund_points(
+                user_id=user_id, order=order, points=refund, reason=reason
+            )
+        outbox_service.publish_order_cancelled(
+            order=order, user_id=user_id, refund=refund, reason=reason
+        )
 
 
 order_service = OrderService()
@@ -0,0 +1,66 @@
+import time
+from datetime import timedelta
+from typing import Callable, List
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from product.models import Order, OrderStatus
+from product.service.outbox import outbox_service
+
+
+class OrderExpiryWorker:
+    """
+    created_at 이 expiry_seconds 보다 오래된 pending 주문을 batch 단위로 취소한다.
+
+    confirm_order 의 pending -> paid UPDATE 와 같은 row lock 을 사용하므로 둘 중 하나만 성공한다.
+    - 결제 확정 중인(lock 된) 주문은 SKIP LOCKED 로 건너뛰고 다음 실행에서 다시 확인한다.
+    - 먼저 취소된 주문은 confirm 의 status 조건에 걸려 OrderAlreadyPaidException 이 되고 결제가 취소된다.
+    - confirm 도 created_at 이 만료 시간 안인 주문만 결제하므로, 아직 취소되지 않은 만료 주문도 결제되지 않는다.
+    """
+
+    def __init__(self, expiry_seconds: int, batch_size: int):
+        self.expiry_seconds = expiry_seconds
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_settings(cls, batch_size: int | None = None) -> "OrderExpiryWorker":
+        return cls(
+            expiry_seconds=settings.ORDER_PENDING_EXPIRY_SECONDS,
+            batch_size=batch_size or settings.ORDER_EXPIRY_BATCH_SIZE,
+        )
+
+    def expire_batch(self) -> int:
+        cutoff = timezone.now() - timedelta(seconds=self.expiry_seconds)
+        with transaction.atomic():
+            # 여러 worker 가 동시에 실행되어도 서로 다른 batch 를 가져간다
+            orders: List[Order] = list(
+                Order.objects.select_for_update(skip_locked=True)
+                .filter(status=OrderStatus.PENDING, created_at__lt=cutoff)
+                .order_by("created_at")
+                .only("id", "user_id", "total_price", "created_at")[: self.batch_size]
+            )
+            if not orders:
+                return 0
+            expired: int = Order.objects.filter(
+                id__in=[order.id for order in orders],
+                created_at__lt=cutoff,
+                status=OrderStatus.PENDING,
+            ).update(status=OrderStatus.CANCELLED)
+            # 집계(sales rollup, popularity)가 취소를 반영하도록 같은 transaction 에서 기록
+            for order in orders:
+                outbox_service.publish_order_cancelled(
+                    order=order,
+                    user_id=order.user_id,
+                    refund=0,
+                    reason=f"orders:{order.id}:expire",
+                )
+            return expired
+
+    def run(
+        self, poll_interval: float, should_stop: Callable[[], bool] = lambda: False
+    ) -> None:
+        while not should_stop():
+            if self.expire_batch() < self.batch_size:
+                time.sleep(poll_interval)
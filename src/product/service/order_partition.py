@@ -0,0 +1,175 @@
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+
+# order 와 order_line 은 같은 created_at 월 단위 range 로 partition 된다
+PARTITIONED_TABLES: Tuple[str, ...] = ("order", "order_line")
+
+PARTITION_NAME = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index: int = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_start(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+class OrderPartitionService:
+    """
+    order, order_line partition 을 관리하고 order id 로 created_at 범위를 추정한다.
+
+    order id(identity)는 created_at 순서로 증가하므로 partition 별 최소 id 를 알면
+    id 만으로 조회하는 요청도 created_at 조건을 붙여서 partition pruning 을 적용할 수 있다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bounds: List[Tuple[date, int]] = []
+        self._bounds_loaded_at: float = 0.0
+
+    @staticmethod
+    def attached_partitions(table: str) -> List[date]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT c.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = %s::regclass
+                """,
+                [connection.ops.quote_name(table)],
+            )
+            names: List[str] = [name for (name,) in cursor.fetchall()]
+        return sorted(
+            date(int(match[1]), int(match[2]), 1)
+            for name in names
+            if (match := PARTITION_NAME.search(name))
+        )
+
+    @staticmethod
+    def create_partitions(start: date, end: date) -> List[str]:
+        """
+        start 부터 end 가 속한 달까지 월 단위 partition 을 만든다. 이미 있으면 건너뛴다.
+        """
+        created: List[str] = []
+        existing: Dict[str, List[date]] = {
+            table: OrderPartitionService.attached_partitions(table)
+            for table in PARTITIONED_TABLES
+        }
+        month: date = start.replace(day=1)
+        with connection.cursor() as cursor:
+            while month <= end:
+                for table in PARTITIONED_TABLES:
+                    if month in existing[table]:
+                        continue
+                    name: str = partition_name(table, month)
+                    cursor.execute(
+                        f"""
+                        CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(name)}
+                        PARTITION OF {connection.ops.quote_name(table)}
+                        FOR VALUES FROM (%s) TO (%s)
+                        """,
+                        [month_start(month), month_start(add_months(month, 1))],
+                    )
+                    created.append(name)
+                month = add_months(month, 1)
+        return created
+
+    def ensure_future_partitions(self, months_ahead: int | None = None) -> List[str]:
+        # partition 이 없는 달의 주문은 insert 가 실패하므로 미리 만들어 둔다
+        today: date = datetime.now(timezone.utc).date()
+        return self.create_partitions(
+            start=today,
+            end=add_months(
+                today, months_ahead or settings.ORDER_PARTITION_MONTHS_AHEAD
+            ),
+        )
+
+    def detach_old_partitions(self, retention_months: int | None = None) -> List[str]:
+        """
+        보관 기간이 지난 partition 을 떼어내서 일반 table 로 남긴다(archive/drop 은 별도 작업).
+        order_line 이 order 를 참조하므로 order_line 부터 분리한다.
+        """
+        cutoff: date = add_months(
+            datetime.now(timezone.utc).date().replace(day=1),
+            -(retention_months or settings.ORDER_PARTITION_RETENTION_MONTHS),
+        )
+        # CONCURRENTLY 는 transaction 안에서 쓸 수 없다
+        concurrently: str = "" if connection.in_atomic_block else " CONCURRENTLY"
+        detached: List[str] = []
+        with connection.cursor() as cursor:
+            for table in reversed(PARTITIONED_TABLES):
+                for month in self.attached_partitions(table):
+                    if month >= cutoff:
+                        continue
+                    name: str = partition_name(table, month)
+                    cursor.execute(
+                        f"ALTER TABLE {connection.ops.quote_name(table)} "
+                        f"DETACH PARTITION {connection.ops.quote_name(name)}{concurrently}"
+                    )
+                    detached.append(name)
+        self._bounds_loaded_at = 0.0
+        return detached
+
+    def _load_bounds(self) -> List[Tuple[date, int]]:
+        months: List[date] = self.attached_partitions("order")
+        if not months:
+            return []
+        with connection.cursor() as cursor:
+            # partition 마다 PK index 의 첫 값만 읽는다
+            cursor.execute(
+                " UNION ALL ".join(
+                    f"SELECT %s::date, min(id) FROM "
+                    f"{connection.ops.quote_name(partition_name('order', month))}"
+                    for month in months
+                ),
+                months,
+            )
+            return [(month, min_id) for month, min_id in cursor.fetchall() if min_id]
+
+    def id_bounds(self) -> List[Tuple[date, int]]:
+        now: float = time.monotonic()
+        if now - self._bounds_loaded_at >= settings.ORDER_PARTITION_BOUNDS_TTL:
+            with self._lock:
+                self._bounds = self._load_bounds()
+                self._bounds_loaded_at = now
+        return self._bounds
+
+    def created_at_filter(self, order_id: int) -> Dict[str, datetime]:
+        """
+        order_id 가 속할 수 있는 created_at 범위를 Order queryset filter 로 반환한다.
+        동시에 insert 된 주문은 id 와 created_at 순서가 조금 어긋날 수 있어서 margin 을 둔다.
+        마지막으로 확인한 partition 이후의 주문도 찾을 수 있도록 마지막 범위는 끝을 열어 둔다.
+        """
+        bounds: List[Tuple[date, int]] = self.id_bounds()
+        candidates: List[int] = [
+            i for i, (_, min_id) in enumerate(bounds) if min_id <= order_id
+        ]
+        if not candidates:
+            return {}
+
+        i: int = candidates[-1]
+        margin = timedelta(seconds=settings.ORDER_PARTITION_LOOKUP_MARGIN_SECONDS)
+        created_at_filter: Dict[str, datetime] = {
+            "created_at__gte": month_start(bounds[i][0]) - margin
+        }
+        if i + 1 < len(bounds):
+            created_at_filter["created_at__lt"] = (
+                month_start(add_months(bounds[i][0], 1)) + margin
+            )
+        return created_at_filter
+
+
+order_partition_service = OrderPartitionService()
@@ -0,0 +1,193 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from datetime import timedelta
+from typing import Dict, List, NamedTuple
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from product.exceptions import OrderWriterBusyException
+from product.models import Order, OrderLine, OrderStatus, Product
+from product.service.order import order_service
+from user.models import ServiceUser
+
+
+logger = logging.getLogger(__name__)
+
+
+class PendingOrder(NamedTuple):
+    user: ServiceUser
+    products: List[Product]
+    product_id_to_quantity: Dict[int, int]
+    future: Future
+
+
+class OrderBatchWriter:
+    """
+    요청 thread 가 넣은 주문 생성을 writer thread 가 모아서(group commit)
+    batch 마다 한 transaction 에서 multi-row INSERT 로 처리한다.
+
+    - 첫 주문이 들어온 뒤 max_wait_ms 동안, 또는 max_batch_size 개가 모일 때까지 기다린다.
+    - queue 가 가득 차거나 timeout 안에 처리되지 않으면 OrderWriterBusyException
+    - batch INSERT 가 실패하면 주문마다 OrderService.create_order 로 다시 시도해서
+      한 주문의 오류가 같은 batch 의 다른 주문에 영향을 주지 않는다.
+    """
+
+    def __init__(
+        self, max_batch_size: int, max_wait_ms: float, queue_size: int, timeout: float
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self._queue: queue.Queue[PendingOrder | None] = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_settings(cls) -> "OrderBatchWriter":
+        return cls(
+            max_batch_size=settings.ORDER_GROUP_COMMIT_MAX_BATCH_SIZE,
+            max_wait_ms=settings.ORDER_GROUP_COMMIT_MAX_WAIT_MS,
+            queue_size=settings.ORDER_GROUP_COMMIT_QUEUE_SIZE,
+            timeout=settings.ORDER_GROUP_COMMIT_TIMEOUT,
+        )
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="order-batch-writer", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            if not self._thread:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def create_order(
+        self,
+        user: ServiceUser,
+        products: List[Product],
+        product_id_to_quantity: Dict[int, int],
+    ) -> Order:
+        self.start()
+        pending = PendingOrder(
+            user=user,
+            products=products,
+            product_id_to_quantity=product_id_to_quantity,
+            future=Future(),
+        )
+        try:
+            self._queue.put(pending, timeout=self.timeout)
+        except queue.Full:
+            raise OrderWriterBusyException
+        try:
+            return pending.future.result(timeout=self.timeout)
+        except TimeoutError:
+            # 이미 batch 에 들어간 주문은 나중에 생성될 수 있고, pending 상태로 남아 만료 처리된다
+            raise OrderWriterBusyException
+
+    def _collect(self) -> List[PendingOrder | None]:
+        batch: List[PendingOrder | None] = [self._queue.get()]
+        deadline: float = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size and batch[-1] is not None:
+            try:
+                batch.append(
+                    self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                )
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    @transaction.atomic
+    def write_batch(batch: List[PendingOrder]) -> List[Order]:
+        now = timezone.now()
+        orders: List[Order] = []
+        order_lines: List[OrderLine] = []
+        for i, pending in enumerate(batch):
+            # (order_code, created_at) unique 제약 때문에 batch 안의 created_at 을 1us 씩 다르게 둔다
+            order = Order(
+                user=pending.user,
+                status=OrderStatus.PENDING.value,
+                created_at=now + timedelta(microseconds=i),
+            )
+            lines: List[OrderLine] = order_service.build_order_lines(
+                order=order,
+                products=pending.products,
+                product_id_to_quantity=pending.product_id_to_quantity,
+            )
+            order.total_price = order_service.total_price(lines)
+            orders.append(order)
+            order_lines.extend(lines)
+
+        # auto_now_add 가 created_at 을 덮어쓰지 않도록 bulk_create 대신 직접 INSERT
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO "order" (user_id, order_code, total_price, status, created_at)
+                VALUES {", ".join(["(%s, '', %s, %s, %s)"] * len(orders))}
+                RETURNING id
+                """,
+                [
+                    param
+                    for order in orders
+                    for param in (
+                        order.user_id,
+                        order.total_price,
+                        order.status,
+                        order.created_at,
+                    )
+                ],
+            )
+            for order, (order_id,) in zip(orders, cursor.fetchall()):
+                order.id = order_id
+                order._state.adding = False
+        for line in order_lines:
+            line.order_id = line.order.id
+        OrderLine.objects.bulk_create(objs=order_lines)
+        return orders
+
+    def _write(self, batch: List[PendingOrder]) -> None:
+        close_old_connections()
+        try:
+            orders: List[Order] = self.write_batch(batch)
+        except Exception:
+            logger.exception("order batch insert failed, retrying one by one")
+            for pending in batch:
+                try:
+                    pending.future.set_result(
+                        order_service.create_order(
+                            user=pending.user,
+                            products=pending.products,
+                            product_id_to_quantity=pending.product_id_to_quantity,
+                        )
+                    )
+                except Exception as e:
+                    pending.future.set_exception(e)
+            return
+
+        for pending, order in zip(batch, orders):
+            pending.future.set_result(order)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            stop: bool = batch[-1] is None
+            if pending_orders := [pending for pending in batch if pending]:
+                self._write(pending_orders)
+            if stop:
+                connection.close()
+                return
+
+
+order_writer = OrderBatchWriter.from_settings()
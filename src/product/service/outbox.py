@@ -0,0 +1,142 @@
+import logging
+import time
+from typing import Callable, List, Protocol
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from product.models import Order, OutboxEvent, OutboxEventType
+
+
+logger = logging.getLogger(__name__)
+
+# relay 는 shared, rollup rebuild 는 exclusive 로 잡는 advisory lock key
+RELAY_LOCK_KEY: int = 0x6F7574626F78
+
+
+class OutboxSink(Protocol):
+    def send(self, events: List[OutboxEvent]) -> None: ...
+
+
+class LoggingSink:
+    def send(self, events: List[OutboxEvent]) -> None:
+        for event in events:
+            logger.info(
+                "outbox event %s %s %s", event.id, event.event_type, event.payload
+            )
+
+
+class OutboxService:
+    @staticmethod
+    def pause_relay() -> None:
+        """
+        진행 중인 relay batch 가 commit 될 때까지 기다리고, 현재 transaction 이 끝날 때까지 relay 를 멈춘다.
+        event 기록(publish)은 막지 않는다.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [RELAY_LOCK_KEY])
+
+    @staticmethod
+    def publish(events: List[OutboxEvent]) -> None:
+        # 호출하는 쪽 transaction 안에서 insert 한 번으로 기록하고, fan-out 은 relay 가 담당
+        OutboxEvent.objects.bulk_create(objs=events)
+
+    def publish_order_paid(self, order: Order, user_id: int, reason: str) -> None:
+        self.publish(
+            events=[
+                OutboxEvent(
+                    event_type=OutboxEventType.ORDER_PAID,
+                    aggregate_id=order.id,
+                    payload={
+                        "order_id": order.id,
+                        "user_id": user_id,
+                        "total_price": order.total_price,
+                        "created_at": order.created_at.isoformat(),
+                    },
+                ),
+                OutboxEvent(
+                    event_type=OutboxEventType.POINTS_CHANGED,
+                    aggregate_id=user_id,
+                    payload={
+                        "user_id": user_id,
+                        "points_change": -order.total_price,
+                        "reason": reason,
+                    },
+                ),
+            ]
+        )
+
+    def publish_order_cancelled(
+        self, order: Order, user_id: int, refund: int, reason: str
+    ) -> None:
+        events: List[OutboxEvent] = [
+            OutboxEvent(
+                event_type=OutboxEventType.ORDER_CANCELLED,
+                aggregate_id=order.id,
+                payload={
+                    "order_id": order.id,
+                    "user_id": user_id,
+                    "refund": refund,
+                    "created_at": order.created_at.isoformat(),
+                },
+            )
+        ]
+        if refund:
+            events.append(
+                OutboxEvent(
+                    event_type=OutboxEventType.POINTS_CHANGED,
+                    aggregate_id=user_id,
+                    payload={
+                        "user_id": user_id,
+                        "points_change": refund,
+                        "reason": reason,
+                    },
+                )
+            )
+        self.publish(events=events)
+
+
+outbox_service = OutboxService()
+
+
+class OutboxRelay:
+    def __init__(self, sinks: List[OutboxSink], batch_size: int):
+        self.sinks = sinks
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_settings(cls, batch_size: int | None = None) -> "OutboxRelay":
+        return cls(
+            sinks=[import_string(path)() for path in settings.OUTBOX_SINKS],
+            batch_size=batch_size or settings.OUTBOX_RELAY_BATCH_SIZE,
+        )
+
+    def relay_batch(self) -> int:
+        # SKIP LOCKED: 여러 relay worker 가 동시에 떠 있어도 서로 다른 batch 를 가져간다.
+        # sink 전송이 실패하면 rollback 되어 다음 batch 에서 다시 전송(at-least-once)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock_shared(%s)", [RELAY_LOCK_KEY]
+                )
+            events: List[OutboxEvent] = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True).order_by("id")[
+                    : self.batch_size
+                ]
+            )
+            if not events:
+                return 0
+
+            for sink in self.sinks:
+                sink.send(events)
+            OutboxEvent.objects.filter(id__in=[event.id for event in events]).delete()
+        return len(events)
+
+    def run(
+        self, poll_interval: float, should_stop: Callable[[], bool] = lambda: False
+    ) -> None:
+        while not should_stop():
+            # 가득 찬 batch 를 처리했다면 밀린 event 가 있다고 보고 바로 다음 batch 를 처리
+            if self.relay_batch() < self.batch_size:
+                time.sleep(poll_interval)
@@ -1,10 +1,100 @@
+import json
+import logging
+
+import urllib3
+from django.conf import settings
+
+from config.resilience import (
+    Bulkhead,
+    BulkheadFullException,
+    CircuitBreaker,
+    CircuitOpenException,
+)
+from product.exceptions import (
+    OrderPaymentConfirmFailedException,
+    PaymentGatewayUnavailableException,
+)
+from product.models import Order
+
+
+logger = logging.getLogger(__name__)
+
+
 class PaymentService:
-    @staticmethod
-    def confirm_payment(payment_key: str, amount: int) -> bool:
+    def __init__(self):
+        # 연결을 재사용하고, 외부 호출이 worker 를 오래 붙잡지 않도록 timeout 을 짧게 유지
+        self.http = urllib3.PoolManager(
+            maxsize=settings.PAYMENT_GATEWAY_POOL_SIZE,
+            block=False,
+            retries=False,
+            timeout=urllib3.Timeout(
+                connect=settings.PAYMENT_GATEWAY_CONNECT_TIMEOUT,
+                read=settings.PAYMENT_GATEWAY_READ_TIMEOUT,
+            ),
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.PAYMENT_GATEWAY_FAILURE_THRESHOLD,
+            recovery_timeout=settings.PAYMENT_GATEWAY_RECOVERY_TIMEOUT,
+        )
+        self.bulkhead = Bulkhead(
+            max_concurrency=settings.PAYMENT_GATEWAY_MAX_CONCURRENCY,
+            acquire_timeout=settings.PAYMENT_GATEWAY_BULKHEAD_TIMEOUT,
+        )
+
+    def _request(self, path: str, body: dict) -> urllib3.BaseHTTPResponse:
+        try:
+            self.circuit_breaker.before_call()
+            with self.bulkhead.slot():
+                response = self.http.request(
+                    "POST",
+                    settings.PAYMENT_GATEWAY_URL + path,
+                    body=json.dumps(body).encode(),
+                    headers={
+                        "Content-Type": "application/json",
+                        **urllib3.make_headers(
+                            basic_auth=f"{settings.PAYMENT_GATEWAY_SECRET_KEY}:"
+                        ),
+                    },
+                )
+        except (CircuitOpenException, BulkheadFullException):
+            raise PaymentGatewayUnavailableException
+        except urllib3.exceptions.HTTPError:
+            self.circuit_breaker.record_failure()
+            raise PaymentGatewayUnavailableException
+
+        if response.status >= 500:
+            self.circuit_breaker.record_failure()
+            raise PaymentGatewayUnavailableException
+
+        self.circuit_breaker.record_success()
+        return response
+
+    def confirm_payment(self, payment_key: str, order: Order) -> None:
         # 외부 API 호출 -> 결제 검증
-        if payment_key and amount:
-            return True
-        return False
+        response = self._request(
+            path="/v1/payments/confirm",
+            body={
+                "paymentKey": payment_key,
+                "orderId": str(order.id),
+                "amount": order.total_price,
+            },
+        )
+        if response.status != 200:
+            raise OrderPaymentConfirmFailedException
+
+    def cancel_payment(self, payment_key: str, reason: str) -> None:
+        # 결제 승인 후 주문 확정에 실패한 경우의 보상 처리이므로 원래 예외를 가리지 않도록 기록만 남긴다
+        try:
+            response = self._request(
+                path=f"/v1/payments/{payment_key}/cancel",
+                body={"cancelReason": reason},
+            )
+        except PaymentGatewayUnavailableException:
+            logger.exception("payment cancel failed: %s", payment_key)
+            return
+
+        if response.status != 200:
+            logger.error("payment cancel rejected: %s %s", payment_key, response.status)
 
 
 payment_service = PaymentService()
@@ -0,0 +1,198 @@
+import heapq
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from product.models import Category, OutboxEvent, ProductStatus
+from product.service.product import ProductValues
+from product.service.outbox import outbox_service
+from product.service.sales_rollup import (
+    RELAYED_ORDERS_QUERY,
+    order_changes,
+    order_changes_values,
+    relayed_orders_params,
+)
+
+
+# 주문 시각 기준 forward decay: 가중치 2^((created_at - epoch) / half_life)
+# 시간이 지나도 기존 점수를 다시 계산하지 않고, 취소는 같은 주문 시각의 가중치를 그대로 뺀다.
+POPULARITY_SQL = """
+UPDATE product p
+SET popularity = p.popularity + d.delta
+FROM (
+    SELECT l.product_id,
+           sum(
+               o.sign * l.quantity * power(
+                   2::double precision,
+                   extract(epoch FROM o.created_at - %s::timestamptz)::double precision
+                   / %s
+               )
+           ) AS delta
+    FROM ({orders_query}) AS o(order_id, created_at, sign)
+    JOIN order_line l ON l.order_id = o.order_id AND l.created_at = o.created_at
+    GROUP BY l.product_id
+    ORDER BY l.product_id
+) d
+WHERE p.id = d.product_id
+"""
+
+CHANGED_ORDERS_QUERY = "VALUES {values}"
+
+# category 별 인기 상품 K 개. (category_id, status, -popularity, id) index 를 category 마다 K 개만 읽는다
+CATEGORY_TOP_K_SQL = """
+SELECT c.id, p.id, p.name, p.price, p.popularity
+FROM category c
+CROSS JOIN LATERAL (
+    SELECT id, name, price, popularity FROM product
+    WHERE category_id = c.id AND status = %s
+    ORDER BY popularity DESC, id
+    LIMIT %s
+) p
+"""
+
+GLOBAL_TOP_K_SQL = """
+SELECT NULL, id, name, price, popularity FROM product
+WHERE status = %s
+ORDER BY popularity DESC, id
+LIMIT %s
+"""
+
+
+def decay_params() -> List:
+    return [
+        datetime.fromisoformat(settings.POPULARITY_EPOCH),
+        timedelta(days=settings.POPULARITY_HALF_LIFE_DAYS).total_seconds(),
+    ]
+
+
+class PopularitySink:
+    """
+    outbox relay 의 transaction 안에서 결제/취소 event 의 판매량을 product.popularity 에 더한다.
+    bulk UPDATE 는 post_save signal 을 거치지 않으므로 sort=popular listing cache 는 timeout 까지 유지된다.
+    """
+
+    def send(self, events: List[OutboxEvent]) -> None:
+        if not (changes := order_changes(events)):
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                POPULARITY_SQL.format(
+                    orders_query=CHANGED_ORDERS_QUERY.format(
+                        values=order_changes_values(changes)
+                    )
+                ),
+                [*decay_params(), *[param for change in changes for param in change]],
+            )
+
+
+TopKEntry = Tuple[float, ProductValues]
+
+
+class PopularTopK:
+    """
+    category 별(하위 category 포함) 인기 상품 상위 K 개와 전체 상위 K 개를 process memory 에 보관한다.
+    refresh_interval 이 지나면 다음 요청이 다시 읽고, 그 동안 다른 요청은 이전 값을 그대로 사용한다.
+    """
+
+    def __init__(self, k: int, refresh_interval: float):
+        self.k = k
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._top: Dict[int | None, List[ProductValues]] | None = None
+        self._refreshed_at: float = 0.0
+
+    def build(self) -> Dict[int | None, List[ProductValues]]:
+        status: str = ProductStatus.ACTIVE.value
+        by_category: Dict[int | None, List[TopKEntry]] = defaultdict(list)
+        with connection.cursor() as cursor:
+            for sql in (CATEGORY_TOP_K_SQL, GLOBAL_TOP_K_SQL):
+                cursor.execute(sql, [status, self.k])
+                for category_id, product_id, name, price, popularity in cursor:
+                    by_category[category_id].append(
+                        (popularity, {"id": product_id, "name": name, "price": price})
+                    )
+
+        # 상위 category 목록은 listing 과 같이 자신과 하위 category 의 상품을 합친다
+        children: Dict[int, List[int]] = defaultdict(list)
+        category_ids: List[int] = []
+        for category_id, parent_id in Category.objects.values_list("id", "parent_id"):
+            category_ids.append(category_id)
+            if parent_id:
+                children[parent_id].append(category_id)
+
+        top: Dict[int | None, List[ProductValues]] = {
+            None: [product for _, product in by_category[None]]
+        }
+        for category_id in category_ids:
+            merged = heapq.merge(
+                *(by_category[i] for i in [category_id, *children[category_id]]),
+                key=lambda entry: (-entry[0], entry[1]["id"]),
+            )
+            top[category_id] = [product for _, product in merged][: self.k]
+        return top
+
+    def refresh(self) -> None:
+        top = self.build()
+        self._top, self._refreshed_at = top, time.monotonic()
+
+    def get(self, category_id: int | None, limit: int) -> List[ProductValues] | None:
+        """
+        limit 이 K 보다 크거나 알 수 없는 category 이면 None(DB 조회로 처리)
+        """
+        if limit > self.k:
+            return None
+
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            if self._lock.acquire(blocking=self._top is None):
+                try:
+                    if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+                        self.refresh()
+                finally:
+                    self._lock.release()
+
+        if (products := self._top.get(category_id)) is None:
+            return None
+        return products[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._top, self._refreshed_at = None, 0.0
+
+
+popular_top_k = PopularTopK(
+    k=settings.POPULAR_TOP_K,
+    refresh_interval=settings.POPULAR_TOP_K_REFRESH_INTERVAL,
+)
+
+
+class PopularityService:
+    @staticmethod
+    @transaction.atomic
+    def rebuild(days: int) -> None:
+        """
+        최근 days 일의 결제 주문으로 popularity 를 다시 계산한다. 최초 적재나 epoch 변경 시 사용
+        """
+        # sales rollup rebuild 와 같이 relay 를 멈추고 아직 relay 되지 않은 event 를 뺀 값으로 계산한다
+        outbox_service.pause_relay()
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE product SET popularity = 0 WHERE popularity <> 0")
+            cursor.execute(
+                POPULARITY_SQL.format(orders_query=RELAYED_ORDERS_QUERY),
+                [
+                    *decay_params(),
+                    *relayed_orders_params(
+                        start=timezone.now() - timedelta(days=days),
+                        end=datetime.max.replace(tzinfo=dt_timezone.utc),
+                    ),
+                ],
+            )
+
+
+popularity_service = PopularityService()
@@ -1,38 +1,380 @@
-from typing import List, TypedDict
+from enum import Enum
+from typing import Any, Dict, List, Set, Tuple, TypedDict
 
+from django.conf import settings
 from django.contrib.postgres.search import SearchQuery
+from django.db import connection, transaction
+from django.db.models import QuerySet
 
+from config.cache import QueryCache
+from config.pagination import approximate_count
 from product.models import Product, ProductStatus
 
 
-class ProductValues(TypedDict):
+class ProductValues(TypedDict, total=False):
     id: int
     name: str
     price: int
 
 
+class ProductField(str, Enum):
+    ID = "id"
+    NAME = "name"
+    PRICE = "price"
+
+
+PRODUCT_FIELDS: Tuple[str, ...] = tuple(field.value for field in ProductField)
+
+
+def parse_fields(fields: str | None) -> Tuple[str, ...]:
+    """
+    "name,price" 형태의 sparse fieldset 을 정규화한다. id 는 항상 포함된다.
+    알 수 없는 field 가 있으면 ValueError
+    """
+    if not fields:
+        return PRODUCT_FIELDS
+    requested: Set[str] = {
+        ProductField(field.strip()).value
+        for field in fields.split(",")
+        if field.strip()
+    }
+    return tuple(field for field in PRODUCT_FIELDS if field in requested | {"id"})
+
+
+class ProductSort(str, Enum):
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+    NEWEST = "newest"
+    POPULAR = "popular"
+
+    @property
+    def ordering(self) -> Tuple[str, ...]:
+        return {
+            ProductSort.PRICE_ASC: ("price", "id"),
+            ProductSort.PRICE_DESC: ("-price", "-id"),
+            ProductSort.NEWEST: ("-id",),
+            # (category_id, status, -popularity, id) index 순서
+            ProductSort.POPULAR: ("-popularity", "id"),
+        }[self]
+
+
+class CategoryFacet(TypedDict):
+    category_id: int | None
+    count: int
+
+
+class PriceFacet(TypedDict):
+    min_price: int
+    max_price: int | None
+    count: int
+
+
+class ProductFacets(TypedDict):
+    categories: List[CategoryFacet]
+    prices: List[PriceFacet]
+
+
+class ProductCount(TypedDict):
+    total: int
+    # False 면 planner 추정치
+    exact: bool
+
+
+class ProductChange(TypedDict):
+    product_id: int
+    price: int | None
+    status: ProductStatus | None
+
+
+# Product/Category 가 변경되면 product.signals 에서 invalidate
+product_list_cache = QueryCache(
+    name="product_list",
+    timeout=settings.PRODUCT_LIST_CACHE_TIMEOUT,
+    local_max_entries=settings.PRODUCT_LIST_CACHE_LOCAL_MAX_ENTRIES,
+)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
 class ProductService:
     @staticmethod
-    def search_by_query(self, query: str) -> List[ProductValues]:
-        return Product.objects.filter(
-            search_vector=SearchQuery(query), status=ProductStatus.ACTIVE
-        ).values("id", "name", "price")
+    def _listing(
+        params: Dict[str, Any],
+        queryset: QuerySet,
+        min_price: int | None,
+        max_price: int | None,
+        sort: ProductSort | None,
+        fields: Tuple[str, ...],
+        limit: int | None,
+    ) -> List[ProductValues]:
+        # status 와 price 조건, price 정렬이 (status, price) index 를 그대로 사용
+        if min_price is not None:
+            queryset = queryset.filter(price__gte=min_price)
+        if max_price is not None:
+            queryset = queryset.filter(price__lte=max_price)
+        if sort:
+            queryset = queryset.order_by(*sort.ordering)
+        if limit:
+            queryset = queryset[:limit]
+
+        return product_list_cache.get_or_set(
+            params={
+                **params,
+                "min_price": min_price,
+                "max_price": max_price,
+                "sort": sort and sort.value,
+                "fields": fields,
+                "limit": limit,
+            },
+            # 요청한 column 만 SELECT 해서 DB 전송량과 직렬화 비용을 줄인다
+            compute=lambda: list(queryset.values(*fields)),
+        )
+
+    def search_by_query(
+        self,
+        query: str,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        sort: ProductSort | None = None,
+        fields: Tuple[str, ...] = PRODUCT_FIELDS,
+        limit: int | None = None,
+    ) -> List[ProductValues]:
+        query = normalize_query(query)
+        return self._listing(
+            params={"query": query},
+            queryset=Product.objects.filter(
+                search_vector=SearchQuery(query), status=ProductStatus.ACTIVE
+            ),
+            min_price=min_price,
+            max_price=max_price,
+            sort=sort,
+            fields=fields,
+            limit=limit,
+        )
+
+    def filter_by_category_ids(
+        self,
+        category_ids: List[int],
+        min_price: int | None = None,
+        max_price: int | None = None,
+        sort: ProductSort | None = None,
+        fields: Tuple[str, ...] = PRODUCT_FIELDS,
+        limit: int | None = None,
+    ) -> List[ProductValues]:
+        category_ids = sorted(set(category_ids))
+        return self._listing(
+            params={"category_ids": category_ids},
+            queryset=Product.objects.filter(
+                category_id__in=category_ids, status=ProductStatus.ACTIVE
+            ),
+            min_price=min_price,
+            max_price=max_price,
+            sort=sort,
+            fields=fields,
+            limit=limit,
+        )
+
+    def all_products(
+        self,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        sort: ProductSort | None = None,
+        fields: Tuple[str, ...] = PRODUCT_FIELDS,
+        limit: int | None = None,
+    ) -> List[ProductValues]:
+        return self._listing(
+            params={},
+            queryset=Product.objects.filter(status=ProductStatus.ACTIVE),
+            min_price=min_price,
+            max_price=max_price,
+            sort=sort,
+            fields=fields,
+            limit=limit,
+        )
 
     @staticmethod
-    def filter_by_category_ids(category_ids: List[int]) -> List[ProductValues]:
-        return Product.objects.filter(
-            category_id__in=category_ids, status=ProductStatus.ACTIVE
-        ).values("id", "name", "price")
+    def _facets(
+        category_ids: List[int] | None,
+        query: str | None,
+        min_price: int | None,
+        max_price: int | None,
+    ) -> ProductFacets:
+        conditions: List[str] = ["status = %s"]
+        params: List[Any] = [ProductStatus.ACTIVE.value]
+        if category_ids is not None:
+            conditions.append("category_id = ANY(%s)")
+            params.append(category_ids)
+        if query:
+            conditions.append("search_vector @@ plainto_tsquery(%s)")
+            params.append(query)
+
+        # category facet 에는 가격 조건을 적용하고, 가격 facet 은 가격 조건 없이 구간별로 센다
+        boundaries: List[int] = settings.PRODUCT_PRICE_FACET_BOUNDARIES
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT GROUPING(category_id) = 0,
+                       category_id,
+                       width_bucket(price, %s::integer[]),
+                       count(*) FILTER (WHERE price >= %s AND price <= %s),
+                       count(*)
+                FROM product
+                WHERE {" AND ".join(conditions)}
+                GROUP BY GROUPING SETS (
+                    (category_id), (width_bucket(price, %s::integer[]))
+                )
+                """,
+                [
+                    boundaries,
+                    min_price or 0,
+                    max_price if max_price is not None else 2_147_483_647,
+                    *params,
+                    boundaries,
+                ],
+            )
+            rows = cursor.fetchall()
+
+        bounds: List[int | None] = [0, *boundaries, None]
+        categories: List[CategoryFacet] = []
+        prices: List[PriceFacet] = []
+        for is_category, category_id, bucket, filtered_count, count in rows:
+            if is_category:
+                if filtered_count:
+                    categories.append(
+                        {"category_id": category_id, "count": filtered_count}
+                    )
+            else:
+                prices.append(
+                    {
+                        "min_price": bounds[bucket],
+                        "max_price": bounds[bucket + 1],
+                        "count": count,
+                    }
+                )
+        return {
+            "categories": sorted(categories, key=lambda f: f["category_id"] or 0),
+            "prices": sorted(prices, key=lambda f: f["min_price"]),
+        }
+
+    def facets(
+        self,
+        category_ids: List[int] | None = None,
+        query: str | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+    ) -> ProductFacets:
+        category_ids = sorted(set(category_ids)) if category_ids is not None else None
+        query = normalize_query(query) if query else None
+        return product_list_cache.get_or_set(
+            params={
+                "facets": True,
+                "category_ids": category_ids,
+                "query": query,
+                "min_price": min_price,
+                "max_price": max_price,
+            },
+            compute=lambda: self._facets(
+                category_ids=category_ids,
+                query=query,
+                min_price=min_price,
+                max_price=max_price,
+            ),
+        )
 
     @staticmethod
-    def all_products() -> List[ProductValues]:
-        return Product.objects.filter(status=ProductStatus.ACTIVE).values(
-            "id", "name", "price"
+    def _count(
+        category_ids: List[int] | None,
+        query: str | None,
+        min_price: int | None,
+        max_price: int | None,
+    ) -> ProductCount:
+        queryset: QuerySet = Product.objects.filter(status=ProductStatus.ACTIVE)
+        if category_ids is not None:
+            queryset = queryset.filter(category_id__in=category_ids)
+        if query:
+            queryset = queryset.filter(search_vector=SearchQuery(query))
+        if min_price is not None:
+            queryset = queryset.filter(price__gte=min_price)
+        if max_price is not None:
+            queryset = queryset.filter(price__lte=max_price)
+        count = approximate_count(
+            queryset, exact_threshold=settings.APPROXIMATE_COUNT_EXACT_THRESHOLD
+        )
+        return {"total": count.value, "exact": count.exact}
+
+    def count(
+        self,
+        category_ids: List[int] | None = None,
+        query: str | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+    ) -> ProductCount:
+        """
+        listing 조건에 맞는 전체 상품 수. 결과가 많으면 COUNT(*) 대신 planner 추정치를 사용한다
+        """
+        category_ids = sorted(set(category_ids)) if category_ids is not None else None
+        query = normalize_query(query) if query else None
+        return product_list_cache.get_or_set(
+            params={
+                "count": True,
+                "category_ids": category_ids,
+                "query": query,
+                "min_price": min_price,
+                "max_price": max_price,
+            },
+            compute=lambda: self._count(
+                category_ids=category_ids,
+                query=query,
+                min_price=min_price,
+                max_price=max_price,
+            ),
         )
 
     @staticmethod
     def filter_by_ids(product_ids: List[int]) -> List[Product]:
         return Product.objects.filter(id__in=product_ids, status=ProductStatus.ACTIVE)
 
+    @staticmethod
+    @transaction.atomic
+    def bulk_update(changes: List[ProductChange], chunk_size: int) -> Set[int]:
+        # 같은 product_id 가 여러 번 오면 마지막 변경을 사용
+        values: Dict[int, Tuple[int | None, str | None]] = {
+            change["product_id"]: (
+                change["price"],
+                change["status"].value if change["status"] else None,
+            )
+            for change in changes
+        }
+        rows: List[Tuple[int, int | None, str | None]] = [
+            (product_id, price, status)
+            for product_id, (price, status) in values.items()
+        ]
+
+        updated_ids: Set[int] = set()
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start : start + chunk_size]
+                cursor.execute(
+                    f"""
+                    UPDATE product p
+                    SET price = coalesce(v.price, p.price),
+                        status = coalesce(v.status, p.status)
+                    FROM (
+                        VALUES {", ".join(["(%s::bigint, %s::integer, %s::varchar)"] * len(chunk))}
+                    ) AS v(id, price, status)
+                    WHERE p.id = v.id
+                    RETURNING p.id
+                    """,
+                    [param for row in chunk for param in row],
+                )
+                updated_ids.update(product_id for (product_id,) in cursor.fetchall())
+
+        # 상품 단위 signal 대신 batch 전체에 대해 한 번만 listing cache 를 무효화
+        if updated_ids:
+            transaction.on_commit(product_list_cache.invalidate)
+        return updated_ids
+
 
 product_service = ProductService()
@@ -0,0 +1,228 @@
+import time
+from enum import Enum
+from typing import IO, List, TypedDict
+
+from django.db import connection, transaction
+
+from product.models import ProductStatus
+from product.service.product import product_list_cache
+
+
+class ProductImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ProductImportError(TypedDict):
+    row: int
+    sku: str | None
+    error: str
+
+
+class ProductImportResult(TypedDict):
+    total: int
+    inserted: int
+    updated: int
+    rejected: int
+    unresolved_categories: int
+    seconds: float
+    rows_per_second: float
+    errors: List[ProductImportError]
+
+
+STAGING_TABLE = "product_import_staging"
+STAGING_COLUMNS = "sku, name, price, status, category, tags"
+
+
+class ProductImportService:
+    """
+    공급사 catalog(csv: sku,name,price,status,category,tags 헤더 / ndjson: 같은 key) 를
+    COPY 로 staging table 에 적재한 뒤, 검증과 category 매핑을 set 단위로 처리하고
+    sku 기준으로 batch 마다 별도 transaction 에서 product 에 upsert 한다.
+    """
+
+    MAX_REPORTED_ERRORS = 100
+
+    @staticmethod
+    def _create_staging_table(cursor) -> None:
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        cursor.execute(
+            f"""
+            CREATE TEMP TABLE {STAGING_TABLE} (
+                row_id bigserial PRIMARY KEY,
+                sku text,
+                name text,
+                price text,
+                status text,
+                category text,
+                tags text,
+                category_id bigint,
+                error text
+            )
+            """
+        )
+
+    @staticmethod
+    def _copy(cursor, file: IO, import_format: ProductImportFormat) -> None:
+        if import_format == ProductImportFormat.CSV:
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} ({STAGING_COLUMNS}) "
+                "FROM STDIN WITH (FORMAT csv, HEADER true)",
+                file,
+            )
+            return
+
+        # 한 줄을 그대로 jsonb 로 읽기 위해 데이터에 나오지 않는 문자를 quote/delimiter 로 사용
+        cursor.execute("CREATE TEMP TABLE product_import_raw (doc jsonb)")
+        cursor.copy_expert(
+            "COPY product_import_raw (doc) FROM STDIN "
+            "WITH (FORMAT csv, QUOTE e'\\x01', DELIMITER e'\\x02')",
+            file,
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {STAGING_TABLE} ({STAGING_COLUMNS})
+            SELECT doc->>'sku', doc->>'name', doc->>'price', doc->>'status',
+                   doc->>'category', doc->>'tags'
+            FROM product_import_raw
+            """
+        )
+        cursor.execute("DROP TABLE product_import_raw")
+
+    @staticmethod
+    def _validate(cursor) -> None:
+        cursor.execute(
+            f"""
+            UPDATE {STAGING_TABLE}
+            SET status = coalesce(nullif(status, ''), %s),
+                tags = coalesce(tags, '')
+            """,
+            [ProductStatus.ACTIVE.value],
+        )
+        cursor.execute(
+            f"""
+            UPDATE {STAGING_TABLE}
+            SET error = CASE
+                WHEN coalesce(sku, '') = '' THEN 'sku is required'
+                WHEN length(sku) > 64 THEN 'sku is too long'
+                WHEN coalesce(name, '') = '' THEN 'name is required'
+                WHEN length(name) > 128 THEN 'name is too long'
+                WHEN coalesce(price, '') !~ '^[0-9]{{1,9}}$' THEN 'invalid price'
+                WHEN status <> ALL(%s) THEN 'invalid status'
+                WHEN length(tags) > 128 THEN 'tags is too long'
+            END
+            """,
+            [[status.value for status in ProductStatus]],
+        )
+
+    @staticmethod
+    def _resolve_categories(cursor) -> None:
+        # category name 은 unique 가 아니므로 같은 이름이면 먼저 만들어진 category 로 매핑
+        cursor.execute(
+            f"""
+            UPDATE {STAGING_TABLE} s
+            SET category_id = c.id
+            FROM (
+                SELECT DISTINCT ON (name) id, name FROM category ORDER BY name, id
+            ) c
+            WHERE c.name = s.category
+            """
+        )
+
+    @staticmethod
+    def _upsert_batch(cursor, start_row_id: int, end_row_id: int) -> List[bool]:
+        # 같은 batch 안에서 sku 가 중복되면 마지막 row 를 사용
+        # search_vector 는 search_vector_trigger 가 INSERT 와 tags UPDATE 때 계산하므로 여기서 계산하지 않는다
+        cursor.execute(
+            f"""
+            INSERT INTO product (sku, name, price, status, category_id, tags)
+            SELECT DISTINCT ON (sku)
+                sku, name, price::integer, status, category_id, tags
+            FROM {STAGING_TABLE}
+            WHERE row_id >= %s AND row_id < %s AND error IS NULL
+            ORDER BY sku, row_id DESC
+            ON CONFLICT (sku) DO UPDATE SET
+                name = EXCLUDED.name,
+                price = EXCLUDED.price,
+                status = EXCLUDED.status,
+                category_id = EXCLUDED.category_id,
+                tags = EXCLUDED.tags
+            RETURNING (xmax = 0)
+            """,
+            [start_row_id, end_row_id],
+        )
+        return [inserted for (inserted,) in cursor.fetchall()]
+
+    def import_products(
+        self, file: IO, import_format: ProductImportFormat, batch_size: int
+    ) -> ProductImportResult:
+        start: float = time.perf_counter()
+        with connection.cursor() as cursor:
+            self._create_staging_table(cursor)
+            try:
+                with transaction.atomic():
+                    self._copy(cursor=cursor, file=file, import_format=import_format)
+                    self._validate(cursor)
+                    self._resolve_categories(cursor)
+
+                cursor.execute(
+                    f"""
+                    SELECT count(*),
+                           count(*) FILTER (WHERE error IS NOT NULL),
+                           count(*) FILTER (
+                               WHERE error IS NULL
+                               AND coalesce(category, '') <> ''
+                               AND category_id IS NULL
+                           ),
+                           coalesce(max(row_id), 0)
+                    FROM {STAGING_TABLE}
+                    """
+                )
+                total, rejected, unresolved_categories, max_row_id = cursor.fetchone()
+                cursor.execute(
+                    f"""
+                    SELECT row_id, sku, error FROM {STAGING_TABLE}
+                    WHERE error IS NOT NULL ORDER BY row_id LIMIT %s
+                    """,
+                    [self.MAX_REPORTED_ERRORS],
+                )
+                errors: List[ProductImportError] = [
+                    {"row": row_id, "sku": sku, "error": error}
+                    for row_id, sku, error in cursor.fetchall()
+                ]
+
+                inserted: int = 0
+                updated: int = 0
+                for start_row_id in range(1, max_row_id + 1, batch_size):
+                    # batch 별로 commit 해서 product row lock 을 오래 잡지 않는다
+                    with transaction.atomic():
+                        results: List[bool] = self._upsert_batch(
+                            cursor=cursor,
+                            start_row_id=start_row_id,
+                            end_row_id=start_row_id + batch_size,
+                        )
+                    inserted += sum(results)
+                    updated += len(results) - sum(results)
+            finally:
+                cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+
+            # 대량 변경 후 planner 통계를 갱신
+            cursor.execute("ANALYZE product")
+
+        # bulk SQL 은 post_save signal 을 거치지 않으므로 listing cache 를 한 번 무효화
+        transaction.on_commit(product_list_cache.invalidate)
+
+        seconds: float = time.perf_counter() - start
+        return {
+            "total": total,
+            "inserted": inserted,
+            "updated": updated,
+            "rejected": rejected,
+            "unresolved_categories": unresolved_categories,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(total / seconds, 1) if seconds else 0.0,
+            "errors": errors,
+        }
+
+
+product_import_service = ProductImportService()
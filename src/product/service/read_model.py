@@ -0,0 +1,129 @@
+from collections import defaultdict
+from typing import Dict, List
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from ninja.renderers import JSONRenderer
+
+from config.compression import choose_encoding, precompress
+from config.response import response
+from config.shared_store import SharedReadModelStore
+from product.models import Category, Product, ProductStatus
+from product.response import (
+    CategoryChildResponse,
+    CategoryListResponse,
+    CategoryParentResponse,
+    ProductDetailResponse,
+    ProductListResponse,
+)
+from product.service.product import ProductValues
+
+
+read_model_store = SharedReadModelStore(
+    path=settings.READ_MODEL_PATH,
+    check_interval=settings.READ_MODEL_CHECK_INTERVAL,
+)
+
+
+class ReadModelService:
+    CATEGORIES_KEY = "categories"
+    ALL_PRODUCTS_KEY = "products:all"
+
+    @staticmethod
+    def category_products_key(category_id: int) -> str:
+        return f"products:category:{category_id}"
+
+    @staticmethod
+    def encoded_key(key: str, encoding: str) -> str:
+        return f"{key}|{encoding}"
+
+    @staticmethod
+    def _render(data) -> bytes:
+        # ninja 응답과 같은 JSON 을 만들어서 그대로 응답 body 로 사용
+        return JSONRenderer().render(None, response(data), response_status=200).encode()
+
+    def build(self) -> Dict[str, bytes]:
+        categories: List[Category] = list(Category.objects.order_by("id"))
+        children: Dict[int | None, List[Category]] = defaultdict(list)
+        for category in categories:
+            children[category.parent_id].append(category)
+
+        products_by_category: Dict[int | None, List[ProductValues]] = defaultdict(list)
+        all_products: List[ProductValues] = []
+        for product in (
+            Product.objects.filter(status=ProductStatus.ACTIVE)
+            .order_by("id")
+            .values("id", "name", "price", "category_id")
+        ):
+            category_id: int | None = product.pop("category_id")
+            products_by_category[category_id].append(product)
+            all_products.append(product)
+
+        entries: Dict[str, bytes] = {
+            self.CATEGORIES_KEY: self._render(
+                CategoryListResponse(
+                    categories=[
+                        CategoryParentResponse(
+                            id=parent.id,
+                            name=parent.name,
+                            children=[
+                                CategoryChildResponse(id=child.id, name=child.name)
+                                for child in children[parent.id]
+                            ],
+                        )
+                        for parent in children[None]
+                    ]
+                ).dict(exclude_none=True)
+            ),
+            self.ALL_PRODUCTS_KEY: self._render(
+                ProductListResponse(
+                    products=[ProductDetailResponse(**p) for p in all_products]
+                ).dict(exclude_none=True)
+            ),
+        }
+        for category in categories:
+            # product_list_handler 와 같이 하위 category 의 상품을 포함
+            page: List[ProductValues] = products_by_category[category.id] + [
+                product
+                for child in children[category.id]
+                for product in products_by_category[child.id]
+            ]
+            entries[self.category_products_key(category.id)] = self._render(
+                ProductListResponse(
+                    products=[ProductDetailResponse(**p) for p in page]
+                ).dict(exclude_none=True)
+            )
+        return entries
+
+    def refresh(self) -> int:
+        entries: Dict[str, bytes] = self.build()
+        # 요청마다 압축하지 않도록 encoding 별 압축본을 함께 발행
+        for key, payload in list(entries.items()):
+            for encoding, compressed in precompress(payload).items():
+                entries[self.encoded_key(key, encoding)] = compressed
+        return read_model_store.publish(entries=entries)
+
+    @staticmethod
+    def get(key: str) -> memoryview | None:
+        return read_model_store.get(key)
+
+    def response(self, request: HttpRequest, key: str) -> HttpResponse | None:
+        if (payload := self.get(key)) is None:
+            return None
+
+        content_encoding: str | None = None
+        if (
+            encoding := choose_encoding(request.headers.get("Accept-Encoding", ""))
+        ) and (compressed := self.get(self.encoded_key(key, encoding))) is not None:
+            payload, content_encoding = compressed, encoding
+
+        http_response = HttpResponse(payload, content_type="application/json")
+        if content_encoding:
+            http_response["Content-Encoding"] = content_encoding
+        # msgpack 요청은 read model 을 사용하지 않으므로 shared cache 가 Accept 별로 구분해야 한다
+        patch_vary_headers(http_response, ("Accept", "Accept-Encoding"))
+        return http_response
+
+
+read_model_service = ReadModelService()
@@ -0,0 +1,302 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from scipy import sparse
+
+from product.models import OrderStatus
+
+
+# 한 주문에 서로 다른 상품이 2 개 이상인 결제 주문만 co-occurrence 에 기여한다
+ORDER_PRODUCTS_SQL = """
+SELECT array_agg(DISTINCT l.product_id)
+FROM "order" o
+JOIN order_line l ON l.order_id = o.id AND l.created_at = o.created_at
+WHERE o.status = %s AND o.created_at >= %s AND o.created_at < %s
+GROUP BY o.id, o.created_at
+HAVING count(DISTINCT l.product_id) > 1
+"""
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class Recommendation(NamedTuple):
+    product_id: int
+    count: int
+
+
+class RecommendationState(NamedTuple):
+    # 전체 co-occurrence count(top-N 으로 자르기 전)와 집계에 포함된 주문 created_at 상한
+    counts: sparse.csr_matrix
+    watermark: datetime
+
+
+def co_occurrence(orders: List[List[int]], size: int) -> sparse.csr_matrix:
+    """
+    주문 x 상품 incidence matrix B 로 B^T B 를 계산한다. 대각 성분(자기 자신)은 제외
+    """
+    lengths = np.fromiter((len(products) for products in orders), dtype=np.int64)
+    incidence = sparse.csr_matrix(
+        (
+            np.ones(lengths.sum(), dtype=np.int32),
+            np.fromiter(
+                (product_id for products in orders for product_id in products),
+                dtype=np.int64,
+            ),
+            np.concatenate(([0], np.cumsum(lengths))),
+        ),
+        shape=(len(orders), size),
+    )
+    counts = (incidence.T @ incidence).tocsr()
+    counts.setdiag(0)
+    counts.eliminate_zeros()
+    return counts
+
+
+def top_n(counts: sparse.csr_matrix, n: int) -> sparse.csr_matrix:
+    """
+    상품(row) 마다 count 가 큰 순서(같으면 product_id 순서)로 n 개만 남긴다
+    """
+    counts = counts.tocsr()
+    counts.sort_indices()
+    rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    order = np.lexsort((counts.indices, -counts.data, rows))
+    ranks = np.arange(len(order)) - counts.indptr[rows[order]]
+    keep = order[ranks < n]
+    kept_rows = rows[keep]
+    return sparse.csr_matrix(
+        (counts.data[keep], counts.indices[keep], _indptr(kept_rows, counts.shape[0])),
+        shape=counts.shape,
+    )
+
+
+def _indptr(rows: np.ndarray, size: int) -> np.ndarray:
+    return np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=size))))
+
+
+class RecommendationSnapshot(NamedTuple):
+    inode: int
+    indptr: np.ndarray
+    indices: np.ndarray
+    counts: np.ndarray
+
+
+class RecommendationStore:
+    """
+    상품별 top-N 이웃을 CSR(indptr | indices | counts) 배열로 하나의 파일에 쓰고,
+    worker 는 mmap 한 buffer 를 그대로 numpy 배열로 읽는다.
+
+    file layout: header(magic, row 수, nnz) | indptr(int64) | indices(int32) | counts(int32)
+    top-N 으로 자르기 전 전체 count 는 incremental update 를 위해 state 파일(.state.npz)에 둔다.
+    """
+
+    MAGIC = b"FBT1"
+    HEADER = struct.Struct("<4sQQ")
+
+    def __init__(self, path: str | None, check_interval: float):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: RecommendationSnapshot | None = None
+        self._checked_at: float = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    @property
+    def state_path(self) -> str:
+        return f"{self.path}.state.npz"
+
+    def _replace(self, write, prefix: str, target: str) -> None:
+        directory: str = os.path.dirname(target) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=prefix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load_state(self) -> RecommendationState | None:
+        try:
+            with np.load(self.state_path) as state:
+                counts = sparse.csr_matrix(
+                    (state["data"], state["indices"], state["indptr"]),
+                    shape=tuple(state["shape"]),
+                )
+                watermark = EPOCH + timedelta(microseconds=int(state["watermark"]))
+        except FileNotFoundError:
+            return None
+        return RecommendationState(counts=counts, watermark=watermark)
+
+    def publish(self, state: RecommendationState, n: int) -> None:
+        # state 를 먼저 교체해야 중간에 실패해도 같은 주문이 두 번 집계되지 않는다
+        counts = state.counts.tocsr()
+        self._replace(
+            lambda f: np.savez(
+                f,
+                data=counts.data,
+                indices=counts.indices,
+                indptr=counts.indptr,
+                shape=np.array(counts.shape),
+                watermark=np.int64(
+                    (state.watermark - EPOCH) // timedelta(microseconds=1)
+                ),
+            ),
+            prefix=".recommendation_state.",
+            target=self.state_path,
+        )
+
+        top = top_n(counts, n=n)
+
+        def write(f) -> None:
+            f.write(self.HEADER.pack(self.MAGIC, top.shape[0], top.nnz))
+            f.write(top.indptr.astype("<i8").tobytes())
+            f.write(top.indices.astype("<i4").tobytes())
+            f.write(top.data.astype("<i4").tobytes())
+
+        self._replace(write, prefix=".recommendation.", target=self.path)
+
+    def _load(self, inode: int) -> RecommendationSnapshot:
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, rows, nnz = self.HEADER.unpack_from(mapped)
+        if magic != self.MAGIC:
+            raise ValueError(f"invalid recommendation file: {self.path}")
+        offset: int = self.HEADER.size
+        indptr = np.frombuffer(mapped, dtype="<i8", count=rows + 1, offset=offset)
+        offset += indptr.nbytes
+        indices = np.frombuffer(mapped, dtype="<i4", count=nnz, offset=offset)
+        offset += indices.nbytes
+        counts = np.frombuffer(mapped, dtype="<i4", count=nnz, offset=offset)
+        return RecommendationSnapshot(
+            inode=inode, indptr=indptr, indices=indices, counts=counts
+        )
+
+    def snapshot(self) -> RecommendationSnapshot | None:
+        if not self.enabled:
+            return None
+
+        now: float = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._snapshot
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                inode: int = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                self._snapshot = None
+                return None
+            if not self._snapshot or self._snapshot.inode != inode:
+                self._snapshot = self._load(inode=inode)
+            return self._snapshot
+
+    def get(self, product_id: int, limit: int) -> List[Recommendation]:
+        if not (snapshot := self.snapshot()) or not (
+            0 <= product_id < len(snapshot.indptr) - 1
+        ):
+            return []
+        start, end = snapshot.indptr[product_id], snapshot.indptr[product_id + 1]
+        end = min(end, start + limit)
+        return [
+            Recommendation(product_id=int(neighbor), count=int(count))
+            for neighbor, count in zip(
+                snapshot.indices[start:end], snapshot.counts[start:end]
+            )
+        ]
+
+
+recommendation_store = RecommendationStore(
+    path=settings.RECOMMENDATION_PATH,
+    check_interval=settings.RECOMMENDATION_CHECK_INTERVAL,
+)
+
+
+class RecommendationService:
+    @staticmethod
+    def cutoff() -> datetime:
+        """
+        confirm_order 의 pending -> paid UPDATE 는 created_at 이 만료 시간 안인 주문만 바꾸므로
+        cutoff 이전 주문은 새로 결제되지 않는다.
+        guard 를 통과한 뒤 아직 commit 되지 않은 결제가 남아 있을 수 있어서 margin 만큼 더 늦춘다.
+        """
+        return timezone.now() - timedelta(
+            seconds=settings.ORDER_PENDING_EXPIRY_SECONDS
+            + settings.RECOMMENDATION_CUTOFF_MARGIN_SECONDS
+        )
+
+    @staticmethod
+    def _order_products(
+        start: datetime, end: datetime, chunk_size: int
+    ) -> Iterator[List[List[int]]]:
+        # server side cursor 로 주문 chunk 단위로 읽어서 전체 주문을 memory 에 올리지 않는다
+        with transaction.atomic(), connection.chunked_cursor() as cursor:
+            cursor.execute(ORDER_PRODUCTS_SQL, [OrderStatus.PAID.value, start, end])
+            while rows := cursor.fetchmany(chunk_size):
+                yield [products for (products,) in rows]
+
+    @staticmethod
+    def _size() -> int:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT coalesce(max(id), 0) + 1 FROM product")
+            (size,) = cursor.fetchone()
+        return size
+
+    def accumulate(
+        self, state: RecommendationState, end: datetime, chunk_size: int
+    ) -> Tuple[RecommendationState, int]:
+        """
+        [state.watermark, end) 에 생성된 결제 주문의 co-occurrence 를 state 에 더한다
+        """
+        size: int = max(self._size(), state.counts.shape[0])
+        counts = state.counts.copy()
+        counts.resize((size, size))
+
+        orders: int = 0
+        for chunk in self._order_products(
+            start=state.watermark, end=end, chunk_size=chunk_size
+        ):
+            counts = counts + co_occurrence(chunk, size=size)
+            orders += len(chunk)
+        return RecommendationState(counts=counts.tocsr(), watermark=end), orders
+
+    def update(self, chunk_size: int, full: bool = False) -> int:
+        """
+        이전 state 이후의 결제 주문만 반영한다. state 가 없거나 full 이면 처음부터 다시 만든다
+        """
+        state: RecommendationState | None = (
+            None if full else recommendation_store.load_state()
+        )
+        if state is None:
+            state = RecommendationState(
+                counts=sparse.csr_matrix((0, 0), dtype=np.int32), watermark=EPOCH
+            )
+        state, orders = self.accumulate(
+            state=state, end=self.cutoff(), chunk_size=chunk_size
+        )
+        recommendation_store.publish(state=state, n=settings.RECOMMENDATION_TOP_N)
+        return orders
+
+    @staticmethod
+    def recommendations(product_id: int, limit: int) -> List[Recommendation]:
+        return recommendation_store.get(product_id=product_id, limit=limit)
+
+
+recommendation_service = RecommendationService()
@@ -0,0 +1,244 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Tuple, TypedDict
+
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from product.models import (
+    CategorySalesDaily,
+    OrderStatus,
+    OutboxEvent,
+    OutboxEventType,
+    ProductSalesDaily,
+)
+from product.service.outbox import outbox_service
+
+
+class ProductSales(TypedDict):
+    product_id: int
+    quantity: int
+    revenue: int
+    order_count: int
+
+
+class CategorySales(TypedDict):
+    category_id: int | None
+    quantity: int
+    revenue: int
+    order_count: int
+
+
+class DailySales(TypedDict):
+    day: date
+    quantity: int
+    revenue: int
+    order_count: int
+
+
+# order line 변경분(sign: 결제 +1, 취소 -1)을 일별 상품/category rollup 에 더한다.
+# 여러 relay worker 가 같은 row 를 갱신할 때 deadlock 이 나지 않도록 key 순서로 upsert
+ROLLUP_SQL = """
+WITH lines AS (
+    {lines_query}
+), product_rollup AS (
+    INSERT INTO product_sales_daily (day, product_id, quantity, revenue, order_count)
+    SELECT day, product_id, sum(quantity), sum(revenue), sum(sign)
+    FROM lines
+    GROUP BY day, product_id
+    ORDER BY day, product_id
+    ON CONFLICT (day, product_id) DO UPDATE SET
+        quantity = product_sales_daily.quantity + EXCLUDED.quantity,
+        revenue = product_sales_daily.revenue + EXCLUDED.revenue,
+        order_count = product_sales_daily.order_count + EXCLUDED.order_count
+)
+INSERT INTO category_sales_daily (day, category_id, quantity, revenue, order_count)
+SELECT day, category_id, sum(quantity), sum(revenue), sum(sign)
+FROM (
+    -- 한 주문에 같은 category 상품이 여러 개 있어도 주문 수는 한 번만 센다
+    SELECT day, category_id, order_id, sign,
+           sum(quantity) AS quantity, sum(revenue) AS revenue
+    FROM lines
+    GROUP BY day, category_id, order_id, sign
+) per_order
+GROUP BY day, category_id
+ORDER BY day, category_id
+ON CONFLICT (day, category_id) DO UPDATE SET
+    quantity = category_sales_daily.quantity + EXCLUDED.quantity,
+    revenue = category_sales_daily.revenue + EXCLUDED.revenue,
+    order_count = category_sales_daily.order_count + EXCLUDED.order_count
+"""
+
+LINE_COLUMNS = """
+    (o.created_at AT TIME ZONE 'UTC')::date AS day,
+    l.product_id, p.category_id, l.order_id, o.sign,
+    o.sign * l.quantity AS quantity,
+    o.sign * round(l.price * l.quantity * l.discount_ratio)::bigint AS revenue
+"""
+
+CHANGED_LINES_QUERY = f"""
+    SELECT {LINE_COLUMNS}
+    FROM (VALUES {{values}}) AS o(order_id, created_at, sign)
+    JOIN order_line l ON l.order_id = o.order_id AND l.created_at = o.created_at
+    JOIN product p ON p.id = l.product_id
+"""
+
+# 아직 relay 되지 않은 결제/취소 event 는 order 상태에는 반영되었지만 rollup 에는 더해지지 않았다.
+# rebuild 는 (현재 결제 상태 - 미반영 event) 를 주문별 sign 으로 계산해서, 이후 relay 가 더해도 중복되지 않게 한다.
+# order 와 outbox_event 를 한 statement 에서 읽으므로 같이 commit 된 결제/취소는 함께 보이거나 함께 안 보인다
+RELAYED_ORDERS_QUERY = """
+    SELECT order_id, created_at, sum(sign)::integer
+    FROM (
+        SELECT id AS order_id, created_at, 1 AS sign FROM "order"
+        WHERE status = %s AND created_at >= %s AND created_at < %s
+        UNION ALL
+        SELECT (payload->>'order_id')::bigint, (payload->>'created_at')::timestamptz,
+               CASE WHEN event_type = %s THEN -1 ELSE 1 END
+        FROM outbox_event
+        WHERE (event_type = %s OR (event_type = %s AND (payload->>'refund')::bigint > 0))
+          AND (payload->>'created_at')::timestamptz >= %s
+          AND (payload->>'created_at')::timestamptz < %s
+    ) changes
+    GROUP BY order_id, created_at
+    HAVING sum(sign) <> 0
+"""
+
+REBUILD_LINES_QUERY = f"""
+    SELECT {LINE_COLUMNS}
+    FROM ({RELAYED_ORDERS_QUERY}) AS o(order_id, created_at, sign)
+    JOIN order_line l ON l.order_id = o.order_id AND l.created_at = o.created_at
+    JOIN product p ON p.id = l.product_id
+"""
+
+
+def relayed_orders_params(start: datetime, end: datetime) -> List:
+    paid: str = OutboxEventType.ORDER_PAID.value
+    cancelled: str = OutboxEventType.ORDER_CANCELLED.value
+    return [OrderStatus.PAID.value, start, end, paid, paid, cancelled, start, end]
+
+
+TOTALS = {
+    "total_quantity": Sum("quantity"),
+    "total_revenue": Sum("revenue"),
+    "total_order_count": Sum("order_count"),
+}
+
+
+OrderChange = Tuple[int, datetime, int]
+
+
+def order_changes(events: List[OutboxEvent]) -> List[OrderChange]:
+    """
+    결제/취소 event 를 (order_id, order created_at, sign) 으로 변환한다. 결제 +1, 취소 -1
+    """
+    changes: List[OrderChange] = []
+    for event in events:
+        if event.event_type == OutboxEventType.ORDER_PAID:
+            sign: int = 1
+        elif event.event_type == OutboxEventType.ORDER_CANCELLED and event.payload.get(
+            "refund"
+        ):
+            # 결제되지 않은 주문의 취소는 집계에 들어간 적이 없다
+            sign = -1
+        else:
+            continue
+        changes.append(
+            (
+                event.payload["order_id"],
+                datetime.fromisoformat(event.payload["created_at"]),
+                sign,
+            )
+        )
+    return changes
+
+
+def order_changes_values(changes: List[OrderChange]) -> str:
+    return ", ".join(["(%s::bigint, %s::timestamptz, %s::integer)"] * len(changes))
+
+
+class SalesRollupSink:
+    """
+    outbox relay 의 transaction 안에서 결제/취소 event 를 rollup 에 반영한다.
+    event 삭제와 rollup 갱신이 같이 commit 되므로 재전송되어도 중복 집계되지 않는다.
+    일자는 주문 생성일(UTC) 기준이다.
+    """
+
+    def send(self, events: List[OutboxEvent]) -> None:
+        if not (changes := order_changes(events)):
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                ROLLUP_SQL.format(
+                    lines_query=CHANGED_LINES_QUERY.format(
+                        values=order_changes_values(changes)
+                    )
+                ),
+                [param for change in changes for param in change],
+            )
+
+
+class SalesReportService:
+    @staticmethod
+    @transaction.atomic
+    def rebuild(start: date, end: date) -> None:
+        """
+        [start, end] 기간의 rollup 을 order/order_line 에서 다시 계산한다. 최초 적재나 복구용
+        """
+        # relay 가 rollup 을 갱신하는 중이면 기다렸다가, rebuild 가 끝날 때까지 멈춘다
+        outbox_service.pause_relay()
+        ProductSalesDaily.objects.filter(day__gte=start, day__lte=end).delete()
+        CategorySalesDaily.objects.filter(day__gte=start, day__lte=end).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                ROLLUP_SQL.format(lines_query=REBUILD_LINES_QUERY),
+                relayed_orders_params(
+                    start=datetime.combine(start, time.min, tzinfo=timezone.utc),
+                    end=datetime.combine(
+                        end + timedelta(days=1), time.min, tzinfo=timezone.utc
+                    ),
+                ),
+            )
+
+    @staticmethod
+    def _totals(rows: List[Dict], key: str) -> List[Dict]:
+        return [
+            {
+                key: row[key],
+                "quantity": row["total_quantity"],
+                "revenue": row["total_revenue"],
+                "order_count": row["total_order_count"],
+            }
+            for row in rows
+        ]
+
+    def top_products(self, start: date, end: date, limit: int) -> List[ProductSales]:
+        # 주문 수와 무관하게 (기간 일수 x 판매된 상품 수) 만큼의 rollup row 만 읽는다
+        return self._totals(
+            rows=ProductSalesDaily.objects.filter(day__gte=start, day__lte=end)
+            .values("product_id")
+            .annotate(**TOTALS)
+            .order_by("-total_revenue", "product_id")[:limit],
+            key="product_id",
+        )
+
+    @staticmethod
+    def product_daily(product_id: int, start: date, end: date) -> List[DailySales]:
+        return list(
+            ProductSalesDaily.objects.filter(
+                product_id=product_id, day__gte=start, day__lte=end
+            )
+            .order_by("day")
+            .values("day", "quantity", "revenue", "order_count")
+        )
+
+    def categories(self, start: date, end: date) -> List[CategorySales]:
+        return self._totals(
+            rows=CategorySalesDaily.objects.filter(day__gte=start, day__lte=end)
+            .values("category_id")
+            .annotate(**TOTALS)
+            .order_by("-total_revenue", "category_id"),
+            key="category_id",
+        )
+
+
+sales_report_service = SalesReportService()
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, List, NamedTuple, Tuple, TypedDict
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+
+from product.models import SlowQuery
+
+
+logger = logging.getLogger(__name__)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER = re.compile(r"%s|\$\d+")
+PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+VALUES_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+WHITESPACE = re.compile(r"\s+")
+LOCKING_CLAUSE = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    literal 과 placeholder 를 ? 로 바꾸고, IN 목록과 multi-row VALUES 를 하나로 접어서
+    값이나 개수만 다른 query 가 같은 문자열이 되게 한다.
+    """
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = PLACEHOLDER.sub("?", sql)
+    sql = NUMBER_LITERAL.sub("?", sql)
+    sql = PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = VALUES_LIST.sub("(...)", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql: str) -> str:
+    return hashlib.blake2b(normalized_sql.encode(), digest_size=8).hexdigest()
+
+
+class SlowQueryEvent(NamedTuple):
+    sql: str
+    params: Any
+    seconds: float
+    route: str
+    seen_at: float
+
+
+class SlowQueryAggregate(TypedDict):
+    sql: str
+    calls: int
+    total_ms: float
+    max_ms: float
+    plan: Any
+    plan_captured_at: datetime | None
+    last_seen: datetime
+
+
+class SlowQueryOrder(str, Enum):
+    TOTAL = "total"
+    MAX = "max"
+    CALLS = "calls"
+
+    @property
+    def ordering(self) -> str:
+        return {
+            SlowQueryOrder.TOTAL: "-total_ms",
+            SlowQueryOrder.MAX: "-max_ms",
+            SlowQueryOrder.CALLS: "-calls",
+        }[self]
+
+
+UPSERT_SQL = """
+INSERT INTO slow_query
+    (fingerprint, route, sql, calls, total_ms, max_ms, plan, plan_captured_at,
+     first_seen, last_seen)
+VALUES {values}
+ON CONFLICT (fingerprint, route) DO UPDATE SET
+    calls = slow_query.calls + EXCLUDED.calls,
+    total_ms = slow_query.total_ms + EXCLUDED.total_ms,
+    max_ms = greatest(slow_query.max_ms, EXCLUDED.max_ms),
+    plan = coalesce(EXCLUDED.plan, slow_query.plan),
+    plan_captured_at = coalesce(EXCLUDED.plan_captured_at, slow_query.plan_captured_at),
+    last_seen = greatest(slow_query.last_seen, EXCLUDED.last_seen)
+"""
+
+
+class SlowQueryLog:
+    """
+    요청 thread 는 threshold 를 넘은 query 를 queue 에 넣기만 하고,
+    background thread 가 fingerprint/route 별로 모아서 flush_interval 마다 slow_query 에 더한다.
+
+    - EXPLAIN ANALYZE 는 query 를 한 번 더 실행하므로 SELECT 만, 같은 key 는 explain_interval 에 한 번만,
+      statement_timeout 을 둔 transaction 안에서 실행하고 rollback 한다.
+      FOR UPDATE/SHARE 처럼 row lock 을 잡는 SELECT 는 실행하지 않는 EXPLAIN 으로 계획만 수집한다.
+    - queue 가 가득 차면 기록을 버려서 요청이 기다리지 않게 한다.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        explain_interval: float,
+        explain_timeout_ms: int,
+        queue_size: int,
+        flush_interval: float,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain_interval = explain_interval
+        self.explain_timeout_ms = explain_timeout_ms
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue[SlowQueryEvent] = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pending: Dict[Tuple[str, str], SlowQueryAggregate] = {}
+        self._explained_at: Dict[Tuple[str, str], float] = {}
+        self.dropped: int = 0
+
+    @classmethod
+    def from_settings(cls) -> "SlowQueryLog":
+        return cls(
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL,
+            explain_timeout_ms=settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+            queue_size=settings.SLOW_QUERY_QUEUE_SIZE,
+            flush_interval=settings.SLOW_QUERY_FLUSH_INTERVAL,
+        )
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="slow-query-log", daemon=True
+            )
+            self._thread.start()
+
+    def record(self, sql: str, params: Any, seconds: float, route: str) -> None:
+        if not self._thread:
+            self.start()
+        try:
+            self._queue.put_nowait(
+                SlowQueryEvent(
+                    sql=sql,
+                    params=params,
+                    seconds=seconds,
+                    route=route,
+                    seen_at=time.time(),
+                )
+            )
+        except queue.Full:
+            self.dropped += 1
+
+    def _explain(self, sql: str, params: Any, analyze: bool) -> Any:
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, true)",
+                    [str(self.explain_timeout_ms)],
+                )
+                options: str = (
+                    "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+                )
+                explain_sql: str = f"EXPLAIN ({options}) {sql}"
+                if params is None:
+                    cursor.execute(explain_sql)
+                else:
+                    cursor.execute(explain_sql, params)
+                (plan,) = cursor.fetchone()
+                transaction.set_rollback(True)
+        except DatabaseError:
+            logger.warning("failed to explain slow query", exc_info=True)
+            return None
+        return json.loads(plan) if isinstance(plan, str) else plan
+
+    def process(self, event: SlowQueryEvent) -> None:
+        normalized: str = normalize_sql(event.sql)
+        key: Tuple[str, str] = (fingerprint(normalized), event.route)
+        seen_at = datetime.fromtimestamp(event.seen_at, tz=timezone.utc)
+        aggregate: SlowQueryAggregate = self._pending.setdefault(
+            key,
+            {
+                "sql": normalized,
+                "calls": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "plan": None,
+                "plan_captured_at": None,
+                "last_seen": seen_at,
+            },
+        )
+        milliseconds: float = event.seconds * 1000
+        aggregate["calls"] += 1
+        aggregate["total_ms"] += milliseconds
+        aggregate["max_ms"] = max(aggregate["max_ms"], milliseconds)
+        aggregate["last_seen"] = max(aggregate["last_seen"], seen_at)
+
+        now: float = time.monotonic()
+        if (
+            normalized.upper().startswith("SELECT")
+            and now - self._explained_at.get(key, -self.explain_interval)
+            >= self.explain_interval
+        ):
+            self._explained_at[key] = now
+            plan = self._explain(
+                sql=event.sql,
+                params=event.params,
+                analyze=not LOCKING_CLAUSE.search(normalized),
+            )
+            if plan is not None:
+                aggregate["plan"] = plan
+                aggregate["plan_captured_at"] = datetime.now(tz=timezone.utc)
+
+    def drain(self, timeout: float = 0) -> None:
+        """
+        timeout 동안 queue 를 처리한다. timeout 이 0 이면 지금 쌓여 있는 만큼만 처리
+        """
+        if not timeout:
+            for _ in range(self._queue.qsize()):
+                try:
+                    self.process(self._queue.get_nowait())
+                except queue.Empty:
+                    return
+            return
+
+        deadline: float = time.monotonic() + timeout
+        # query 가 계속 들어와도 deadline 이 지나면 돌아가서 flush 한다
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                event = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return
+            self.process(event)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        # 여러 worker 가 같은 row 를 갱신해도 deadlock 이 나지 않도록 key 순서로 upsert
+        rows = sorted(self._pending.items())
+        self._pending = {}
+        now = datetime.now(tz=timezone.utc)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                UPSERT_SQL.format(
+                    values=", ".join(
+                        ["(%s, %s, %s, %s, %s, %s, %s::jsonb, %s, %s, %s)"] * len(rows)
+                    )
+                ),
+                [
+                    param
+                    for (query_fingerprint, route), aggregate in rows
+                    for param in (
+                        query_fingerprint,
+                        route,
+                        aggregate["sql"],
+                        aggregate["calls"],
+                        aggregate["total_ms"],
+                        aggregate["max_ms"],
+                        json.dumps(aggregate["plan"])
+                        if aggregate["plan"] is not None
+                        else None,
+                        aggregate["plan_captured_at"],
+                        now,
+                        aggregate["last_seen"],
+                    )
+                ],
+            )
+
+    def _run(self) -> None:
+        while True:
+            self.drain(timeout=self.flush_interval)
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                # thread 가 종료되면 이후 기록이 모두 버려지므로 오류를 남기고 계속한다
+                logger.exception("failed to flush slow queries")
+
+    @staticmethod
+    def top(order: SlowQueryOrder, limit: int) -> List[SlowQuery]:
+        return list(SlowQuery.objects.order_by(order.ordering, "id")[:limit])
+
+
+slow_query_log = SlowQueryLog.from_settings()
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from product.models import Category, Product
+from product.service.product import product_list_cache
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_product_list_cache(sender, **kwargs):
+    # commit 이전에 무효화하면 다른 요청이 변경 전 데이터로 cache 를 다시 채울 수 있다
+    transaction.on_commit(product_list_cache.invalidate)
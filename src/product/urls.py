@@ -1,8 +1,16 @@
-from typing import Dict, List
+from datetime import date, timedelta
+from typing import Dict, List, Set, Tuple
 
 from django.http import HttpRequest
-from ninja import Router
+from django.conf import settings
+from django.utils import timezone
+from ninja import File, Query, Router
+from ninja.files import UploadedFile
+from ninja.decorators import decorate_view
 
+from config.metrics import ORDER_CONFIRM_CONFLICTS
+from config.ratelimit import rate_limit
+from config.renderers import accepts_msgpack
 from config.response import (
     ErrorResponse,
     ObjectResponse,
@@ -11,21 +19,65 @@ from config.response import (
     response,
 )
 from product.exceptions import (
+    CartEmptyException,
+    CartFullException,
+    CartUnavailableProductException,
     OrderAlreadyPaidException,
     OrderInvalidProductException,
+    OrderNotCancellableException,
     OrderNotFoundException,
+    OrderPaymentConfirmFailedException,
+    OrderWriterBusyException,
+    PaymentGatewayUnavailableException,
+    ProductInvalidFieldsException,
+    SalesInvalidDateRangeException,
 )
 from product.models import Category, Order, Product
-from product.request import OrderRequestBody
+from product.request import (
+    CartLineRequestBody,
+    OrderPaymentConfirmRequestBody,
+    OrderRequestBody,
+    ProductBulkUpdateRequestBody,
+)
 from product.response import (
+    CartErrorResponse,
+    CartResponse,
     CategoryListResponse,
+    CategorySalesListResponse,
     OrderDetailResponse,
+    ProductBulkUpdateResponse,
+    ProductDailySalesResponse,
+    ProductImportResponse,
     ProductListResponse,
+    ProductSalesListResponse,
+    RecommendationListResponse,
+    SlowQueryListResponse,
 )
+from product.service.cart import cart_service
 from product.service.category import category_service
 from product.service.order import order_service
-from product.service.product import product_service, ProductValues
-from user.authentication import bearer_auth, AuthRequest
+from product.service.order_writer import order_writer
+from product.service.product import (
+    ProductSort,
+    ProductValues,
+    parse_fields,
+    product_service,
+)
+from product.service.popularity import popular_top_k
+from product.service.product_import import ProductImportFormat, product_import_service
+from product.service.read_model import read_model_service
+from product.service.recommendation import Recommendation, recommendation_service
+from product.service.sales_rollup import sales_report_service
+from product.service.slow_query import SlowQueryOrder, slow_query_log
+from user.authentication import (
+    admin_auth,
+    bearer_auth,
+    token_auth,
+    AuthRequest,
+    TokenAuthRequest,
+    user_rate_limit_key,
+)
+from user.models import ServiceUser
 from user.exceptions import UserPointsNotEnoughException, UserVersionConflictException
 
 
@@ -36,28 +88,136 @@ router = Router(tags=["Products"])
     "",
     response={
         200: ObjectResponse[ProductListResponse],
+        400: ObjectResponse[ErrorResponse],
     },
+    exclude_none=True,
 )
 def product_list_handler(
-    request: HttpRequest, category_id: int | None = None, query: str | None = None
+    request: HttpRequest,
+    category_id: int | None = None,
+    query: str | None = None,
+    min_price: int | None = Query(None, ge=0),
+    max_price: int | None = Query(None, ge=0),
+    sort: ProductSort | None = None,
+    facets: bool = False,
+    # 조건에 맞는 전체 상품 수. 많으면 추정치
+    count: bool = False,
+    fields: str | None = Query(None, description="ex) name,price"),
+    limit: int | None = Query(None, ge=1, le=1000),
 ):
+    try:
+        selected_fields = parse_fields(fields)
+    except ValueError:
+        return 400, error_response(msg=ProductInvalidFieldsException.message)
+
+    # 인기순 첫 page 는 memory 의 category 별 top-K 로 DB 조회 없이 응답
+    if (
+        sort == ProductSort.POPULAR
+        and limit
+        and not (
+            query or min_price is not None or max_price is not None or facets or count
+        )
+        and (
+            popular_products := popular_top_k.get(category_id=category_id, limit=limit)
+        )
+        is not None
+    ):
+        return 200, response(
+            ProductListResponse(
+                products=[
+                    {field: product[field] for field in selected_fields}
+                    for product in popular_products
+                ]
+            )
+        )
+
+    is_default_listing: bool = not (
+        query
+        or min_price is not None
+        or max_price is not None
+        or sort
+        or facets
+        or count
+        or fields
+        or limit
+    )
+    # read model 은 JSON 으로 미리 직렬화되어 있으므로 msgpack 요청은 DB 조회로 처리
+    if (
+        is_default_listing
+        and not accepts_msgpack(request)
+        and (
+            read_model_response := read_model_service.response(
+                request=request,
+                key=read_model_service.category_products_key(category_id=category_id)
+                if category_id
+                else read_model_service.ALL_PRODUCTS_KEY,
+            )
+        )
+    ):
+        return read_model_response
+
+    category_ids: List[int] | None = None
     if query:
-        products: List[ProductValues] = product_service.search_by_query(query=query)
+        products: List[ProductValues] = product_service.search_by_query(
+            query=query,
+            min_price=min_price,
+            max_price=max_price,
+            sort=sort,
+            fields=selected_fields,
+            limit=limit,
+        )
     elif category_id:
         category: Category | None = category_service.get_category_by_id(
             category_id=category_id
         )
         if not category:
-            products = []
-        else:
-            category_ids: List[int] = [category.id] + list(
-                category.children.values_list("id", flat=True)
+            return 200, response(
+                ProductListResponse(
+                    products=[], count={"total": 0, "exact": True} if count else None
+                )
             )
-            products = product_service.filter_by_category_ids(category_ids=category_ids)
+
+        category_ids = [category.id] + list(
+            category.children.values_list("id", flat=True)
+        )
+        products = product_service.filter_by_category_ids(
+            category_ids=category_ids,
+            min_price=min_price,
+            max_price=max_price,
+            sort=sort,
+            fields=selected_fields,
+            limit=limit,
+        )
     else:
-        products = product_service.all_products()
+        products = product_service.all_products(
+            min_price=min_price,
+            max_price=max_price,
+            sort=sort,
+            fields=selected_fields,
+            limit=limit,
+        )
 
-    return 200, response(ProductListResponse(products=products))
+    return 200, response(
+        ProductListResponse(
+            products=products,
+            facets=product_service.facets(
+                category_ids=category_ids,
+                query=query,
+                min_price=min_price,
+                max_price=max_price,
+            )
+            if facets
+            else None,
+            count=product_service.count(
+                category_ids=category_ids,
+                query=query,
+                min_price=min_price,
+                max_price=max_price,
+            )
+            if count
+            else None,
+        )
+    )
 
 
 @router.get(
@@ -67,6 +227,13 @@ def product_list_handler(
     },
 )
 def categories_list_handler(request: HttpRequest):
+    if not accepts_msgpack(request) and (
+        read_model_response := read_model_service.response(
+            request=request, key=read_model_service.CATEGORIES_KEY
+        )
+    ):
+        return read_model_response
+
     return 200, response(
         CategoryListResponse.build(
             categories=category_service.get_parent_categories_with_children()
@@ -74,14 +241,62 @@ def categories_list_handler(request: HttpRequest):
     )
 
 
+@router.get(
+    "/{product_id}/recommendations",
+    response={
+        200: ObjectResponse[RecommendationListResponse],
+    },
+)
+def product_recommendations_handler(
+    request: HttpRequest, product_id: int, limit: int = Query(10, ge=1, le=50)
+):
+    recommendations: List[Recommendation] = recommendation_service.recommendations(
+        product_id=product_id, limit=limit
+    )
+    # 판매 중이 아닌 상품은 제외하고 함께 결제된 주문 수 순서를 유지
+    products: Dict[int, Product] = {
+        product.id: product
+        for product in product_service.filter_by_ids(
+            product_ids=[r.product_id for r in recommendations]
+        )
+    }
+    return 200, response(
+        RecommendationListResponse(
+            products=[
+                {
+                    "id": r.product_id,
+                    "name": products[r.product_id].name,
+                    "price": products[r.product_id].price,
+                    "count": r.count,
+                }
+                for r in recommendations
+                if r.product_id in products
+            ]
+        )
+    )
+
+
+def create_order(
+    user: ServiceUser, products: List[Product], product_id_to_quantity: Dict[int, int]
+) -> Order:
+    return (
+        order_writer if settings.ORDER_GROUP_COMMIT_ENABLED else order_service
+    ).create_order(
+        user=user, products=products, product_id_to_quantity=product_id_to_quantity
+    )
+
+
 @router.post(
     "/orders",
     response={
         201: ObjectResponse[OrderDetailResponse],
         400: ObjectResponse[ErrorResponse],
+        429: ObjectResponse[ErrorResponse],
+        503: ObjectResponse[ErrorResponse],
     },
     auth=bearer_auth,
 )
+@decorate_view(rate_limit(scope="order", key=user_rate_limit_key))
 def order_products_handler(request: AuthRequest, body: OrderRequestBody):
     product_id_to_quantity: Dict[int, int] = body.product_id_to_quantity
     products: List[Product] = product_service.filter_by_ids(
@@ -90,11 +305,97 @@ def order_products_handler(request: AuthRequest, body: OrderRequestBody):
     if len(products) != len(product_id_to_quantity):
         return 400, error_response(msg=OrderInvalidProductException.message)
 
-    order: Order = order_service.create_order(
-        user=request.user,
-        products=products,
-        product_id_to_quantity=product_id_to_quantity,
-    )
+    try:
+        order: Order = create_order(
+            user=request.user,
+            products=products,
+            product_id_to_quantity=product_id_to_quantity,
+        )
+    except OrderWriterBusyException as e:
+        return 503, error_response(msg=e.message)
+    return 201, response({"id": order.id, "total_price": order.total_price})
+
+
+@router.get(
+    "/cart",
+    response={
+        200: ObjectResponse[CartResponse],
+    },
+    auth=token_auth,
+)
+def cart_handler(request: TokenAuthRequest):
+    return 200, response(cart_service.get(user_id=request.user_id))
+
+
+@router.post(
+    "/cart/lines",
+    response={
+        200: ObjectResponse[CartResponse],
+        400: ObjectResponse[ErrorResponse],
+    },
+    auth=token_auth,
+)
+def cart_add_handler(request: TokenAuthRequest, body: CartLineRequestBody):
+    try:
+        cart_service.add(
+            user_id=request.user_id, product_id=body.product_id, quantity=body.quantity
+        )
+    except (CartFullException, OrderInvalidProductException) as e:
+        return 400, error_response(msg=e.message)
+    return 200, response(cart_service.get(user_id=request.user_id))
+
+
+@router.delete(
+    "/cart/lines/{product_id}",
+    response={
+        200: ObjectResponse[CartResponse],
+    },
+    auth=token_auth,
+)
+def cart_remove_handler(request: TokenAuthRequest, product_id: int):
+    cart_service.remove(user_id=request.user_id, product_id=product_id)
+    return 200, response(cart_service.get(user_id=request.user_id))
+
+
+@router.post(
+    "/cart/checkout",
+    response={
+        201: ObjectResponse[OrderDetailResponse],
+        400: ObjectResponse[CartErrorResponse],
+        429: ObjectResponse[ErrorResponse],
+        503: ObjectResponse[ErrorResponse],
+    },
+    auth=bearer_auth,
+)
+@decorate_view(rate_limit(scope="order", key=user_rate_limit_key))
+def cart_checkout_handler(request: AuthRequest):
+    # cart 를 먼저 비워서 동시에 checkout 해도 주문이 한 번만 생성되고, 실패하면 되돌린다
+    if not (items := cart_service.pop(user_id=request.user.id)):
+        return 400, error_response(msg=CartEmptyException.message)
+
+    try:
+        products: List[Product] = product_service.filter_by_ids(product_ids=list(items))
+        if len(products) != len(items):
+            # 어떤 상품 때문에 거절되었는지 알려서 cart 에서 삭제할 수 있게 한다
+            cart_service.restore(user_id=request.user.id, items=items)
+            return 400, response(
+                {
+                    "message": CartUnavailableProductException.message,
+                    "product_ids": sorted(
+                        set(items) - {product.id for product in products}
+                    ),
+                }
+            )
+
+        order: Order = create_order(
+            user=request.user, products=products, product_id_to_quantity=items
+        )
+    except OrderWriterBusyException as e:
+        cart_service.restore(user_id=request.user.id, items=items)
+        return 503, error_response(msg=e.message)
+    except Exception:
+        cart_service.restore(user_id=request.user.id, items=items)
+        raise
     return 201, response({"id": order.id, "total_price": order.total_price})
 
 
@@ -105,20 +406,33 @@ def order_products_handler(request: AuthRequest, body: OrderRequestBody):
         400: ObjectResponse[ErrorResponse],
         404: ObjectResponse[ErrorResponse],
         409: ObjectResponse[ErrorResponse],
+        429: ObjectResponse[ErrorResponse],
+        503: ObjectResponse[ErrorResponse],
     },
     auth=bearer_auth,
 )
-def confirm_order_payment_handler(request: AuthRequest, order_id: int):
-    if not (order := Order.objects.filter(id=order_id, user=request.user).first()):
+@decorate_view(rate_limit(scope="order", key=user_rate_limit_key))
+def confirm_order_payment_handler(
+    request: AuthRequest, order_id: int, body: OrderPaymentConfirmRequestBody
+):
+    if not (
+        order := order_service.get_user_order(user=request.user, order_id=order_id)
+    ):
         return 404, error_response(msg=OrderNotFoundException.message)
 
     try:
-        order_service.confirm_order(user_id=request.user.id, order=order)
-    except OrderAlreadyPaidException as e:
+        order_service.confirm_order(
+            user_id=request.user.id, order=order, payment_key=body.payment_key
+        )
+    except (OrderAlreadyPaidException, OrderPaymentConfirmFailedException) as e:
         return 400, error_response(msg=e.message)
+    except PaymentGatewayUnavailableException as e:
+        return 503, error_response(msg=e.message)
     except UserPointsNotEnoughException as e:
+        ORDER_CONFIRM_CONFLICTS.labels(version="v1", reason="points_not_enough").inc()
         return 409, error_response(msg=e.message)
     except UserVersionConflictException as e:
+        ORDER_CONFIRM_CONFLICTS.labels(version="v1", reason="version_conflict").inc()
         return 409, error_response(msg=e.message)
 
     return 200, response(OkResponse())
@@ -131,20 +445,217 @@ def confirm_order_payment_handler(request: AuthRequest, order_id: int):
         400: ObjectResponse[ErrorResponse],
         404: ObjectResponse[ErrorResponse],
         409: ObjectResponse[ErrorResponse],
+        429: ObjectResponse[ErrorResponse],
+        503: ObjectResponse[ErrorResponse],
     },
     auth=bearer_auth,
 )
-def confirm_order_payment_handler_v2(request: AuthRequest, order_id: int):
-    if not (order := Order.objects.filter(id=order_id, user=request.user).first()):
+@decorate_view(rate_limit(scope="order", key=user_rate_limit_key))
+def confirm_order_payment_handler_v2(
+    request: AuthRequest, order_id: int, body: OrderPaymentConfirmRequestBody
+):
+    if not (
+        order := order_service.get_user_order(user=request.user, order_id=order_id)
+    ):
         return 404, error_response(msg=OrderNotFoundException.message)
 
     try:
-        order_service.confirm_order_v2(user_id=request.user.id, order=order)
-    except OrderAlreadyPaidException as e:
+        order_service.confirm_order_v2(
+            user_id=request.user.id, order=order, payment_key=body.payment_key
+        )
+    except (OrderAlreadyPaidException, OrderPaymentConfirmFailedException) as e:
         return 400, error_response(msg=e.message)
+    except PaymentGatewayUnavailableException as e:
+        return 503, error_response(msg=e.message)
     except UserPointsNotEnoughException as e:
+        ORDER_CONFIRM_CONFLICTS.labels(version="v2", reason="points_not_enough").inc()
+        return 409, error_response(msg=e.message)
+    except UserVersionConflictException as e:
+        ORDER_CONFIRM_CONFLICTS.labels(version="v2", reason="version_conflict").inc()
         return 409, error_response(msg=e.message)
+
+    return 200, response(OkResponse())
+
+
+@router.post(
+    "/orders/{order_id}/cancel",
+    response={
+        200: ObjectResponse[OkResponse],
+        400: ObjectResponse[ErrorResponse],
+        404: ObjectResponse[ErrorResponse],
+        409: ObjectResponse[ErrorResponse],
+        429: ObjectResponse[ErrorResponse],
+    },
+    auth=bearer_auth,
+)
+@decorate_view(rate_limit(scope="order", key=user_rate_limit_key))
+def cancel_order_handler(request: AuthRequest, order_id: int):
+    if not (
+        order := order_service.get_user_order(user=request.user, order_id=order_id)
+    ):
+        return 404, error_response(msg=OrderNotFoundException.message)
+
+    try:
+        order_service.cancel_order(user_id=request.user.id, order=order)
+    except OrderNotCancellableException as e:
+        return 400, error_response(msg=e.message)
     except UserVersionConflictException as e:
         return 409, error_response(msg=e.message)
 
     return 200, response(OkResponse())
+
+
+@router.post(
+    "/admin/import",
+    response={
+        200: ObjectResponse[ProductImportResponse],
+    },
+    auth=admin_auth,
+)
+def product_import_handler(
+    request: HttpRequest,
+    catalog: UploadedFile = File(...),
+    format: ProductImportFormat = ProductImportFormat.CSV,
+    batch_size: int = settings.PRODUCT_IMPORT_BATCH_SIZE,
+):
+    return 200, response(
+        product_import_service.import_products(
+            file=catalog, import_format=format, batch_size=batch_size
+        )
+    )
+
+
+@router.post(
+    "/admin/bulk-update",
+    response={
+        200: ObjectResponse[ProductBulkUpdateResponse],
+    },
+    auth=admin_auth,
+)
+def product_bulk_update_handler(
+    request: HttpRequest, body: ProductBulkUpdateRequestBody
+):
+    updated_ids: Set[int] = product_service.bulk_update(
+        changes=[change.dict() for change in body.changes],
+        chunk_size=settings.PRODUCT_BULK_UPDATE_CHUNK_SIZE,
+    )
+    product_ids: List[int] = list(
+        dict.fromkeys(change.product_id for change in body.changes)
+    )
+    return 200, response(
+        {
+            "updated": len(updated_ids),
+            "not_found": len(product_ids) - len(updated_ids),
+            "results": [
+                {"product_id": product_id, "updated": product_id in updated_ids}
+                for product_id in product_ids
+            ],
+        }
+    )
+
+
+def sales_date_range(start: date | None, end: date | None) -> Tuple[date, date]:
+    end = end or timezone.now().date()
+    start = start or end - timedelta(days=settings.SALES_REPORT_DEFAULT_DAYS - 1)
+    if start > end or (end - start).days >= settings.SALES_REPORT_MAX_DAYS:
+        raise SalesInvalidDateRangeException
+    return start, end
+
+
+@router.get(
+    "/admin/sales/products",
+    response={
+        200: ObjectResponse[ProductSalesListResponse],
+        400: ObjectResponse[ErrorResponse],
+    },
+    auth=admin_auth,
+)
+def product_sales_handler(
+    request: HttpRequest,
+    start: date | None = None,
+    end: date | None = None,
+    limit: int = Query(50, ge=1, le=1000),
+):
+    try:
+        start, end = sales_date_range(start=start, end=end)
+    except SalesInvalidDateRangeException as e:
+        return 400, error_response(msg=e.message)
+
+    return 200, response(
+        {
+            "start": start,
+            "end": end,
+            "products": sales_report_service.top_products(
+                start=start, end=end, limit=limit
+            ),
+        }
+    )
+
+
+@router.get(
+    "/admin/sales/products/{product_id}",
+    response={
+        200: ObjectResponse[ProductDailySalesResponse],
+        400: ObjectResponse[ErrorResponse],
+    },
+    auth=admin_auth,
+)
+def product_daily_sales_handler(
+    request: HttpRequest,
+    product_id: int,
+    start: date | None = None,
+    end: date | None = None,
+):
+    try:
+        start, end = sales_date_range(start=start, end=end)
+    except SalesInvalidDateRangeException as e:
+        return 400, error_response(msg=e.message)
+
+    return 200, response(
+        {
+            "product_id": product_id,
+            "start": start,
+            "end": end,
+            "days": sales_report_service.product_daily(
+                product_id=product_id, start=start, end=end
+            ),
+        }
+    )
+
+
+@router.get(
+    "/admin/sales/categories",
+    response={
+        200: ObjectResponse[CategorySalesListResponse],
+        400: ObjectResponse[ErrorResponse],
+    },
+    auth=admin_auth,
+)
+def category_sales_handler(
+    request: HttpRequest, start: date | None = None, end: date | None = None
+):
+    try:
+        start, end = sales_date_range(start=start, end=end)
+    except SalesInvalidDateRangeException as e:
+        return 400, error_response(msg=e.message)
+
+    return 200, response(
+        {
+            "start": start,
+            "end": end,
+            "categories": sales_report_service.categories(start=start, end=end),
+        }
+    )
+
+
+@router.get(
+    "/admin/slow-queries",
+    response={200: ObjectResponse[SlowQueryListResponse]},
+    auth=admin_auth,
+)
+def slow_query_handler(
+    request: HttpRequest,
+    order_by: SlowQueryOrder = SlowQueryOrder.TOTAL,
+    limit: int = Query(20, ge=1, le=200),
+):
+    return 200, response({"queries": slow_query_log.top(order=order_by, limit=limit)})
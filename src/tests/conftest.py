@@ -1,8 +1,39 @@
+import threading
+
 import pytest
+from django.core.cache import cache
 
-from tests.utils import APIClient
+from product.service.payment import payment_service
+from product.service.popularity import popular_top_k
+from product.service.product import product_list_cache
+from user.revocation import token_revocation_list
+from tests.utils import APIClient, StubPaymentGateway
 
 
 @pytest.fixture(scope="session")
 def api_client():
     return APIClient()
+
+
+@pytest.fixture(scope="session")
+def stub_payment_gateway_server():
+    server = StubPaymentGateway()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def payment_gateway(stub_payment_gateway_server, settings):
+    settings.PAYMENT_GATEWAY_URL = stub_payment_gateway_server.url
+    stub_payment_gateway_server.reset()
+    payment_service.circuit_breaker.record_success()
+    yield stub_payment_gateway_server
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    product_list_cache.local.clear()
+    popular_top_k.clear()
+    token_revocation_list.clear()
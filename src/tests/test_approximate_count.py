@@ -0,0 +1,95 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from config.pagination import ApproximateCountPaginator, estimate_count
+from product.models import Category, Product, ProductStatus
+
+
+@pytest.fixture
+def products():
+    category = Category.objects.create(name="의류")
+    return Product.objects.bulk_create(
+        Product(
+            name=f"상품 {i}",
+            price=1000 * (i + 1),
+            status=ProductStatus.ACTIVE,
+            category=category,
+        )
+        for i in range(5)
+    )
+
+
+@pytest.mark.django_db
+def test_product_list_count_is_exact_below_threshold(api_client, products, settings):
+    # given
+    settings.APPROXIMATE_COUNT_EXACT_THRESHOLD = 10_000
+
+    # when
+    response = api_client.get(
+        "/products", data={"count": True, "min_price": 2000, "limit": 1}
+    )
+
+    # then
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results["products"]) == 1
+    assert results["count"] == {"total": 4, "exact": True}
+
+
+@pytest.mark.django_db
+def test_product_list_count_uses_estimate_above_threshold(
+    api_client, products, settings
+):
+    # given
+    settings.APPROXIMATE_COUNT_EXACT_THRESHOLD = 0
+
+    # when
+    response = api_client.get(
+        "/products", data={"count": True, "category_id": products[0].category_id}
+    )
+
+    # then
+    assert response.status_code == 200
+    count = response.json()["results"]["count"]
+    assert count["exact"] is False
+    assert count["total"] == estimate_count(
+        Product.objects.filter(category_id=products[0].category_id)
+    )
+
+
+@pytest.mark.django_db
+def test_approximate_count_paginator_skips_count_query(products, settings):
+    # given
+    settings.APPROXIMATE_COUNT_EXACT_THRESHOLD = 0
+    paginator = ApproximateCountPaginator(Product.objects.order_by("id"), per_page=2)
+
+    # when
+    with CaptureQueriesContext(connection) as queries:
+        count = paginator.count
+
+    # then
+    assert count >= 1
+    assert len(queries) == 1
+    assert queries[0]["sql"].startswith("EXPLAIN")
+
+
+@pytest.mark.django_db
+def test_admin_changelists_use_approximate_count(products):
+    # given
+    client = Client()
+    client.force_login(
+        User.objects.create_superuser(username="admin", password="password")
+    )
+
+    # when
+    responses = [
+        client.get(f"/admin/{path}/")
+        for path in ("product/product", "product/order", "user/userpointshistory")
+    ]
+
+    # then
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert responses[0].context["cl"].paginator.count == 5
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+from django.contrib.postgres.search import SearchVector
+
+from config.cache import CacheEntry, LocalLRUCache, QueryCache
+from product.models import Category, Product, ProductStatus
+from product.service.product import product_service
+
+
+def test_local_lru_cache_evicts_least_recently_used():
+    # given
+    local = LocalLRUCache(max_entries=2)
+    entry = CacheEntry(value=1, compute_seconds=0, expires_at=time.time() + 60)
+    local.set("a", entry)
+    local.set("b", entry)
+    local.get("a")
+
+    # when
+    local.set("c", entry)
+
+    # then
+    assert local.get("a") == entry
+    assert local.get("b") is None
+
+
+def test_query_cache_single_flight():
+    # given
+    query_cache = QueryCache(name="test_single_flight", timeout=60, local_max_entries=8)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return [1, 2, 3]
+
+    # when
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                query_cache.get_or_set(params={"q": 1}, compute=compute)
+            )
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # then
+    assert len(calls) == 1
+    assert results == [[1, 2, 3]] * 8
+
+
+def test_query_cache_early_recompute():
+    # given
+    query_cache = QueryCache(
+        name="test_early_recompute", timeout=60, local_max_entries=8, beta=1e9
+    )
+    query_cache.get_or_set(params={}, compute=lambda: time.sleep(0.01) or "old")
+
+    # when
+    value = query_cache.get_or_set(params={}, compute=lambda: "new")
+
+    # then
+    assert value == "new"
+
+
+def test_query_cache_invalidate():
+    # given
+    query_cache = QueryCache(name="test_invalidate", timeout=60, local_max_entries=8)
+    query_cache.get_or_set(params={}, compute=lambda: "old")
+
+    # when
+    query_cache.invalidate()
+
+    # then
+    assert query_cache.get_or_set(params={}, compute=lambda: "new") == "new"
+
+
+@pytest.mark.django_db
+def test_product_list_cached(django_assert_num_queries):
+    # given
+    Product.objects.create(name="청바지", price=1, status=ProductStatus.ACTIVE)
+    product_service.all_products()
+
+    # when
+    with django_assert_num_queries(0):
+        products = product_service.all_products()
+
+    # then
+    assert [product["name"] for product in products] == ["청바지"]
+
+
+@pytest.mark.django_db
+def test_product_list_cache_invalidated_on_write(
+    django_capture_on_commit_callbacks,
+):
+    # given
+    category = Category.objects.create(name="하의")
+    product_service.filter_by_category_ids(category_ids=[category.id])
+
+    # when
+    with django_capture_on_commit_callbacks(execute=True):
+        Product.objects.create(
+            name="청바지", price=1, status=ProductStatus.ACTIVE, category=category
+        )
+
+    # then
+    assert len(product_service.filter_by_category_ids(category_ids=[category.id])) == 1
+
+
+@pytest.mark.django_db
+def test_search_products(api_client):
+    # given
+    Product.objects.create(
+        name="청바지", price=1, status=ProductStatus.ACTIVE, tags="jeans"
+    )
+    Product.objects.update(search_vector=SearchVector("tags"))
+
+    # when
+    response = api_client.get("/products", {"query": " Jeans "})
+
+    # then
+    assert response.status_code == 200
+    assert [product["name"] for product in response.json()["results"]["products"]] == [
+        "청바지"
+    ]
@@ -0,0 +1,133 @@
+import pytest
+
+from product.exceptions import CartFullException
+from product.models import Order, OrderLine, Product, ProductStatus
+from product.service.cart import LocalCartBackend, RedisCartBackend, cart_service
+from tests.utils import FakeRedis
+from user.authentication import authentication_service
+from user.models import ServiceUser
+from user.revocation import token_revocation_list
+
+
+@pytest.fixture(autouse=True)
+def cart_backend(monkeypatch):
+    backend = LocalCartBackend(ttl=60)
+    monkeypatch.setattr(cart_service, "backend", backend)
+    yield backend
+
+
+def test_redis_cart_backend():
+    # given
+    client = FakeRedis()
+    backend = RedisCartBackend(ttl=60, client=client)
+
+    # when
+    backend.add(user_id=1, product_id=10, quantity=2, max_lines=2)
+    total = backend.add(user_id=1, product_id=10, quantity=3, max_lines=2)
+    backend.add(user_id=1, product_id=20, quantity=1, max_lines=2)
+    with pytest.raises(CartFullException):
+        backend.add(user_id=1, product_id=30, quantity=1, max_lines=2)
+    popped = backend.pop(user_id=1)
+    after_pop = backend.items(user_id=1)
+    backend.restore(user_id=1, items=popped)
+
+    # then
+    assert total == 5
+    assert popped == {10: 5, 20: 1}
+    assert after_pop == {}
+    assert backend.items(user_id=1) == {10: 5, 20: 1}
+    assert client.ttls["cart:1"] == 60
+
+
+@pytest.mark.django_db
+def test_cart_checkout(api_client, django_assert_num_queries, settings):
+    # given
+    settings.CART_MAX_QUANTITY = 3
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    headers = {
+        "Authorization": f"Bearer {authentication_service.encode_token(user.id)}"
+    }
+    jeans = Product.objects.create(
+        name="청바지", price=1000, status=ProductStatus.ACTIVE
+    )
+    shirt = Product.objects.create(
+        name="티셔츠", price=500, status=ProductStatus.ACTIVE
+    )
+    cart_service.add(user_id=user.id, product_id=shirt.id, quantity=1)
+    # 폐기 token filter 를 미리 읽어 둔다
+    token_revocation_list.maybe_sync()
+
+    # when
+    # cart 변경은 상품 판매 상태 확인과 응답의 가격 조회만 DB 를 사용
+    with django_assert_num_queries(2):
+        added = api_client.post(
+            "/products/cart/lines",
+            data={"product_id": jeans.id, "quantity": 5},
+            headers=headers,
+        )
+    removed = api_client.delete(f"/products/cart/lines/{shirt.id}", headers=headers)
+    checkout = api_client.post("/products/cart/checkout", headers=headers)
+    empty_checkout = api_client.post("/products/cart/checkout", headers=headers)
+
+    # then
+    assert added.json()["results"] == {
+        "lines": [
+            {"product_id": jeans.id, "name": "청바지", "price": 1000, "quantity": 3},
+            {"product_id": shirt.id, "name": "티셔츠", "price": 500, "quantity": 1},
+        ],
+        # checkout 주문과 같은 10% 할인 적용 금액
+        "subtotal": 3150,
+        "unavailable_product_ids": [],
+    }
+    assert removed.json()["results"]["subtotal"] == 2700
+    assert checkout.status_code == 201
+    order = Order.objects.get(id=checkout.json()["results"]["id"])
+    assert order.total_price == removed.json()["results"]["subtotal"]
+    assert list(
+        OrderLine.objects.filter(order_id=order.id).values_list(
+            "product_id", "quantity"
+        )
+    ) == [(jeans.id, 3)]
+    assert empty_checkout.status_code == 400
+    assert cart_service.get(user_id=user.id)["lines"] == []
+
+
+@pytest.mark.django_db
+def test_cart_checkout_with_unavailable_product_restores_cart(api_client):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    headers = {
+        "Authorization": f"Bearer {authentication_service.encode_token(user.id)}"
+    }
+    jeans = Product.objects.create(
+        name="청바지", price=1000, status=ProductStatus.ACTIVE
+    )
+    shirt = Product.objects.create(
+        name="티셔츠", price=500, status=ProductStatus.ACTIVE
+    )
+    paused = Product.objects.create(name="양말", price=100, status=ProductStatus.PAUSED)
+    cart_service.add(user_id=user.id, product_id=jeans.id, quantity=1)
+    cart_service.add(user_id=user.id, product_id=shirt.id, quantity=1)
+    # cart 에 담은 뒤 판매 중지
+    Product.objects.filter(id=shirt.id).update(status=ProductStatus.PAUSED)
+
+    # when
+    add_paused = api_client.post(
+        "/products/cart/lines",
+        data={"product_id": paused.id, "quantity": 1},
+        headers=headers,
+    )
+    cart = api_client.get("/products/cart", headers=headers)
+    checkout = api_client.post("/products/cart/checkout", headers=headers)
+
+    # then
+    assert add_paused.status_code == 400
+    assert cart.json()["results"]["unavailable_product_ids"] == [shirt.id]
+    assert cart.json()["results"]["subtotal"] == 900
+    assert checkout.status_code == 400
+    assert checkout.json()["results"] == {
+        "message": "Cart Has Unavailable Products",
+        "product_ids": [shirt.id],
+    }
+    assert cart_service.backend.items(user_id=user.id) == {jeans.id: 1, shirt.id: 1}
+    assert not Order.objects.exists()
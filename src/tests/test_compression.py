@@ -0,0 +1,46 @@
+import gzip
+
+import pytest
+
+from config.compression import choose_encoding
+from product.models import Product, ProductStatus
+
+
+def test_choose_encoding():
+    # when, then
+    assert choose_encoding("gzip, br, zstd") == "zstd"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert choose_encoding("*;q=0.1, gzip;q=0") in ("zstd", "br")
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+
+
+@pytest.mark.django_db
+def test_compress_large_response(api_client):
+    # given
+    Product.objects.bulk_create(
+        [
+            Product(name=f"상품 {i}", price=i, status=ProductStatus.ACTIVE)
+            for i in range(100)
+        ]
+    )
+    plain = api_client.get("/products")
+
+    # when
+    response = api_client.get("/products", HTTP_ACCEPT_ENCODING="gzip")
+
+    # then
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Vary"] == "Accept, Accept-Encoding"
+    assert len(response.content) < len(plain.content)
+    assert gzip.decompress(response.content) == plain.content
+
+
+@pytest.mark.django_db
+def test_skip_compression_small_response(api_client):
+    # when
+    response = api_client.get("/products", HTTP_ACCEPT_ENCODING="gzip")
+
+    # then
+    assert response.status_code == 200
+    assert not response.has_header("Content-Encoding")
@@ -0,0 +1,53 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from product.models import Order, OrderStatus, Product, ProductStatus
+from user.authentication import authentication_service
+from user.models import ServiceUser
+
+
+@pytest.mark.django_db
+def test_metrics(api_client):
+    # given
+    Product.objects.create(name="청바지", price=1, status=ProductStatus.ACTIVE)
+    api_client.get("/products")
+
+    # when
+    response = api_client.get("/metrics")
+
+    # then
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    body = response.content.decode()
+    assert (
+        'http_request_duration_seconds_bucket{le="0.005",method="GET",route="products"}'
+        in body
+    )
+    assert 'http_responses_total{method="GET",route="products",status="200"}' in body
+    assert "http_requests_in_flight" in body
+    assert "db_query_duration_seconds_count" in body
+
+
+@pytest.mark.django_db
+def test_metrics_order_confirm_conflict(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=0)
+    token = authentication_service.encode_token(user_id=user.id)
+    order = Order.objects.create(
+        user=user, total_price=1000, status=OrderStatus.PENDING
+    )
+    labels = {"version": "v1", "reason": "points_not_enough"}
+    before = REGISTRY.get_sample_value("order_confirm_conflicts_total", labels) or 0
+
+    # when
+    response = api_client.post(
+        f"/products/orders/{order.id}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    # then
+    assert response.status_code == 409
+    assert REGISTRY.get_sample_value("order_confirm_conflicts_total", labels) == (
+        before + 1
+    )
@@ -0,0 +1,28 @@
+import pytest
+from django.test import Client
+
+
+def test_api_request_skips_admin_middleware(api_client):
+    # when
+    response = api_client.get("")
+
+    # then
+    assert response.status_code == 200
+    assert "X-Frame-Options" not in response
+    assert not hasattr(response.wsgi_request, "session")
+
+
+@pytest.mark.django_db
+def test_admin_request_uses_admin_middleware():
+    # given
+    client = Client(enforce_csrf_checks=True)
+
+    # when
+    response = client.get("/admin/login/")
+
+    # then
+    assert response.status_code == 200
+    assert response["X-Frame-Options"] == "DENY"
+    assert "csrftoken" in response.cookies
+    assert hasattr(response.wsgi_request, "session")
+    assert client.post("/admin/login/", {"username": "a"}).status_code == 403
@@ -0,0 +1,215 @@
+import threading
+
+import pytest
+from django.db import connection
+from schema import Schema
+
+from product.models import Order, OrderStatus, Product, ProductStatus
+from product.service.order import order_service
+from user.authentication import authentication_service
+from user.models import ServiceUser, UserPoints, UserPointsHistory
+
+
+def place_order(api_client, token: str, product: Product) -> int:
+    return api_client.post(
+        "/products/orders",
+        data={"order_lines": [{"product_id": product.id, "quantity": 1}]},
+        headers={"Authorization": f"Bearer {token}"},
+    ).json()["results"]["id"]
+
+
+def confirm_order(api_client, token: str, order_id: int, path: str = "confirm"):
+    return api_client.post(
+        f"/products/orders/{order_id}/{path}",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def cancel_order(api_client, token: str, order_id: int):
+    return api_client.post(
+        f"/products/orders/{order_id}/cancel",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+@pytest.mark.django_db
+def test_cancel_v1_paid_order_refunds_user_points(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=1000)
+    product = Product.objects.create(
+        name="청바지", price=300, status=ProductStatus.ACTIVE
+    )
+    token = authentication_service.encode_token(user_id=user.id)
+    order_id = place_order(api_client, token, product)
+    assert confirm_order(api_client, token, order_id).status_code == 200
+
+    # when
+    response = cancel_order(api_client, token, order_id)
+
+    # then
+    assert response.status_code == 200
+    assert Schema({"results": {"detail": "ok"}}).validate(response.json())
+    assert Order.objects.get(id=order_id).status == OrderStatus.CANCELLED
+
+    user.refresh_from_db()
+    # 주문 금액 300 에 10% 할인. 환불은 version 을 올리지 않는다
+    assert (user.points, user.order_count, user.version) == (1000, 0, 1)
+    assert list(
+        UserPointsHistory.objects.filter(user=user)
+        .order_by("id")
+        .values_list("points_change", "reason")
+    ) == [(-270, f"orders:{order_id}:confirm"), (270, f"orders:{order_id}:cancel")]
+    # v1 결제는 ledger 를 차감하지 않았으므로 환불도 하지 않는다
+    assert not UserPoints.objects.filter(user=user).exists()
+
+
+@pytest.mark.django_db
+def test_cancel_v2_paid_order_refunds_ledger(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=0)
+    UserPoints.objects.create(
+        user=user, version=1, points_change=1000, points_sum=1000, reason="charge"
+    )
+    product = Product.objects.create(
+        name="청바지", price=300, status=ProductStatus.ACTIVE
+    )
+    token = authentication_service.encode_token(user_id=user.id)
+    order_id = place_order(api_client, token, product)
+    assert confirm_order(api_client, token, order_id, "confirm-v2").status_code == 200
+
+    # when
+    response = cancel_order(api_client, token, order_id)
+
+    # then
+    assert response.status_code == 200
+    assert Order.objects.get(id=order_id).status == OrderStatus.CANCELLED
+
+    user.refresh_from_db()
+    assert (user.points, user.order_count, user.version) == (0, 0, 0)
+    assert list(
+        UserPoints.objects.filter(user=user)
+        .order_by("version")
+        .values_list("version", "points_change", "points_sum", "reason")
+    ) == [
+        (1, 1000, 1000, "charge"),
+        (2, -270, 730, f"orders:{order_id}:confirm"),
+        (3, 270, 1000, f"orders:{order_id}:cancel"),
+    ]
+    # v2 결제는 ServiceUser.points 를 차감하지 않았으므로 환불도 하지 않는다
+    assert not UserPointsHistory.objects.filter(user=user).exists()
+
+
+@pytest.mark.django_db
+def test_cancel_pending_order_without_refund(api_client):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=0)
+    token = authentication_service.encode_token(user_id=user.id)
+    order = Order.objects.create(
+        user=user, total_price=1000, status=OrderStatus.PENDING
+    )
+
+    # when
+    first = cancel_order(api_client, token, order.id)
+    second = cancel_order(api_client, token, order.id)
+
+    # then
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert second.json() == {"results": {"message": "Order Not Cancellable"}}
+    assert ServiceUser.objects.get(id=user.id).points == 0
+    assert not UserPointsHistory.objects.filter(user=user).exists()
+    assert not UserPoints.objects.filter(user=user).exists()
+
+
+@pytest.mark.django_db
+def test_cancel_does_not_conflict_with_v1_confirm(
+    api_client, payment_gateway, monkeypatch
+):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=1000)
+    product = Product.objects.create(
+        name="청바지", price=300, status=ProductStatus.ACTIVE
+    )
+    token = authentication_service.encode_token(user_id=user.id)
+    paid_order_id = place_order(api_client, token, product)
+    assert confirm_order(api_client, token, paid_order_id).status_code == 200
+    order_id = place_order(api_client, token, product)
+
+    # v1 결제 확인이 user 의 version 을 읽은 직후에 다른 주문이 취소된다
+    get_user = ServiceUser.objects.get
+
+    def get_user_then_cancel(*args, **kwargs):
+        user = get_user(*args, **kwargs)
+        order_service.cancel_order(
+            user_id=user.id, order=Order.objects.get(id=paid_order_id)
+        )
+        return user
+
+    monkeypatch.setattr(ServiceUser.objects, "get", get_user_then_cancel)
+
+    # when
+    response = confirm_order(api_client, token, order_id)
+    monkeypatch.undo()
+
+    # then
+    assert response.status_code == 200
+    assert Order.objects.get(id=paid_order_id).status == OrderStatus.CANCELLED
+    assert Order.objects.get(id=order_id).status == OrderStatus.PAID
+    user.refresh_from_db()
+    assert (user.points, user.order_count, user.version) == (1000 - 270, 1, 2)
+    assert (
+        sum(
+            UserPointsHistory.objects.filter(user=user).values_list(
+                "points_change", flat=True
+            )
+        )
+        == -270
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_cancels_for_same_user(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=0)
+    UserPoints.objects.create(
+        user=user, version=1, points_change=1000, points_sum=1000, reason="charge"
+    )
+    product = Product.objects.create(
+        name="청바지", price=100, status=ProductStatus.ACTIVE
+    )
+    token = authentication_service.encode_token(user_id=user.id)
+    order_ids = [place_order(api_client, token, product) for _ in range(10)]
+    for order_id in order_ids:
+        assert (
+            confirm_order(api_client, token, order_id, "confirm-v2").status_code == 200
+        )
+    orders = list(Order.objects.filter(id__in=order_ids))
+    errors = []
+
+    def cancel(order: Order):
+        try:
+            order_service.cancel_order(user_id=user.id, order=order)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    # when
+    threads = [threading.Thread(target=cancel, args=(order,)) for order in orders]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    # then
+    assert errors == []
+    user.refresh_from_db()
+    assert (user.points, user.order_count, user.version) == (0, 0, 0)
+    # 결제 10건(각 90) 이후 환불 10건이 version 충돌 없이 이어서 기록된다
+    assert list(
+        UserPoints.objects.filter(user=user, version__gt=11)
+        .order_by("version")
+        .values_list("version", "points_sum")
+    ) == [(version, 100 + (version - 11) * 90) for version in range(12, 22)]
+    assert not UserPointsHistory.objects.filter(user=user).exists()
@@ -0,0 +1,111 @@
+import threading
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.db import connection, transaction
+from django.utils import timezone
+
+from product.models import Order, OrderStatus, OutboxEvent, OutboxEventType
+from product.service.order_expiry import OrderExpiryWorker
+from user.authentication import authentication_service
+from user.models import ServiceUser
+
+
+def create_order(user: ServiceUser, status: OrderStatus, age: timedelta) -> Order:
+    order = Order.objects.create(user=user, status=status, order_code=uuid.uuid4().hex)
+    Order.objects.filter(id=order.id).update(created_at=timezone.now() - age)
+    return order
+
+
+@pytest.mark.django_db
+def test_expire_stale_pending_orders():
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    stale = [
+        create_order(user=user, status=OrderStatus.PENDING, age=timedelta(hours=1))
+        for _ in range(3)
+    ]
+    recent = create_order(
+        user=user, status=OrderStatus.PENDING, age=timedelta(minutes=1)
+    )
+    paid = create_order(user=user, status=OrderStatus.PAID, age=timedelta(hours=1))
+    worker = OrderExpiryWorker(expiry_seconds=30 * 60, batch_size=2)
+
+    # when
+    counts = [worker.expire_batch() for _ in range(3)]
+
+    # then
+    assert counts == [2, 1, 0]
+    assert set(
+        Order.objects.filter(status=OrderStatus.CANCELLED).values_list("id", flat=True)
+    ) == {order.id for order in stale}
+    recent.refresh_from_db()
+    paid.refresh_from_db()
+    assert recent.status == OrderStatus.PENDING
+    assert paid.status == OrderStatus.PAID
+    assert sorted(
+        OutboxEvent.objects.filter(
+            event_type=OutboxEventType.ORDER_CANCELLED
+        ).values_list("aggregate_id", "payload__refund")
+    ) == sorted((order.id, 0) for order in stale)
+
+
+@pytest.mark.django_db
+def test_confirm_rejects_expired_order_before_worker_runs(
+    api_client, payment_gateway, settings
+):
+    # given
+    settings.ORDER_PENDING_EXPIRY_SECONDS = 30 * 60
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=1000)
+    token = authentication_service.encode_token(user_id=user.id)
+    order = create_order(user=user, status=OrderStatus.PENDING, age=timedelta(hours=1))
+    Order.objects.filter(id=order.id).update(total_price=1000)
+
+    # when
+    response = api_client.post(
+        f"/products/orders/{order.id}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    # then
+    assert response.status_code == 400
+    assert Order.objects.get(id=order.id).status == OrderStatus.PENDING
+    assert ServiceUser.objects.get(id=user.id).points == 1000
+    assert not OutboxEvent.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_expire_skips_orders_locked_by_confirm():
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    confirming = create_order(
+        user=user, status=OrderStatus.PENDING, age=timedelta(hours=1)
+    )
+    stale = create_order(user=user, status=OrderStatus.PENDING, age=timedelta(hours=1))
+    worker = OrderExpiryWorker(expiry_seconds=30 * 60, batch_size=10)
+    expired = []
+
+    def expire():
+        try:
+            expired.append(worker.expire_batch())
+        finally:
+            connection.close()
+
+    # when
+    with transaction.atomic():
+        # confirm_order 의 pending -> paid UPDATE 가 row lock 을 잡고 있는 상태
+        Order.objects.filter(id=confirming.id, status=OrderStatus.PENDING).update(
+            status=OrderStatus.PAID
+        )
+        thread = threading.Thread(target=expire)
+        thread.start()
+        thread.join(timeout=5)
+
+    # then
+    assert expired == [1]
+    confirming.refresh_from_db()
+    stale.refresh_from_db()
+    assert confirming.status == OrderStatus.PAID
+    assert stale.status == OrderStatus.CANCELLED
@@ -0,0 +1,144 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from product.models import Order, OrderLine, Product, ProductStatus
+from product.service.order import order_service
+from product.service.order_partition import (
+    order_partition_service,
+    partition_name,
+)
+from user.models import ServiceUser
+
+
+@pytest.fixture
+def partition_bounds(settings):
+    settings.ORDER_PARTITION_BOUNDS_TTL = 0
+    yield order_partition_service
+    order_partition_service._bounds_loaded_at = 0.0
+
+
+def create_order(user: ServiceUser, created_at: datetime) -> Order:
+    order = Order.objects.create(user=user, order_code=created_at.isoformat())
+    Order.objects.filter(id=order.id).update(created_at=created_at)
+    order.refresh_from_db()
+    return order
+
+
+@pytest.mark.django_db
+def test_order_lookup_prunes_partitions(partition_bounds):
+    # given
+    order_partition_service.create_partitions(
+        start=date(2001, 1, 1), end=date(2001, 2, 1)
+    )
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    january = create_order(user, datetime(2001, 1, 10, tzinfo=timezone.utc))
+    february = create_order(user, datetime(2001, 2, 10, tzinfo=timezone.utc))
+
+    # when
+    january_filter = order_partition_service.created_at_filter(january.id)
+    february_filter = order_partition_service.created_at_filter(february.id)
+    plan = Order.objects.filter(id=january.id, **january_filter).explain()
+
+    # then
+    margin = timedelta(seconds=300)
+    assert january_filter == {
+        "created_at__gte": datetime(2001, 1, 1, tzinfo=timezone.utc) - margin,
+        "created_at__lt": datetime(2001, 2, 1, tzinfo=timezone.utc) + margin,
+    }
+    # 마지막 partition 이후에 생긴 주문도 찾을 수 있도록 끝을 열어 둔다
+    assert february_filter == {
+        "created_at__gte": datetime(2001, 2, 1, tzinfo=timezone.utc) - margin
+    }
+    assert "order_p2001_01" in plan
+    assert partition_name("order", datetime.now(timezone.utc).date()) not in plan
+    assert order_service.get_user_order(user=user, order_id=january.id) == january
+    assert order_service.get_user_order(user=user, order_id=february.id) == february
+
+
+@pytest.mark.django_db
+def test_detach_old_partitions(partition_bounds):
+    # given
+    order_partition_service.create_partitions(
+        start=date(2001, 1, 1), end=date(2001, 1, 1)
+    )
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    product = Product.objects.create(
+        name="청바지", price=1, status=ProductStatus.ACTIVE
+    )
+    old = create_order(user, datetime(2001, 1, 10, tzinfo=timezone.utc))
+    OrderLine.objects.create(
+        order=old, product=product, price=1, created_at=old.created_at
+    )
+    recent = Order.objects.create(user=user, order_code="recent")
+    with connection.cursor() as cursor:
+        # test transaction 안에 남은 deferred FK 검사를 먼저 끝내야 ALTER TABLE 이 가능
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+    # when
+    created = order_partition_service.ensure_future_partitions()
+    detached = order_partition_service.detach_old_partitions(retention_months=24)
+
+    # then
+    assert created == []
+    assert detached == ["order_line_p2001_01", "order_p2001_01"]
+    assert list(Order.objects.values_list("id", flat=True)) == [recent.id]
+    assert not OrderLine.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_detach_old_partitions_concurrently(partition_bounds):
+    # given
+    order_partition_service.create_partitions(
+        start=date(2002, 1, 1), end=date(2002, 1, 1)
+    )
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    old = create_order(user, datetime(2002, 1, 10, tzinfo=timezone.utc))
+
+    # when
+    try:
+        # atomic block 밖이므로 DETACH PARTITION ... CONCURRENTLY 로 분리
+        with CaptureQueriesContext(connection) as queries:
+            detached = order_partition_service.detach_old_partitions(
+                retention_months=24
+            )
+        remaining = list(Order.objects.values_list("id", flat=True))
+    finally:
+        with connection.cursor() as cursor:
+            for name in ("order_line_p2002_01", "order_p2002_01"):
+                cursor.execute(
+                    f"DROP TABLE IF EXISTS {connection.ops.quote_name(name)}"
+                )
+
+    # then
+    assert detached == ["order_line_p2002_01", "order_p2002_01"]
+    assert all(
+        query["sql"].endswith("CONCURRENTLY")
+        for query in queries
+        if "DETACH PARTITION" in query["sql"]
+    )
+    assert old.id not in remaining
+
+
+@pytest.mark.django_db
+def test_create_order_inserts_once():
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    product = Product.objects.create(
+        name="청바지", price=1000, status=ProductStatus.ACTIVE
+    )
+
+    # when
+    with CaptureQueriesContext(connection) as queries:
+        order = order_service.create_order(
+            user=user, products=[product], product_id_to_quantity={product.id: 2}
+        )
+
+    # then
+    # id 만으로 order 를 UPDATE 하면 모든 partition 을 scan 한다
+    assert not [query for query in queries if query["sql"].startswith('UPDATE "order"')]
+    saved = Order.objects.get(id=order.id)
+    assert saved.total_price == 1800
+    assert OrderLine.objects.get(order_id=order.id).created_at == saved.created_at
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+from django.db import IntegrityError
+
+from product.models import Order, OrderLine, Product, ProductStatus
+from product.service.order_writer import OrderBatchWriter
+from user.models import ServiceUser
+
+
+@pytest.fixture
+def order_writer():
+    writer = OrderBatchWriter(
+        max_batch_size=10, max_wait_ms=200, queue_size=100, timeout=10
+    )
+    yield writer
+    writer.stop()
+
+
+def create_orders_concurrently(writer, user, orders):
+    results = [None] * len(orders)
+
+    def create(i: int, products, quantities):
+        try:
+            results[i] = writer.create_order(
+                user=user, products=products, product_id_to_quantity=quantities
+            )
+        except Exception as e:
+            results[i] = e
+
+    threads = [
+        threading.Thread(target=create, args=(i, products, quantities))
+        for i, (products, quantities) in enumerate(orders)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+@pytest.mark.django_db(transaction=True)
+def test_group_commit_creates_orders_in_one_batch(order_writer):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    jeans = Product.objects.create(
+        name="청바지", price=1000, status=ProductStatus.ACTIVE
+    )
+    shirt = Product.objects.create(
+        name="티셔츠", price=500, status=ProductStatus.ACTIVE
+    )
+
+    # when
+    results = create_orders_concurrently(
+        order_writer,
+        user,
+        [([jeans, shirt], {jeans.id: 1, shirt.id: i + 1}) for i in range(5)],
+    )
+
+    # then
+    assert len({order.id for order in results}) == 5
+    # 모든 주문이 한 batch(같은 시각 기준)로 저장된다
+    created_at = sorted(order.created_at for order in results)
+    assert (created_at[-1] - created_at[0]).total_seconds() < 1e-3
+    for i, order in enumerate(sorted(results, key=lambda o: o.total_price)):
+        saved = Order.objects.get(id=order.id)
+        assert (
+            saved.total_price == order.total_price == int((1000 + 500 * (i + 1)) * 0.9)
+        )
+        assert (
+            OrderLine.objects.filter(
+                order_id=order.id, created_at=saved.created_at
+            ).count()
+            == 2
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_group_commit_failure_retries_orders_one_by_one(order_writer):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    jeans = Product.objects.create(
+        name="청바지", price=1000, status=ProductStatus.ACTIVE
+    )
+    deleted = Product(id=jeans.id + 1000, name="삭제된 상품", price=500)
+
+    # when
+    results = create_orders_concurrently(
+        order_writer,
+        user,
+        [
+            ([jeans], {jeans.id: 1}),
+            ([deleted], {deleted.id: 1}),
+            ([jeans], {jeans.id: 2}),
+        ],
+    )
+
+    # then
+    assert isinstance(results[1], IntegrityError)
+    assert {results[0].total_price, results[2].total_price} == {900, 1800}
+    assert Order.objects.count() == 2
@@ -0,0 +1,107 @@
+from typing import List
+
+import pytest
+
+from product.models import Order, OrderStatus, OutboxEvent, OutboxEventType
+from product.service.outbox import OutboxRelay
+from user.authentication import authentication_service
+from user.models import ServiceUser
+
+
+class MemorySink:
+    def __init__(self):
+        self.events: List[OutboxEvent] = []
+
+    def send(self, events: List[OutboxEvent]) -> None:
+        self.events.extend(events)
+
+
+class FailingSink:
+    def send(self, events: List[OutboxEvent]) -> None:
+        raise ConnectionError
+
+
+@pytest.mark.django_db
+def test_confirm_order_writes_outbox_events(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=1000)
+    token = authentication_service.encode_token(user_id=user.id)
+    order = Order.objects.create(
+        user=user, total_price=1000, status=OrderStatus.PENDING
+    )
+
+    # when
+    response = api_client.post(
+        f"/products/orders/{order.id}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    # then
+    assert response.status_code == 200
+    events = list(OutboxEvent.objects.order_by("id"))
+    assert [event.event_type for event in events] == [
+        OutboxEventType.ORDER_PAID,
+        OutboxEventType.POINTS_CHANGED,
+    ]
+    assert events[1].payload == {
+        "user_id": user.id,
+        "points_change": -1000,
+        "reason": f"orders:{order.id}:confirm",
+    }
+
+
+@pytest.mark.django_db
+def test_confirm_order_failure_writes_no_outbox_events(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=0)
+    token = authentication_service.encode_token(user_id=user.id)
+    order = Order.objects.create(
+        user=user, total_price=1000, status=OrderStatus.PENDING
+    )
+
+    # when
+    response = api_client.post(
+        f"/products/orders/{order.id}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    # then
+    assert response.status_code == 409
+    assert not OutboxEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_outbox_relay_batch():
+    # given
+    OutboxEvent.objects.bulk_create(
+        objs=[
+            OutboxEvent(event_type=OutboxEventType.ORDER_PAID, aggregate_id=i)
+            for i in range(5)
+        ]
+    )
+    sink = MemorySink()
+    relay = OutboxRelay(sinks=[sink], batch_size=2)
+
+    # when
+    relayed = [relay.relay_batch() for _ in range(4)]
+
+    # then
+    assert relayed == [2, 2, 1, 0]
+    assert [event.aggregate_id for event in sink.events] == [0, 1, 2, 3, 4]
+    assert not OutboxEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_outbox_relay_keeps_events_when_sink_fails():
+    # given
+    OutboxEvent.objects.create(event_type=OutboxEventType.ORDER_PAID, aggregate_id=1)
+    relay = OutboxRelay(sinks=[FailingSink()], batch_size=10)
+
+    # when
+    with pytest.raises(ConnectionError):
+        relay.relay_batch()
+
+    # then
+    assert OutboxEvent.objects.count() == 1
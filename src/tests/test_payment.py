@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from config.resilience import (
+    Bulkhead,
+    BulkheadFullException,
+    CircuitBreaker,
+    CircuitOpenException,
+    CircuitState,
+)
+from product.exceptions import PaymentGatewayUnavailableException
+from product.models import Order
+from product.service.payment import PaymentService
+
+
+def test_circuit_breaker_opens_and_recovers():
+    # given
+    circuit_breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+
+    # when
+    circuit_breaker.record_failure()
+    circuit_breaker.record_failure()
+
+    # then
+    assert circuit_breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenException):
+        circuit_breaker.before_call()
+
+    time.sleep(0.05)
+    assert circuit_breaker.state == CircuitState.HALF_OPEN
+    circuit_breaker.before_call()
+    with pytest.raises(CircuitOpenException):
+        circuit_breaker.before_call()
+
+    circuit_breaker.record_success()
+    assert circuit_breaker.state == CircuitState.CLOSED
+
+
+def test_bulkhead_rejects_when_full():
+    # given
+    bulkhead = Bulkhead(max_concurrency=1, acquire_timeout=0)
+
+    # when
+    with bulkhead.slot():
+        # then
+        with pytest.raises(BulkheadFullException):
+            with bulkhead.slot():
+                pass
+
+    with bulkhead.slot():
+        pass
+
+
+def test_payment_service_timeout_opens_circuit(payment_gateway, settings):
+    # given
+    settings.PAYMENT_GATEWAY_READ_TIMEOUT = 0.05
+    settings.PAYMENT_GATEWAY_FAILURE_THRESHOLD = 1
+    service = PaymentService()
+    payment_gateway.delay = 0.2
+    order = Order(id=1, total_price=1000)
+
+    # when
+    with pytest.raises(PaymentGatewayUnavailableException):
+        service.confirm_payment(payment_key="payment_key", order=order)
+
+    # then
+    assert service.circuit_breaker.state == CircuitState.OPEN
+    with pytest.raises(PaymentGatewayUnavailableException):
+        service.confirm_payment(payment_key="payment_key", order=order)
+    assert len(payment_gateway.requests) == 1
@@ -0,0 +1,139 @@
+import pytest
+from django.core.management import call_command
+
+from product.models import Product, ProductStatus
+from user.authentication import authentication_service
+from user.campaign import points_campaign_service
+from user.models import (
+    PointsCampaign,
+    PointsCampaignStatus,
+    ServiceUser,
+    UserPoints,
+    UserPointsHistory,
+)
+
+
+@pytest.mark.django_db
+def test_run_points_campaign_resumes_without_double_grant():
+    # given
+    users = ServiceUser.objects.bulk_create(
+        [ServiceUser(email=f"user{i}@example.com", points=10) for i in range(5)]
+    )
+    UserPoints.objects.create(
+        user=users[0], version=1, points_change=10, points_sum=10, reason="charge"
+    )
+    campaign = points_campaign_service.create_campaign(code="welcome", points=100)
+
+    # when
+    # 두 chunk 지급 후 중단되었다가 다시 실행
+    points_campaign_service.grant_chunk(campaign_id=campaign.id, chunk_size=2)
+    points_campaign_service.grant_chunk(campaign_id=campaign.id, chunk_size=2)
+    campaign = points_campaign_service.run(
+        campaign_id=campaign.id, chunk_size=2, pause=0
+    )
+    points_campaign_service.run(campaign_id=campaign.id, chunk_size=2, pause=0)
+
+    # then
+    assert campaign.status == PointsCampaignStatus.COMPLETED
+    assert campaign.granted_count == 5
+    assert (
+        list(ServiceUser.objects.order_by("id").values_list("points", "version"))
+        == [(110, 0)] * 5
+    )
+    assert (
+        UserPointsHistory.objects.filter(
+            reason="campaign:welcome", points_change=100
+        ).count()
+        == 5
+    )
+    last_points = UserPoints.objects.filter(user=users[0]).order_by("-version").first()
+    assert (last_points.version, last_points.points_sum) == (2, 110)
+    assert UserPoints.objects.filter(reason="campaign:welcome").count() == 5
+
+
+@pytest.mark.django_db
+def test_points_campaign_does_not_conflict_with_v1_confirm(
+    api_client, payment_gateway, monkeypatch
+):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=1000)
+    product = Product.objects.create(
+        name="청바지", price=300, status=ProductStatus.ACTIVE
+    )
+    token = authentication_service.encode_token(user_id=user.id)
+    order_id = api_client.post(
+        "/products/orders",
+        data={"order_lines": [{"product_id": product.id, "quantity": 1}]},
+        headers={"Authorization": f"Bearer {token}"},
+    ).json()["results"]["id"]
+    campaign = points_campaign_service.create_campaign(code="welcome", points=100)
+
+    # v1 결제 확인이 user 의 version 을 읽은 직후에 캠페인 chunk 가 지급된다
+    get_user = ServiceUser.objects.get
+
+    def get_user_then_grant(*args, **kwargs):
+        user = get_user(*args, **kwargs)
+        points_campaign_service.grant_chunk(campaign_id=campaign.id, chunk_size=10)
+        return user
+
+    monkeypatch.setattr(ServiceUser.objects, "get", get_user_then_grant)
+
+    # when
+    response = api_client.post(
+        f"/products/orders/{order_id}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    monkeypatch.undo()
+
+    # then
+    assert response.status_code == 200
+    user.refresh_from_db()
+    assert (
+        UserPointsHistory.objects.filter(user=user, reason="campaign:welcome").count()
+        == 1
+    )
+    # 주문 금액 300 에 10% 할인
+    assert user.points == 1000 + 100 - 270
+
+
+@pytest.mark.django_db
+def test_points_campaign_api(api_client, settings):
+    # given
+    settings.ADMIN_API_KEY = "admin-key"
+    targets = ServiceUser.objects.bulk_create(
+        [ServiceUser(email=f"user{i}@example.com") for i in range(3)]
+    )
+    other = ServiceUser.objects.create(email="other@example.com")
+    body = {"code": "vip", "points": 500, "user_ids": [u.id for u in targets] + [0]}
+
+    # when
+    created = api_client.post(
+        "/users/admin/campaigns", data=body, headers={"X-Admin-Key": "admin-key"}
+    )
+    retried = api_client.post(
+        "/users/admin/campaigns", data=body, headers={"X-Admin-Key": "admin-key"}
+    )
+    conflict = api_client.post(
+        "/users/admin/campaigns",
+        data={**body, "points": 1},
+        headers={"X-Admin-Key": "admin-key"},
+    )
+    call_command("run_points_campaign", "vip", "--pause", "0")
+    detail = api_client.get(
+        "/users/admin/campaigns/vip", headers={"X-Admin-Key": "admin-key"}
+    )
+
+    # then
+    assert created.status_code == 200
+    assert created.json()["results"]["status"] == "running"
+    assert retried.status_code == 200
+    assert conflict.status_code == 409
+    assert PointsCampaign.objects.count() == 1
+    assert detail.json()["results"]["status"] == "completed"
+    assert detail.json()["results"]["granted_count"] == 3
+    assert [
+        u.points for u in ServiceUser.objects.filter(id__in=[t.id for t in targets])
+    ] == [500] * 3
+    other.refresh_from_db()
+    assert other.points == 0
@@ -0,0 +1,120 @@
+import pytest
+from django.core.management import call_command
+
+from product.models import Product, ProductStatus
+from user.authentication import authentication_service
+from user.models import ServiceUser, UserPoints, UserPointsHistory
+from user.reconciliation import points_reconciliation_service
+
+
+@pytest.mark.django_db
+def test_reconcile_points_reports_drift():
+    # given
+    consistent, drifted, broken, legacy = ServiceUser.objects.bulk_create(
+        [
+            ServiceUser(email="consistent@example.com", points=700),
+            ServiceUser(email="drifted@example.com", points=900),
+            ServiceUser(email="broken@example.com", points=100),
+            ServiceUser(email="legacy@example.com", points=50),
+        ]
+    )
+    for user, changes in [
+        (consistent, [1000, -300]),
+        (drifted, [1000, -300]),
+        (broken, [100]),
+    ]:
+        points_sum = 0
+        for version, change in enumerate(changes, start=1):
+            points_sum += change
+            UserPoints.objects.create(
+                user=user,
+                version=version,
+                points_change=change,
+                points_sum=points_sum,
+                reason="charge",
+            )
+            UserPointsHistory.objects.create(
+                user=user, points_change=change, reason="charge"
+            )
+    UserPoints.objects.filter(user=broken).update(points_sum=200)
+
+    # when
+    report = points_reconciliation_service.reconcile(chunk_size=2)
+    again = points_reconciliation_service.reconcile(chunk_size=3)
+
+    # then
+    assert report["users"] == 4
+    assert report["last_user_id"] == legacy.id
+    assert (
+        report["ledger_broken"],
+        report["balance_mismatch"],
+        report["history_mismatch"],
+    ) == (1, 2, 2)
+    assert {sample["user_id"] for sample in report["samples"]} == {
+        drifted.id,
+        broken.id,
+        legacy.id,
+    }
+    # 보고만 하고 points 는 고치지 않는다
+    drifted.refresh_from_db()
+    assert drifted.points == 900
+    assert {key: again[key] for key in report if key != "samples"} == {
+        key: report[key] for key in report if key != "samples"
+    }
+
+
+@pytest.mark.django_db
+def test_reconcile_points_does_not_change_points_paid_by_v1(
+    api_client, payment_gateway
+):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=1000)
+    # 캠페인 지급처럼 ledger 와 history 에 함께 기록된 points
+    UserPoints.objects.create(
+        user=user, version=1, points_change=1000, points_sum=1000, reason="campaign"
+    )
+    UserPointsHistory.objects.create(user=user, points_change=1000, reason="campaign")
+    product = Product.objects.create(
+        name="청바지", price=300, status=ProductStatus.ACTIVE
+    )
+    token = authentication_service.encode_token(user_id=user.id)
+    order_id = api_client.post(
+        "/products/orders",
+        data={"order_lines": [{"product_id": product.id, "quantity": 1}]},
+        headers={"Authorization": f"Bearer {token}"},
+    ).json()["results"]["id"]
+    # v1 결제는 ServiceUser.points 와 UserPointsHistory 만 차감한다
+    confirmed = api_client.post(
+        f"/products/orders/{order_id}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    user.refresh_from_db()
+    paid_points = user.points
+
+    # when
+    result = points_reconciliation_service.reconcile(chunk_size=10)
+
+    # then
+    assert confirmed.status_code == 200
+    assert (
+        result["ledger_broken"],
+        result["balance_mismatch"],
+        result["history_mismatch"],
+    ) == (0, 1, 0)
+    user.refresh_from_db()
+    assert paid_points < 1000
+    assert user.points == paid_points
+
+
+@pytest.mark.django_db
+def test_reconcile_points_command(capsys):
+    # given
+    ServiceUser.objects.create(email="goodpang@example.com")
+
+    # when
+    call_command("reconcile_points")
+
+    # then
+    assert '"users": 1' in capsys.readouterr().out
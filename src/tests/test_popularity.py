@@ -0,0 +1,144 @@
+import pytest
+
+from product.models import Category, Product, ProductStatus
+from product.service.outbox import OutboxRelay
+from product.service.popularity import PopularitySink, popularity_service
+from user.authentication import authentication_service
+from user.models import ServiceUser
+
+
+def place_paid_order(api_client, token, order_lines) -> int:
+    order_id = api_client.post(
+        "/products/orders",
+        data={"order_lines": order_lines},
+        headers={"Authorization": f"Bearer {token}"},
+    ).json()["results"]["id"]
+    api_client.post(
+        f"/products/orders/{order_id}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return order_id
+
+
+@pytest.mark.django_db
+def test_popularity_from_paid_and_cancelled_orders(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=100_000)
+    token = authentication_service.encode_token(user_id=user.id)
+    jeans = Product.objects.create(
+        name="청바지", price=1000, status=ProductStatus.ACTIVE
+    )
+    shirt = Product.objects.create(
+        name="티셔츠", price=500, status=ProductStatus.ACTIVE
+    )
+    relay = OutboxRelay(sinks=[PopularitySink()], batch_size=100)
+
+    place_paid_order(api_client, token, [{"product_id": jeans.id, "quantity": 1}])
+    second = place_paid_order(
+        api_client, token, [{"product_id": shirt.id, "quantity": 2}]
+    )
+
+    # when
+    relay.relay_batch()
+    jeans.refresh_from_db()
+    shirt.refresh_from_db()
+    paid = (jeans.popularity, shirt.popularity)
+
+    api_client.post(
+        f"/products/orders/{second}/cancel",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    relay.relay_batch()
+    shirt.refresh_from_db()
+
+    # then
+    assert 0 < paid[0] < paid[1]
+    assert shirt.popularity == pytest.approx(0, abs=1e-6 * paid[1])
+
+    # 다시 계산해도 incremental 결과와 같다
+    popularity_service.rebuild(days=1)
+    jeans_popularity = jeans.popularity
+    jeans.refresh_from_db()
+    assert jeans.popularity == pytest.approx(jeans_popularity)
+
+
+@pytest.mark.django_db
+def test_rebuild_with_unrelayed_events(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=100_000)
+    token = authentication_service.encode_token(user_id=user.id)
+    jeans = Product.objects.create(
+        name="청바지", price=1000, status=ProductStatus.ACTIVE
+    )
+    shirt = Product.objects.create(
+        name="티셔츠", price=500, status=ProductStatus.ACTIVE
+    )
+    relay = OutboxRelay(sinks=[PopularitySink()], batch_size=100)
+    cancelled = place_paid_order(
+        api_client, token, [{"product_id": shirt.id, "quantity": 1}]
+    )
+    relay.relay_batch()
+
+    # 결제 event 하나와 취소 event 하나가 아직 relay 되지 않은 상태
+    place_paid_order(api_client, token, [{"product_id": jeans.id, "quantity": 1}])
+    api_client.post(
+        f"/products/orders/{cancelled}/cancel",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    # when
+    popularity_service.rebuild(days=1)
+    jeans.refresh_from_db()
+    shirt.refresh_from_db()
+    rebuilt = (jeans.popularity, shirt.popularity)
+    relay.relay_batch()
+    jeans.refresh_from_db()
+    shirt.refresh_from_db()
+
+    # then
+    # rebuild 는 relay 된 event 까지만 반영하고, 남은 event 는 relay 가 한 번씩 더한다
+    assert rebuilt[0] == 0 and rebuilt[1] > 0
+    assert jeans.popularity == pytest.approx(rebuilt[1])
+    assert shirt.popularity == pytest.approx(0, abs=1e-6 * rebuilt[1])
+
+
+@pytest.mark.django_db
+def test_popular_listing_from_top_k(api_client, django_assert_num_queries):
+    # given
+    parent = Category.objects.create(name="의류")
+    child = Category.objects.create(name="바지", parent=parent)
+    products = [
+        Product.objects.create(
+            name=f"상품{i}",
+            price=1000,
+            status=ProductStatus.ACTIVE,
+            category=parent if i % 2 else child,
+            popularity=i,
+        )
+        for i in range(5)
+    ]
+    Product.objects.create(
+        name="판매중지", price=1000, status=ProductStatus.INACTIVE, popularity=100
+    )
+    expected = [products[i].id for i in (4, 3, 2)]
+
+    # when
+    # 가격 조건이 있으면 DB 조회
+    from_db = api_client.get(
+        "/products",
+        {"category_id": parent.id, "sort": "popular", "limit": 3, "min_price": 0},
+    )
+    # 첫 요청에서 top-K 를 읽어 둔다
+    api_client.get("/products", {"sort": "popular", "limit": 3})
+    with django_assert_num_queries(0):
+        from_top_k = api_client.get(
+            "/products",
+            {"category_id": parent.id, "sort": "popular", "limit": 3, "fields": "id"},
+        )
+        global_top_k = api_client.get("/products", {"sort": "popular", "limit": 1})
+
+    # then
+    assert [p["id"] for p in from_db.json()["results"]["products"]] == expected
+    assert from_top_k.json()["results"]["products"] == [{"id": i} for i in expected]
+    assert global_top_k.json()["results"]["products"][0]["id"] == products[4].id
@@ -1,7 +1,16 @@
+import msgpack
 import pytest
 from schema import Schema
 
-from product.models import Order, OrderLine, OrderStatus, Product, ProductStatus
+from config.renderers import accepts_msgpack
+from product.models import (
+    Category,
+    Order,
+    OrderLine,
+    OrderStatus,
+    Product,
+    ProductStatus,
+)
 from user.authentication import authentication_service
 from user.models import ServiceUser, UserPoints, UserPointsHistory
 
@@ -65,7 +74,7 @@ def test_order_products(api_client):
 
 
 @pytest.mark.django_db
-def test_confirm_order(api_client):
+def test_confirm_order(api_client, payment_gateway):
     # given
     user = ServiceUser.objects.create(email="goodpang@example.com", points=1000)
     token = authentication_service.encode_token(user_id=user.id)
@@ -77,7 +86,7 @@ def test_confirm_order(api_client):
     # when
     response = api_client.post(
         f"/products/orders/{order.id}/confirm",
-        # data={"payment_key": "payment_key"},
+        data={"payment_key": "payment_key"},
         headers={"Authorization": f"Bearer {token}"},
     )
 
@@ -92,7 +101,7 @@ def test_confirm_order(api_client):
 
 
 @pytest.mark.django_db
-def test_confirm_order_v2(api_client):
+def test_confirm_order_v2(api_client, payment_gateway):
     # given
     user = ServiceUser.objects.create(email="goodpang@example.com")
     token = authentication_service.encode_token(user_id=user.id)
@@ -108,6 +117,7 @@ def test_confirm_order_v2(api_client):
     # when
     response = api_client.post(
         f"/products/orders/{order.id}/confirm-v2",
+        data={"payment_key": "payment_key"},
         headers={"Authorization": f"Bearer {token}"},
     )
 
@@ -124,3 +134,194 @@ def test_confirm_order_v2(api_client):
 
     assert last_points.points_change == -1000
     assert last_points.points_sum == 0
+
+
+@pytest.mark.django_db
+def test_confirm_order_payment_rejected(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=1000)
+    token = authentication_service.encode_token(user_id=user.id)
+
+    order = Order.objects.create(
+        user=user, total_price=1000, status=OrderStatus.PENDING
+    )
+
+    # when
+    response = api_client.post(
+        f"/products/orders/{order.id}/confirm",
+        data={"payment_key": "invalid_payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    # then
+    assert response.status_code == 400
+    assert Order.objects.get(id=order.id).status == OrderStatus.PENDING
+    assert ServiceUser.objects.get(id=user.id).points == 1000
+
+
+@pytest.mark.django_db
+def test_confirm_order_payment_gateway_unavailable(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=1000)
+    token = authentication_service.encode_token(user_id=user.id)
+
+    order = Order.objects.create(
+        user=user, total_price=1000, status=OrderStatus.PENDING
+    )
+    payment_gateway.status = 502
+
+    # when
+    response = api_client.post(
+        f"/products/orders/{order.id}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    # then
+    assert response.status_code == 503
+    assert Order.objects.get(id=order.id).status == OrderStatus.PENDING
+
+
+@pytest.mark.django_db
+def test_confirm_order_cancels_payment_on_failure(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=0)
+    token = authentication_service.encode_token(user_id=user.id)
+
+    order = Order.objects.create(
+        user=user, total_price=1000, status=OrderStatus.PENDING
+    )
+
+    # when
+    response = api_client.post(
+        f"/products/orders/{order.id}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    # then
+    assert response.status_code == 409
+    assert Order.objects.get(id=order.id).status == OrderStatus.PENDING
+    assert [path for path, _ in payment_gateway.requests] == [
+        "/v1/payments/confirm",
+        "/v1/payments/payment_key/cancel",
+    ]
+
+
+@pytest.mark.django_db
+def test_get_product_list_price_range_and_sort(api_client):
+    # given
+    for name, price in [("청바지", 30000), ("티셔츠", 10000), ("모자", 5000)]:
+        Product.objects.create(name=name, price=price, status=ProductStatus.ACTIVE)
+
+    # when
+    response = api_client.get(
+        "/products", {"min_price": 6000, "max_price": 30000, "sort": "price_desc"}
+    )
+
+    # then
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json()["results"]["products"]] == [
+        "청바지",
+        "티셔츠",
+    ]
+    assert "facets" not in response.json()["results"]
+
+
+@pytest.mark.django_db
+def test_get_product_list_facets(api_client):
+    # given
+    parent = Category.objects.create(name="의류")
+    top = Category.objects.create(name="상의", parent=parent)
+    bottom = Category.objects.create(name="하의", parent=parent)
+    for category, price in [(top, 5000), (top, 20000), (bottom, 40000), (None, 1)]:
+        Product.objects.create(
+            name="상품", price=price, status=ProductStatus.ACTIVE, category=category
+        )
+
+    # when
+    response = api_client.get(
+        "/products", {"category_id": parent.id, "min_price": 10000, "facets": True}
+    )
+
+    # then
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert sorted(p["price"] for p in results["products"]) == [20000, 40000]
+    assert results["facets"] == {
+        "categories": [
+            {"category_id": top.id, "count": 1},
+            {"category_id": bottom.id, "count": 1},
+        ],
+        "prices": [
+            {"min_price": 0, "max_price": 10000, "count": 1},
+            {"min_price": 10000, "max_price": 30000, "count": 1},
+            {"min_price": 30000, "max_price": 50000, "count": 1},
+        ],
+    }
+
+
+@pytest.mark.django_db
+def test_get_product_list_sparse_fields(api_client):
+    # given
+    Product.objects.create(name="청바지", price=30000, status=ProductStatus.ACTIVE)
+
+    # when
+    response = api_client.get("/products", {"fields": "name"})
+
+    # then
+    assert response.status_code == 200
+    assert Schema({"results": {"products": [{"id": int, "name": "청바지"}]}}).validate(
+        response.json()
+    )
+
+
+@pytest.mark.django_db
+def test_get_product_list_invalid_fields(api_client):
+    # when
+    response = api_client.get("/products", {"fields": "name,password"})
+
+    # then
+    assert response.status_code == 400
+    assert response.json() == {"results": {"message": "Invalid fields"}}
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        ("application/msgpack", True),
+        ("application/x-msgpack, */*", True),
+        ("application/msgpack;q=0", False),
+        ("application/json, application/msgpack;q=0.5", False),
+        ("text/html, application/msgpack;q=0.9, */*;q=0.8", True),
+        ("*/*", False),
+        ("", False),
+    ],
+)
+def test_accepts_msgpack(rf, accept, expected):
+    # when
+    request = rf.get("/products", HTTP_ACCEPT=accept)
+
+    # then
+    assert accepts_msgpack(request) is expected
+
+
+@pytest.mark.django_db
+def test_get_product_list_msgpack(api_client):
+    # given
+    product = Product.objects.create(
+        name="청바지", price=30000, status=ProductStatus.ACTIVE
+    )
+
+    # when
+    response = api_client.get(
+        "/products", {"fields": "price"}, HTTP_ACCEPT="application/msgpack"
+    )
+
+    # then
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/msgpack"
+    assert response["Vary"] == "Accept, Accept-Encoding"
+    assert msgpack.unpackb(response.content) == {
+        "results": {"products": [{"id": product.id, "price": 30000}]}
+    }
@@ -0,0 +1,68 @@
+import pytest
+
+from product.models import Product, ProductStatus
+from product.service.product import product_service
+
+
+@pytest.mark.django_db
+def test_product_bulk_update(api_client, settings, django_capture_on_commit_callbacks):
+    # given
+    settings.ADMIN_API_KEY = "admin-key"
+    settings.PRODUCT_BULK_UPDATE_CHUNK_SIZE = 2
+    p1 = Product.objects.create(name="청바지", price=1000, status=ProductStatus.ACTIVE)
+    p2 = Product.objects.create(name="티셔츠", price=500, status=ProductStatus.ACTIVE)
+    p3 = Product.objects.create(name="모자", price=300, status=ProductStatus.ACTIVE)
+    product_service.all_products()
+
+    # when
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        response = api_client.post(
+            "/products/admin/bulk-update",
+            data={
+                "changes": [
+                    {"product_id": p1.id, "price": 900},
+                    {"product_id": p2.id, "status": "paused"},
+                    {"product_id": p3.id, "price": 200, "status": "inactive"},
+                    {"product_id": 0, "price": 1},
+                ]
+            },
+            headers={"X-Admin-Key": "admin-key"},
+        )
+
+    # then
+    assert response.status_code == 200
+    assert response.json()["results"] == {
+        "updated": 3,
+        "not_found": 1,
+        "results": [
+            {"product_id": p1.id, "updated": True},
+            {"product_id": p2.id, "updated": True},
+            {"product_id": p3.id, "updated": True},
+            {"product_id": 0, "updated": False},
+        ],
+    }
+    assert len(callbacks) == 1
+    assert list(Product.objects.order_by("id").values_list("price", "status")) == [
+        (900, "active"),
+        (500, "paused"),
+        (200, "inactive"),
+    ]
+    assert [product["id"] for product in product_service.all_products()] == [p1.id]
+
+
+@pytest.mark.django_db
+def test_product_bulk_update_invalid_status(api_client, settings):
+    # given
+    settings.ADMIN_API_KEY = "admin-key"
+    product = Product.objects.create(name="청바지", price=1000, status="active")
+
+    # when
+    response = api_client.post(
+        "/products/admin/bulk-update",
+        data={"changes": [{"product_id": product.id, "status": "deleted"}]},
+        headers={"X-Admin-Key": "admin-key"},
+    )
+
+    # then
+    assert response.status_code == 422
+    assert Product.objects.get(id=product.id).status == "active"
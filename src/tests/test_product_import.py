@@ -0,0 +1,95 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test.client import MULTIPART_CONTENT
+
+from product.models import Category, Product, ProductStatus
+
+CSV_CATALOG = """sku,name,price,status,category,tags
+SKU-1,청바지,1000,active,하의,jeans
+SKU-2,티셔츠,500,,상의,shirt
+SKU-3,모자,-1,active,,cap
+SKU-4,양말,100,unknown,,socks
+SKU-1,청바지 v2,1200,paused,하의,jeans
+"""
+
+
+@pytest.mark.django_db
+def test_import_products_csv(api_client, settings):
+    # given
+    settings.ADMIN_API_KEY = "admin-key"
+    category = Category.objects.create(name="하의")
+    Product.objects.create(
+        sku="SKU-2", name="old", price=1, status=ProductStatus.INACTIVE
+    )
+    catalog = io.BytesIO(CSV_CATALOG.encode())
+    catalog.name = "catalog.csv"
+
+    # when
+    response = api_client.post(
+        "/products/admin/import?batch_size=2",
+        data={"catalog": catalog},
+        content_type=MULTIPART_CONTENT,
+        headers={"X-Admin-Key": "admin-key"},
+    )
+
+    # then
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results["total"] == 5
+    assert (results["inserted"], results["updated"]) == (1, 2)
+    assert results["rejected"] == 2
+    assert results["unresolved_categories"] == 1
+    assert [(error["sku"], error["error"]) for error in results["errors"]] == [
+        ("SKU-3", "invalid price"),
+        ("SKU-4", "invalid status"),
+    ]
+
+    jeans = Product.objects.get(sku="SKU-1")
+    assert (jeans.name, jeans.price, jeans.status) == ("청바지 v2", 1200, "paused")
+    assert jeans.category_id == category.id
+    shirt = Product.objects.get(sku="SKU-2")
+    assert (shirt.name, shirt.status, shirt.category_id) == ("티셔츠", "active", None)
+    assert Product.objects.filter(search_vector="jeans").count() == 1
+    # 기존 상품의 tags 가 바뀌면 trigger 가 search_vector 를 다시 계산
+    assert Product.objects.filter(search_vector="shirt").get() == shirt
+
+
+@pytest.mark.django_db
+def test_import_products_requires_admin_key(api_client, settings):
+    # given
+    settings.ADMIN_API_KEY = "admin-key"
+
+    # when
+    response = api_client.post(
+        "/products/admin/import",
+        data={"catalog": io.BytesIO(CSV_CATALOG.encode())},
+        content_type=MULTIPART_CONTENT,
+        headers={"X-Admin-Key": "wrong"},
+    )
+
+    # then
+    assert response.status_code == 401
+    assert not Product.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_products_ndjson_command(tmp_path):
+    # given
+    path = tmp_path / "catalog.ndjson"
+    path.write_text(
+        "\n".join(
+            json.dumps({"sku": f"SKU-{i}", "name": f'상품 "{i}"', "price": i})
+            for i in range(1, 6)
+        )
+        + "\n"
+    )
+
+    # when
+    call_command("import_products", str(path), "--batch-size", "2")
+
+    # then
+    assert Product.objects.count() == 5
+    assert Product.objects.get(sku="SKU-3").name == '상품 "3"'
@@ -0,0 +1,99 @@
+import pytest
+from django.test import RequestFactory
+
+from config.ratelimit import LocalBackend, client_ip_key, parse_rate
+from user.authentication import authentication_service
+from user.models import ServiceUser
+
+
+def test_parse_rate():
+    assert parse_rate("10/s") == (10, 10.0)
+    assert parse_rate("120/m") == (120, 2.0)
+
+
+def test_local_backend_token_bucket(mocker):
+    # given
+    backend = LocalBackend()
+    rate = parse_rate("2/s")
+    now = mocker.patch("config.ratelimit.time.monotonic", return_value=100.0)
+
+    # when & then
+    assert backend.consume(key="k", rate=rate) == 0
+    assert backend.consume(key="k", rate=rate) == 0
+    assert backend.consume(key="k", rate=rate) == pytest.approx(0.5)
+
+    now.return_value = 100.5
+    assert backend.consume(key="k", rate=rate) == 0
+    assert backend.consume(key="k", rate=rate) > 0
+
+
+def test_local_backend_evicts_least_recently_used():
+    # given
+    backend = LocalBackend(max_keys=2)
+    rate = parse_rate("1/h")
+    backend.consume(key="a", rate=rate)
+    backend.consume(key="b", rate=rate)
+
+    # when
+    backend.consume(key="c", rate=rate)
+
+    # then
+    assert backend.consume(key="a", rate=rate) == 0
+    assert backend.consume(key="c", rate=rate) > 0
+
+
+def test_client_ip_key_behind_proxy(settings):
+    # given
+    settings.RATE_LIMIT_NUM_PROXIES = 1
+    request = RequestFactory().get(
+        "/", HTTP_X_FORWARDED_FOR="1.1.1.1, 2.2.2.2", REMOTE_ADDR="10.0.0.1"
+    )
+
+    # when & then
+    assert client_ip_key(request) == "2.2.2.2"
+
+
+@pytest.mark.django_db
+def test_user_login_rate_limited(api_client, settings):
+    # given
+    settings.RATE_LIMITS = {"user_login": "2/m"}
+    ServiceUser.objects.create(email="goodpang@example.com")
+
+    # when
+    responses = [
+        api_client.post(
+            "/users/log-in",
+            data={"email": "goodpang@example.com"},
+            REMOTE_ADDR="10.0.0.29",
+        )
+        for _ in range(3)
+    ]
+
+    # then
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[-1]["Retry-After"] == "30"
+    assert responses[-1].json() == {"results": {"message": "Too Many Requests"}}
+
+
+@pytest.mark.django_db
+def test_order_rate_limited_before_db(api_client, settings, django_assert_num_queries):
+    # given
+    settings.RATE_LIMITS = {"order": "1/m"}
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    token = authentication_service.encode_token(user_id=user.id)
+    api_client.post(
+        "/products/orders",
+        data={"order_lines": []},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    # when
+    with django_assert_num_queries(0):
+        response = api_client.post(
+            "/products/orders",
+            data={"order_lines": []},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    # then
+    assert response.status_code == 429
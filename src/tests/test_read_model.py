@@ -0,0 +1,94 @@
+import gzip
+
+import pytest
+
+from config.shared_store import SharedReadModelStore
+from product.models import Category, Product, ProductStatus
+from product.service.read_model import read_model_service, read_model_store
+
+
+@pytest.fixture
+def shared_read_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(read_model_store, "path", str(tmp_path / "read_model.bin"))
+    monkeypatch.setattr(read_model_store, "check_interval", 0)
+    monkeypatch.setattr(read_model_store, "_snapshot", None)
+    yield read_model_store
+
+
+def test_shared_read_model_store_generation_swap(tmp_path):
+    # given
+    writer = SharedReadModelStore(path=str(tmp_path / "rm.bin"), check_interval=0)
+    reader = SharedReadModelStore(path=str(tmp_path / "rm.bin"), check_interval=0)
+    assert reader.get("a") is None
+
+    # when
+    writer.publish(entries={"a": b"first", "b": b"[]"})
+    first = reader.get("a")
+    writer.publish(entries={"a": b"second"})
+
+    # then
+    assert bytes(first) == b"first"
+    assert bytes(reader.get("a")) == b"second"
+    assert reader.get("b") is None
+    assert reader.snapshot().generation == 2
+
+
+@pytest.mark.django_db
+def test_product_list_from_read_model(
+    api_client, shared_read_model, django_assert_num_queries
+):
+    # given
+    parent = Category.objects.create(name="의류")
+    child = Category.objects.create(name="하의", parent=parent)
+    Product.objects.create(
+        name="청바지", price=1, status=ProductStatus.ACTIVE, category=child
+    )
+    Product.objects.create(
+        name="티셔츠", price=2, status=ProductStatus.PAUSED, category=parent
+    )
+    paths = [
+        ("/products", {}),
+        ("/products", {"category_id": parent.id}),
+        ("/products/categories", {}),
+    ]
+    from_db = [api_client.get(path, params).content for path, params in paths]
+    read_model_service.refresh()
+
+    # when
+    with django_assert_num_queries(0):
+        from_read_model = [
+            api_client.get(path, params).content for path, params in paths
+        ]
+
+    # then
+    assert from_read_model == from_db
+
+
+@pytest.mark.django_db
+def test_product_list_from_read_model_precompressed(
+    api_client, shared_read_model, django_assert_num_queries
+):
+    # given
+    Product.objects.bulk_create(
+        [
+            Product(name=f"상품 {i}", price=i, status=ProductStatus.ACTIVE)
+            for i in range(100)
+        ]
+    )
+    read_model_service.refresh()
+    plain = api_client.get("/products")
+
+    # when
+    with django_assert_num_queries(0):
+        response = api_client.get("/products", HTTP_ACCEPT_ENCODING="gzip")
+
+    # then
+    assert response["Content-Encoding"] == "gzip"
+    # 같은 URL 이 Accept 에 따라 msgpack 으로도 응답하므로 shared cache 가 구분해야 한다
+    assert response["Vary"] == "Accept, Accept-Encoding"
+    assert bytes(response.content) == bytes(
+        read_model_service.get(
+            read_model_service.encoded_key(read_model_service.ALL_PRODUCTS_KEY, "gzip")
+        )
+    )
+    assert gzip.decompress(response.content) == plain.content
@@ -0,0 +1,89 @@
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from product.models import Order, OrderLine, OrderStatus, Product, ProductStatus
+from product.service.recommendation import (
+    Recommendation,
+    recommendation_service,
+    recommendation_store,
+    top_n,
+)
+from user.models import ServiceUser
+
+
+def create_order(user, products, status=OrderStatus.PAID) -> Order:
+    order = Order.objects.create(user=user, order_code=uuid4().hex, status=status)
+    OrderLine.objects.bulk_create(
+        [
+            OrderLine(
+                order=order,
+                product=product,
+                price=product.price,
+                created_at=order.created_at,
+            )
+            for product in products
+        ]
+    )
+    return order
+
+
+@pytest.fixture
+def store_path(tmp_path, settings, monkeypatch):
+    path = str(tmp_path / "recommendation.bin")
+    monkeypatch.setattr(recommendation_store, "path", path)
+    monkeypatch.setattr(recommendation_store, "check_interval", 0)
+    monkeypatch.setattr(recommendation_store, "_snapshot", None)
+    settings.ORDER_PENDING_EXPIRY_SECONDS = 0
+    settings.RECOMMENDATION_CUTOFF_MARGIN_SECONDS = 0
+    yield path
+
+
+def test_top_n_keeps_largest_counts_per_row():
+    # given
+    counts = sparse.csr_matrix(
+        np.array([[0, 1, 3, 3], [1, 0, 0, 2], [0, 0, 0, 0], [5, 2, 1, 0]])
+    )
+
+    # when
+    top = top_n(counts, n=2).toarray()
+
+    # then
+    assert top.tolist() == [[0, 0, 3, 3], [1, 0, 0, 2], [0, 0, 0, 0], [5, 2, 0, 0]]
+
+
+@pytest.mark.django_db
+def test_recommendations_incremental_update(api_client, store_path):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    jeans, shirt, socks, cap = [
+        Product.objects.create(name=name, price=1000, status=ProductStatus.ACTIVE)
+        for name in ("청바지", "티셔츠", "양말", "모자")
+    ]
+    create_order(user, [jeans, shirt, socks])
+    create_order(user, [jeans, shirt])
+    create_order(user, [jeans, cap], status=OrderStatus.CANCELLED)
+    recommendation_service.update(chunk_size=1)
+
+    # when
+    create_order(user, [jeans, socks])
+    create_order(user, [jeans, socks])
+    recommendation_service.update(chunk_size=1)
+    response = api_client.get(f"/products/{jeans.id}/recommendations")
+
+    # then
+    assert response.status_code == 200
+    assert response.json()["results"]["products"] == [
+        {"id": socks.id, "name": "양말", "price": 1000, "count": 3},
+        {"id": shirt.id, "name": "티셔츠", "price": 1000, "count": 2},
+    ]
+    assert recommendation_service.recommendations(product_id=cap.id, limit=10) == []
+
+    # 처음부터 다시 계산해도 incremental 결과와 같다
+    recommendation_service.update(chunk_size=100, full=True)
+    assert recommendation_service.recommendations(product_id=jeans.id, limit=10) == [
+        Recommendation(product_id=socks.id, count=3),
+        Recommendation(product_id=shirt.id, count=2),
+    ]
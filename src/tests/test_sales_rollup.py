@@ -0,0 +1,161 @@
+import pytest
+from django.utils import timezone
+
+from product.models import Category, Product, ProductSalesDaily, ProductStatus
+from product.service.outbox import OutboxRelay
+from product.service.sales_rollup import SalesRollupSink, sales_report_service
+from user.authentication import authentication_service
+from user.models import ServiceUser
+
+
+def place_order(api_client, token, order_lines) -> int:
+    response = api_client.post(
+        "/products/orders",
+        data={"order_lines": order_lines},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return response.json()["results"]["id"]
+
+
+@pytest.mark.django_db
+def test_sales_rollup_from_paid_and_cancelled_orders(
+    api_client, payment_gateway, settings
+):
+    # given
+    settings.ADMIN_API_KEY = "admin-key"
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=100_000)
+    token = authentication_service.encode_token(user_id=user.id)
+    category = Category.objects.create(name="의류")
+    jeans = Product.objects.create(
+        name="청바지", price=1000, status=ProductStatus.ACTIVE, category=category
+    )
+    shirt = Product.objects.create(
+        name="티셔츠", price=500, status=ProductStatus.ACTIVE, category=category
+    )
+    relay = OutboxRelay(sinks=[SalesRollupSink()], batch_size=100)
+
+    first = place_order(
+        api_client,
+        token,
+        [
+            {"product_id": jeans.id, "quantity": 2},
+            {"product_id": shirt.id, "quantity": 1},
+        ],
+    )
+    second = place_order(api_client, token, [{"product_id": jeans.id, "quantity": 1}])
+    for order_id in (first, second):
+        api_client.post(
+            f"/products/orders/{order_id}/confirm",
+            data={"payment_key": "payment_key"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    relay.relay_batch()
+
+    # when
+    paid = api_client.get(
+        "/products/admin/sales/products", headers={"X-Admin-Key": "admin-key"}
+    )
+    api_client.post(
+        f"/products/orders/{second}/cancel",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    relay.relay_batch()
+    cancelled = api_client.get(
+        f"/products/admin/sales/products/{jeans.id}",
+        headers={"X-Admin-Key": "admin-key"},
+    )
+    categories = api_client.get(
+        "/products/admin/sales/categories", headers={"X-Admin-Key": "admin-key"}
+    )
+
+    # then
+    assert paid.status_code == 200
+    assert paid.json()["results"]["products"] == [
+        {"product_id": jeans.id, "quantity": 3, "revenue": 2700, "order_count": 2},
+        {"product_id": shirt.id, "quantity": 1, "revenue": 450, "order_count": 1},
+    ]
+    today = timezone.now().date().isoformat()
+    assert cancelled.json()["results"]["days"] == [
+        {"day": today, "quantity": 2, "revenue": 1800, "order_count": 1}
+    ]
+    assert categories.json()["results"]["categories"] == [
+        {"category_id": category.id, "quantity": 3, "revenue": 2250, "order_count": 1}
+    ]
+
+    # rollup 을 다시 계산해도 incremental 결과와 같다
+    incremental = list(
+        ProductSalesDaily.objects.order_by("product_id").values_list(
+            "product_id", "quantity", "revenue", "order_count"
+        )
+    )
+    sales_report_service.rebuild(start=timezone.now().date(), end=timezone.now().date())
+    assert (
+        list(
+            ProductSalesDaily.objects.order_by("product_id").values_list(
+                "product_id", "quantity", "revenue", "order_count"
+            )
+        )
+        == incremental
+    )
+
+
+@pytest.mark.django_db
+def test_sales_report_invalid_range(api_client, settings):
+    # given
+    settings.ADMIN_API_KEY = "admin-key"
+
+    # when
+    response = api_client.get(
+        "/products/admin/sales/categories",
+        {"start": "2024-02-01", "end": "2024-01-01"},
+        headers={"X-Admin-Key": "admin-key"},
+    )
+
+    # then
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_rebuild_with_unrelayed_events(api_client, payment_gateway):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com", points=100_000)
+    token = authentication_service.encode_token(user_id=user.id)
+    jeans = Product.objects.create(
+        name="청바지", price=1000, status=ProductStatus.ACTIVE
+    )
+    relay = OutboxRelay(sinks=[SalesRollupSink()], batch_size=100)
+    cancelled = place_order(
+        api_client, token, [{"product_id": jeans.id, "quantity": 1}]
+    )
+    api_client.post(
+        f"/products/orders/{cancelled}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    relay.relay_batch()
+
+    # 결제 event 하나와 취소 event 하나가 아직 relay 되지 않은 상태
+    paid = place_order(api_client, token, [{"product_id": jeans.id, "quantity": 2}])
+    api_client.post(
+        f"/products/orders/{paid}/confirm",
+        data={"payment_key": "payment_key"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    api_client.post(
+        f"/products/orders/{cancelled}/cancel",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    # when
+    sales_report_service.rebuild(start=timezone.now().date(), end=timezone.now().date())
+    rebuilt = list(
+        ProductSalesDaily.objects.values_list("quantity", "revenue", "order_count")
+    )
+    relay.relay_batch()
+
+    # then
+    # rebuild 는 relay 된 event 까지만 반영하고, 남은 event 는 relay 가 한 번씩 더한다
+    assert rebuilt == [(1, 900, 1)]
+    assert list(
+        ProductSalesDaily.objects.values_list("quantity", "revenue", "order_count")
+    ) == [(2, 1800, 1)]
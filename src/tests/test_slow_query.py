@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from product.models import Category, Product, ProductStatus, SlowQuery
+from product.service.slow_query import (
+    SlowQueryLog,
+    fingerprint,
+    normalize_sql,
+    slow_query_log,
+)
+
+
+def test_normalize_sql_groups_queries_by_shape():
+    # given
+    queries = [
+        "SELECT * FROM product WHERE id IN (%s, %s, %s) AND name = 'jeans'",
+        "SELECT  *  FROM product WHERE id IN (%s) AND name = 'it''s'",
+        "SELECT * FROM product WHERE id IN (1, 2) AND name = %s",
+    ]
+
+    # when
+    normalized = {normalize_sql(sql) for sql in queries}
+
+    # then
+    assert normalized == {"SELECT * FROM product WHERE id IN (...) AND name = ?"}
+    assert fingerprint(normalized.pop()) != fingerprint(
+        normalize_sql("SELECT * FROM product WHERE name = %s")
+    )
+
+
+@pytest.mark.django_db
+def test_slow_queries_are_grouped_by_route_with_plan(api_client, monkeypatch, settings):
+    # given
+    settings.ADMIN_API_KEY = "admin-key"
+    # background thread 대신 직접 drain/flush 하고, 모든 query 를 느린 query 로 기록
+    monkeypatch.setattr(slow_query_log, "start", lambda: None)
+    monkeypatch.setattr(slow_query_log, "threshold", 0.0)
+    slow_query_log.drain()
+    slow_query_log._pending.clear()
+    slow_query_log._explained_at.clear()
+    categories = [Category.objects.create(name=name) for name in ("의류", "식품")]
+    for category in categories:
+        Product.objects.create(
+            name="상품", price=1000, status=ProductStatus.ACTIVE, category=category
+        )
+
+    # when
+    for category in categories:
+        api_client.get("/products", data={"category_id": category.id})
+    slow_query_log.drain()
+    slow_query_log.flush()
+    monkeypatch.setattr(slow_query_log, "threshold", 60.0)
+    response = api_client.get(
+        "/products/admin/slow-queries",
+        data={"order_by": "calls"},
+        headers={"X-Admin-Key": "admin-key"},
+    )
+
+    # then
+    assert response.status_code == 200
+    queries = response.json()["results"]["queries"]
+    products_queries = [query for query in queries if query["route"] == "products"]
+    assert products_queries
+    assert all(query["calls"] == 2 for query in products_queries)
+    assert SlowQuery.objects.filter(route="products").count() == len(products_queries)
+    plans = [query["plan"] for query in products_queries if query["plan"]]
+    assert plans and "Plan" in plans[0][0]
+    assert all(query["mean_ms"] <= query["max_ms"] for query in queries)
+
+
+def test_drain_returns_at_deadline_under_steady_load(monkeypatch):
+    # given
+    log = SlowQueryLog(
+        threshold_ms=0,
+        explain_interval=300,
+        explain_timeout_ms=1000,
+        queue_size=10_000,
+        flush_interval=0.05,
+    )
+    monkeypatch.setattr(log, "start", lambda: None)
+    stop = threading.Event()
+
+    def produce():
+        while not stop.is_set():
+            log.record(
+                sql="UPDATE product SET price = %s", params=[1], seconds=1, route="r"
+            )
+            time.sleep(0.0001)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    time.sleep(0.01)
+
+    # when
+    start = time.monotonic()
+    try:
+        log.drain(timeout=0.05)
+        elapsed = time.monotonic() - start
+    finally:
+        stop.set()
+        producer.join()
+
+    # then
+    assert elapsed < 1
+    assert sum(aggregate["calls"] for aggregate in log._pending.values()) > 0
+
+
+@pytest.mark.django_db
+def test_locking_select_is_explained_without_analyze(monkeypatch):
+    # given
+    log = SlowQueryLog(
+        threshold_ms=0,
+        explain_interval=300,
+        explain_timeout_ms=1000,
+        queue_size=10,
+        flush_interval=5,
+    )
+    monkeypatch.setattr(log, "start", lambda: None)
+    sql = 'SELECT "product"."id" FROM "product" WHERE "product"."id" = %s'
+    log.record(sql=sql, params=[1], seconds=1, route="r")
+    log.record(sql=f"{sql} FOR UPDATE", params=[1], seconds=1, route="r")
+
+    # when
+    log.drain()
+
+    # then
+    plans = {aggregate["sql"]: aggregate["plan"] for aggregate in log._pending.values()}
+    assert "Actual Rows" in plans[normalize_sql(sql)][0]["Plan"]
+    # row lock 을 다시 잡지 않도록 실행하지 않고 계획만 수집
+    assert "Actual Rows" not in plans[normalize_sql(f"{sql} FOR UPDATE")][0]["Plan"]
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+import jwt
+import pytest
+from django.utils import timezone
+
+from config.bloom import BloomFilter
+from user.authentication import authentication_service
+from user.models import ServiceUser, TokenType
+from user.revocation import TokenRevocationList, token_revocation_list
+
+
+def test_bloom_filter_has_no_false_negatives():
+    # given
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    values = [f"jti-{i}" for i in range(1000)]
+
+    # when
+    for value in values:
+        bloom.add(value)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+
+    # then
+    assert all(value in bloom for value in values)
+    assert false_positives < 300
+    assert not bloom.saturated
+
+
+@pytest.mark.django_db
+def test_repeated_sync_does_not_saturate_filter():
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    revocation_list = TokenRevocationList(
+        capacity=10, error_rate=0.01, sync_interval=0, rebuild_interval=60
+    )
+    revocation_list.maybe_sync()
+    expires_at = timezone.now() + timedelta(hours=1)
+    for i in range(5):
+        revocation_list.revoke(
+            jti=f"jti-{i}",
+            user_id=user.id,
+            token_type=TokenType.REFRESH,
+            expires_at=expires_at,
+        )
+
+    # when
+    # sync 마다 마지막 id 이전 구간(SYNC_OVERLAP_IDS)을 다시 읽는다
+    for _ in range(10):
+        revocation_list.maybe_sync()
+
+    # then
+    assert revocation_list._bloom.count == 5
+    assert not revocation_list._bloom.saturated
+
+
+@pytest.mark.django_db
+def test_refresh_token_rotation(api_client):
+    # given
+    ServiceUser.objects.create(email="goodpang@example.com")
+    tokens = api_client.post(
+        "/users/log-in", data={"email": "goodpang@example.com"}
+    ).json()["results"]
+
+    # when
+    refreshed = api_client.post(
+        "/users/token/refresh", data={"refresh_token": tokens["refresh_token"]}
+    )
+    reused = api_client.post(
+        "/users/token/refresh", data={"refresh_token": tokens["refresh_token"]}
+    )
+    # access token 으로는 refresh 할 수 없다
+    with_access_token = api_client.post(
+        "/users/token/refresh", data={"refresh_token": tokens["token"]}
+    )
+
+    # then
+    assert refreshed.status_code == 200
+    assert refreshed.json()["results"]["refresh_token"] != tokens["refresh_token"]
+    assert reused.status_code == 401
+    assert with_access_token.status_code == 401
+
+
+@pytest.mark.django_db
+def test_logout_revokes_tokens(api_client, django_assert_num_queries):
+    # given
+    user = ServiceUser.objects.create(email="goodpang@example.com")
+    tokens = authentication_service.issue_tokens(user_id=user.id)
+    headers = {"Authorization": f"Bearer {tokens['token']}"}
+    other_worker = TokenRevocationList(
+        capacity=1000, error_rate=0.01, sync_interval=0, rebuild_interval=60
+    )
+    other_worker.maybe_sync()
+    token_revocation_list.maybe_sync()
+
+    # 폐기되지 않은 token 의 인증은 DB 를 조회하지 않는다
+    with django_assert_num_queries(0):
+        before = api_client.get("/products/cart", headers=headers)
+
+    # when
+    logout = api_client.post(
+        "/users/log-out",
+        data={"refresh_token": tokens["refresh_token"]},
+        headers=headers,
+    )
+    after = api_client.get("/products/cart", headers=headers)
+    refresh = api_client.post(
+        "/users/token/refresh", data={"refresh_token": tokens["refresh_token"]}
+    )
+
+    # then
+    assert before.status_code == 200
+    assert logout.status_code == 200
+    assert after.status_code == 401
+    assert refresh.status_code == 401
+    # 다른 worker 는 다음 sync 에서 폐기된 token 을 반영한다
+    access_jti = jwt.decode(tokens["token"], options={"verify_signature": False})["jti"]
+    assert other_worker.is_revoked(jti=access_jti)
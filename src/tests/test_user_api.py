@@ -18,6 +18,7 @@ def test_user_login(api_client):
         {
             "results": {
                 "token": str,
+                "refresh_token": str,
             },
         },
     ).validate(response.json())
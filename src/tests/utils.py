@@ -1,3 +1,8 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
 from django.test import Client
 
 
@@ -22,3 +27,113 @@ class APIClient(Client):
             headers=headers,
             **extra,
         )
+
+
+class StubPaymentGateway(ThreadingHTTPServer):
+    """
+    PG 결제 승인/취소 API 를 흉내내는 local server
+    payment_key 가 "invalid" 로 시작하면 승인을 거절하고, status/delay 로 장애를 재현한다.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubPaymentGatewayHandler)
+        self.status: int = 200
+        self.delay: float = 0
+        self.requests: List[Tuple[str, dict]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def reset(self) -> None:
+        self.status = 200
+        self.delay = 0
+        self.requests = []
+
+
+class StubPaymentGatewayHandler(BaseHTTPRequestHandler):
+    server: StubPaymentGateway
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, body))
+        time.sleep(self.server.delay)
+
+        status: int = self.server.status
+        if status == 200 and body.get("paymentKey", "").startswith("invalid"):
+            status = 400
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps({"status": status}).encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeRedis:
+    """
+    cart backend 가 사용하는 hash 명령만 흉내내는 in-process redis client
+    ttl 은 기록만 하고 만료시키지 않는다.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return str(value).encode()
+
+    def hincrby(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        field = self._encode(field)
+        values[field] = self._encode(int(values.get(field, b"0")) + amount)
+        return int(values[field])
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[self._encode(field)] = self._encode(value)
+        return 1
+
+    def hdel(self, key, field):
+        removed = self.hashes.get(key, {}).pop(self._encode(field), None)
+        if key in self.hashes and not self.hashes[key]:
+            self.delete(key)
+        return int(removed is not None)
+
+    def hlen(self, key):
+        return len(self.hashes.get(key, {}))
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return key in self.hashes
+
+    def delete(self, key):
+        self.ttls.pop(key, None)
+        return int(self.hashes.pop(key, None) is not None)
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args):
+            self.commands.append((name, args))
+            return self
+
+        return command
+
+    def execute(self):
+        results = [getattr(self.client, name)(*args) for name, args in self.commands]
+        self.commands = []
+        return results
@@ -1 +1,12 @@
-# Register your models here.
+from django.contrib import admin
+
+from config.pagination import ApproximateCountPaginator
+from user.models import UserPointsHistory
+
+
+@admin.register(UserPointsHistory)
+class UserPointsHistoryAdmin(admin.ModelAdmin):
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    list_display = ("id", "user_id", "points_change", "reason", "created_at")
+    raw_id_fields = ("user",)
@@ -1,18 +1,30 @@
+import hmac
 import time
+from datetime import datetime, timezone
+from uuid import uuid4
 from typing import TypedDict, ClassVar
 
 from django.http import HttpRequest
 import jwt
 from django.conf import settings
-from ninja.security import HttpBearer
+from ninja.security import APIKeyHeader, HttpBearer
 
+from config.ratelimit import client_ip_key
 from user.exceptions import NotAuthorizedException, UserNotFoundException
-from user.models import ServiceUser
+from user.models import ServiceUser, TokenType
+from user.revocation import token_revocation_list
 
 
 class JWTPayload(TypedDict):
     user_id: int
     exp: int
+    jti: str
+    type: str  # access | refresh
+
+
+class TokenPair(TypedDict):
+    token: str
+    refresh_token: str
 
 
 class AuthenticationService:
@@ -23,22 +35,48 @@ class AuthenticationService:
     def _unix_timestamp(seconds_in_future: int) -> int:
         return int(time.time()) + seconds_in_future
 
-    def encode_token(self, user_id: int) -> str:
+    def _encode(self, user_id: int, token_type: TokenType, lifetime: int) -> str:
         return jwt.encode(
             {
                 "user_id": user_id,
-                "exp": self._unix_timestamp(seconds_in_future=24 * 60 * 60),
+                "exp": self._unix_timestamp(seconds_in_future=lifetime),
+                "jti": uuid4().hex,
+                "type": token_type.value,
             },
             self.JWT_SECRET_KEY,
             algorithm=self.JWT_ALGORITHM,
         )
 
-    def verify_token(self, jwt_token: str) -> int:
+    def encode_token(self, user_id: int) -> str:
+        return self._encode(
+            user_id=user_id,
+            token_type=TokenType.ACCESS,
+            lifetime=settings.ACCESS_TOKEN_LIFETIME_SECONDS,
+        )
+
+    def encode_refresh_token(self, user_id: int) -> str:
+        return self._encode(
+            user_id=user_id,
+            token_type=TokenType.REFRESH,
+            lifetime=settings.REFRESH_TOKEN_LIFETIME_SECONDS,
+        )
+
+    def issue_tokens(self, user_id: int) -> TokenPair:
+        return {
+            "token": self.encode_token(user_id=user_id),
+            "refresh_token": self.encode_refresh_token(user_id=user_id),
+        }
+
+    def decode_token(
+        self, jwt_token: str, token_type: TokenType = TokenType.ACCESS
+    ) -> JWTPayload:
         try:
             payload: JWTPayload = jwt.decode(
-                jwt_token, self.JWT_SECRET_KEY, algorithms=[self.JWT_ALGORITHM]
+                jwt_token,
+                self.JWT_SECRET_KEY,
+                algorithms=[self.JWT_ALGORITHM],
+                options={"require": ["user_id", "exp", "jti"]},
             )
-            user_id: int = payload["user_id"]
             exp: int = payload["exp"]
 
         # TODO : 다양한 case에 맞는 Exception을 처리
@@ -47,12 +85,52 @@ class AuthenticationService:
 
         if exp < self._unix_timestamp(seconds_in_future=0):
             raise NotAuthorizedException
-        return user_id
+        if payload.get("type") != token_type.value:
+            raise NotAuthorizedException
+        # 폐기되지 않은 token 은 memory 의 filter 만 확인하고 DB 를 조회하지 않는다
+        if token_revocation_list.is_revoked(jti=payload["jti"]):
+            raise NotAuthorizedException
+        return payload
+
+    def verify_token(self, jwt_token: str) -> int:
+        return self.decode_token(jwt_token=jwt_token)["user_id"]
+
+    @staticmethod
+    def revoke(payload: JWTPayload) -> bool:
+        return token_revocation_list.revoke(
+            jti=payload["jti"],
+            user_id=payload["user_id"],
+            token_type=TokenType(payload["type"]),
+            expires_at=datetime.fromtimestamp(payload["exp"], tz=timezone.utc),
+        )
+
+    def refresh(self, refresh_token: str) -> TokenPair:
+        """
+        refresh token 은 한 번만 사용할 수 있다(rotation). 이미 사용된 token 이면 NotAuthorizedException
+        """
+        payload: JWTPayload = self.decode_token(
+            jwt_token=refresh_token, token_type=TokenType.REFRESH
+        )
+        # 같은 token 으로 동시에 요청해도 폐기 row 의 unique 제약으로 한 요청만 성공
+        if not self.revoke(payload):
+            raise NotAuthorizedException
+        return self.issue_tokens(user_id=payload["user_id"])
 
 
 authentication_service = AuthenticationService()
 
 
+def user_rate_limit_key(request: HttpRequest) -> str:
+    # DB 조회 없이 token 의 user_id 로 구분하고, token 이 없거나 유효하지 않으면 ip 로 구분
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer":
+        try:
+            return f"user:{authentication_service.verify_token(jwt_token=token)}"
+        except NotAuthorizedException:
+            pass
+    return f"ip:{client_ip_key(request)}"
+
+
 class BearerAuth(HttpBearer):
     def authenticate(self, request, token) -> str:
         user_id: int = authentication_service.verify_token(jwt_token=token)
@@ -66,4 +144,31 @@ class AuthRequest(HttpRequest):
     user: ServiceUser
 
 
+class TokenAuth(HttpBearer):
+    # 사용자 조회 없이 token 의 user_id 만 사용하는 API 용
+    def authenticate(self, request, token) -> str:
+        request.user_id = authentication_service.verify_token(jwt_token=token)
+        return token
+
+
+class TokenAuthRequest(HttpRequest):
+    user_id: int
+
+
 bearer_auth = BearerAuth()
+token_auth = TokenAuth()
+
+
+class AdminKeyAuth(APIKeyHeader):
+    # 운영 도구용 API. ADMIN_API_KEY 가 설정되지 않으면 모든 요청을 거절
+    param_name = "X-Admin-Key"
+
+    def authenticate(self, request, key) -> str | None:
+        if settings.ADMIN_API_KEY and hmac.compare_digest(
+            key or "", settings.ADMIN_API_KEY
+        ):
+            return key
+        return None
+
+
+admin_auth = AdminKeyAuth()
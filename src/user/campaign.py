@@ -0,0 +1,161 @@
+import time
+from typing import Callable, List, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.utils import timezone
+
+from user.exceptions import PointsCampaignConflictException
+from user.models import PointsCampaign, PointsCampaignStatus, PointsCampaignTarget
+
+
+# chunk 의 user 에게 points 를 더하고, 같은 statement 안에서 두 ledger 에 row 를 추가한다
+# 지급은 교환 가능한 덧셈이므로 version 을 올리지 않는다. version 을 올리면 캠페인 중에
+# version 을 먼저 읽은 v1 결제 확인(confirm_order)이 모두 UserVersionConflictException 으로 실패한다
+GRANT_CHUNK_SQL = """
+WITH chunk AS (
+    {chunk_query}
+), granted AS (
+    UPDATE service_user u
+    SET points = u.points + %(points)s
+    FROM chunk
+    WHERE u.id = chunk.id
+    RETURNING u.id
+), history AS (
+    INSERT INTO user_points_history (user_id, points_change, reason, created_at)
+    SELECT id, %(points)s, %(reason)s, now() FROM granted
+), ledger AS (
+    INSERT INTO user_points
+        (user_id, version, points_change, points_sum, reason, created_at)
+    SELECT g.id, coalesce(last.version, 0) + 1, %(points)s,
+           coalesce(last.points_sum, 0) + %(points)s, %(reason)s, now()
+    FROM granted g
+    LEFT JOIN LATERAL (
+        SELECT version, points_sum FROM user_points
+        WHERE user_id = g.id ORDER BY version DESC LIMIT 1
+    ) AS last ON true
+)
+SELECT (SELECT max(id) FROM chunk), (SELECT count(*) FROM granted)
+"""
+
+ALL_USERS_CHUNK_QUERY = """
+    SELECT id FROM service_user
+    WHERE id > %(last_user_id)s ORDER BY id LIMIT %(chunk_size)s
+"""
+
+TARGET_USERS_CHUNK_QUERY = """
+    SELECT user_id AS id FROM points_campaign_target
+    WHERE campaign_id = %(campaign_id)s AND user_id > %(last_user_id)s
+    ORDER BY user_id LIMIT %(chunk_size)s
+"""
+
+
+class PointsCampaignService:
+    """
+    campaign 대상 user 를 id 순서로 chunk 단위로 나누어 points 를 지급한다.
+
+    - chunk 지급과 campaign 의 last_user_id 갱신이 같은 transaction 이므로,
+      중간에 멈춰도 다시 실행하면 남은 user 부터 이어서 지급하고 중복 지급하지 않는다.
+    - chunk 마다 짧은 transaction, lock_timeout, chunk 사이 pause 로 주문 처리와의 lock 경합을 줄인다.
+    """
+
+    @staticmethod
+    @transaction.atomic
+    def create_campaign(
+        code: str, points: int, user_ids: List[int] | None = None
+    ) -> PointsCampaign:
+        campaign, created = PointsCampaign.objects.get_or_create(
+            code=code, defaults={"points": points, "has_targets": user_ids is not None}
+        )
+        if not created:
+            # 같은 요청을 다시 보내면 기존 campaign 을 그대로 사용
+            if campaign.points != points:
+                raise PointsCampaignConflictException
+            return campaign
+
+        if user_ids is not None:
+            PointsCampaignTarget.objects.bulk_create(
+                objs=[
+                    PointsCampaignTarget(campaign=campaign, user_id=user_id)
+                    for user_id in set(user_ids)
+                ],
+                batch_size=10_000,
+            )
+        return campaign
+
+    @staticmethod
+    def grant_chunk(campaign_id: int, chunk_size: int) -> PointsCampaign:
+        with transaction.atomic():
+            # 같은 campaign 을 여러 process 가 실행해도 chunk 를 하나씩 순서대로 처리
+            campaign: PointsCampaign = PointsCampaign.objects.select_for_update().get(
+                id=campaign_id
+            )
+            if campaign.status == PointsCampaignStatus.COMPLETED:
+                return campaign
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SET LOCAL lock_timeout = %s",
+                    [settings.POINTS_CAMPAIGN_LOCK_TIMEOUT],
+                )
+                cursor.execute(
+                    GRANT_CHUNK_SQL.format(
+                        chunk_query=TARGET_USERS_CHUNK_QUERY
+                        if campaign.has_targets
+                        else ALL_USERS_CHUNK_QUERY
+                    ),
+                    {
+                        "campaign_id": campaign.id,
+                        "last_user_id": campaign.last_user_id,
+                        "chunk_size": chunk_size,
+                        "points": campaign.points,
+                        "reason": campaign.reason,
+                    },
+                )
+                row: Tuple[int | None, int] = cursor.fetchone()
+
+            last_user_id, granted = row
+            if last_user_id is None:
+                campaign.status = PointsCampaignStatus.COMPLETED
+                campaign.completed_at = timezone.now()
+            else:
+                campaign.last_user_id = last_user_id
+                campaign.granted_count += granted
+            campaign.save(
+                update_fields=[
+                    "status",
+                    "completed_at",
+                    "last_user_id",
+                    "granted_count",
+                ]
+            )
+        return campaign
+
+    def run(
+        self,
+        campaign_id: int,
+        chunk_size: int,
+        pause: float,
+        should_stop: Callable[[], bool] = lambda: False,
+    ) -> PointsCampaign:
+        retries: int = 0
+        while True:
+            try:
+                campaign: PointsCampaign = self.grant_chunk(
+                    campaign_id=campaign_id, chunk_size=chunk_size
+                )
+            except (OperationalError, IntegrityError):
+                # lock_timeout 또는 confirm_order_v2 와 같은 UserPoints version 충돌. chunk 전체가 rollback
+                retries += 1
+                if retries > settings.POINTS_CAMPAIGN_MAX_RETRIES:
+                    raise
+                time.sleep(pause * 2**retries)
+                continue
+
+            retries = 0
+            if campaign.status == PointsCampaignStatus.COMPLETED or should_stop():
+                return campaign
+            time.sleep(pause)
+
+
+points_campaign_service = PointsCampaignService()
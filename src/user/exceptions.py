@@ -12,3 +12,11 @@ class UserPointsNotEnoughException(Exception):
 
 class UserVersionConflictException(Exception):
     message = "User Version Conflict"
+
+
+class PointsCampaignConflictException(Exception):
+    message = "Points Campaign Already Exists With Different Points"
+
+
+class PointsCampaignNotFoundException(Exception):
+    message = "Points Campaign Not Found"
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from user.revocation import token_revocation_list
+
+
+class Command(BaseCommand):
+    help = "만료된 token 의 폐기 기록을 삭제"
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"purged {token_revocation_list.purge()} revoked tokens")
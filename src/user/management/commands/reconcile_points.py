@@ -0,0 +1,22 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from user.reconciliation import points_reconciliation_service
+
+
+class Command(BaseCommand):
+    help = "ServiceUser.points, UserPointsHistory, UserPoints ledger 의 불일치를 검사"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=50_000)
+        parser.add_argument(
+            "--start-after", type=int, default=0, help="이 user id 이후부터 검사"
+        )
+
+    def handle(self, *args, **options):
+        result = points_reconciliation_service.reconcile(
+            chunk_size=options["chunk_size"],
+            start_after=options["start_after"],
+        )
+        self.stdout.write(json.dumps(result, indent=2))
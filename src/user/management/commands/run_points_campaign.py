@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from user.campaign import points_campaign_service
+from user.exceptions import PointsCampaignConflictException
+from user.models import PointsCampaign
+
+
+class Command(BaseCommand):
+    help = "campaign points 를 chunk 단위로 지급. 중단된 campaign 은 남은 사용자부터 이어서 지급"
+
+    def add_arguments(self, parser):
+        parser.add_argument("code")
+        parser.add_argument(
+            "--points",
+            type=int,
+            default=None,
+            help="지정하면 campaign 이 없을 때 전체 사용자 대상으로 생성",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.POINTS_CAMPAIGN_CHUNK_SIZE
+        )
+        parser.add_argument(
+            "--pause", type=float, default=settings.POINTS_CAMPAIGN_CHUNK_PAUSE
+        )
+
+    def handle(self, *args, **options):
+        if options["points"] is not None:
+            try:
+                campaign = points_campaign_service.create_campaign(
+                    code=options["code"], points=options["points"]
+                )
+            except PointsCampaignConflictException as e:
+                raise CommandError(e.message)
+        elif not (
+            campaign := PointsCampaign.objects.filter(code=options["code"]).first()
+        ):
+            raise CommandError(f"campaign {options['code']} does not exist")
+
+        campaign = points_campaign_service.run(
+            campaign_id=campaign.id,
+            chunk_size=options["chunk_size"],
+            pause=options["pause"],
+        )
+        self.stdout.write(
+            f"campaign {campaign.code}: {campaign.status}, "
+            f"granted {campaign.granted_count} users"
+        )
@@ -0,0 +1,82 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:22
+
+import django.db.models.deletion
+import user.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0006_userpoints_userpoints_unique_user_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PointsCampaign",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.CharField(max_length=48)),
+                ("points", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        default=user.models.PointsCampaignStatus["RUNNING"],
+                        max_length=16,
+                    ),
+                ),
+                ("has_targets", models.BooleanField(default=False)),
+                ("last_user_id", models.BigIntegerField(default=0)),
+                ("granted_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("completed_at", models.DateTimeField(null=True)),
+            ],
+            options={
+                "db_table": "points_campaign",
+            },
+        ),
+        migrations.CreateModel(
+            name="PointsCampaignTarget",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("user_id", models.BigIntegerField()),
+            ],
+            options={
+                "db_table": "points_campaign_target",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="pointscampaign",
+            constraint=models.UniqueConstraint(
+                fields=("code",), name="unique_campaign_code"
+            ),
+        ),
+        migrations.AddField(
+            model_name="pointscampaigntarget",
+            name="campaign",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="user.pointscampaign"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="pointscampaigntarget",
+            constraint=models.UniqueConstraint(
+                fields=("campaign", "user_id"), name="unique_campaign_target"
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0007_pointscampaign"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevokedToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("jti", models.CharField(max_length=32)),
+                ("token_type", models.CharField(max_length=8)),
+                ("expires_at", models.DateTimeField()),
+                ("revoked_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="user.serviceuser",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "revoked_token",
+                "indexes": [
+                    models.Index(
+                        fields=["expires_at"], name="revoked_tok_expires_4f39c2_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="revokedtoken",
+            constraint=models.UniqueConstraint(
+                fields=("jti",), name="unique_revoked_token_jti"
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 
 from django.db import models
 
@@ -54,3 +55,72 @@ class UserPoints(models.Model):
                 fields=["user", "version"], name="unique_user_version"
             ),
         ]
+
+
+class PointsCampaignStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+
+
+class PointsCampaign(models.Model):
+    # ledger 의 reason 은 "campaign:<code>" 로 기록되므로 reason 길이(64) 안에 들어가야 한다
+    code = models.CharField(max_length=48)
+    points = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=16, default=PointsCampaignStatus.RUNNING
+    )  # running | completed
+    has_targets = models.BooleanField(default=False)
+    # 지급이 끝난 마지막 user id. chunk 와 같은 transaction 에서 갱신해서 재실행 시 이어서 지급
+    last_user_id = models.BigIntegerField(default=0)
+    granted_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        app_label = "user"
+        db_table = "points_campaign"
+        constraints = [
+            models.UniqueConstraint(fields=["code"], name="unique_campaign_code"),
+        ]
+
+    @property
+    def reason(self) -> str:
+        return f"campaign:{self.code}"
+
+
+class PointsCampaignTarget(models.Model):
+    campaign = models.ForeignKey(PointsCampaign, on_delete=models.CASCADE)
+    user_id = models.BigIntegerField()
+
+    class Meta:
+        app_label = "user"
+        db_table = "points_campaign_target"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["campaign", "user_id"], name="unique_campaign_target"
+            ),
+        ]
+
+
+class TokenType(str, Enum):
+    ACCESS = "access"
+    REFRESH = "refresh"
+
+
+class RevokedToken(models.Model):
+    # 만료 전에 폐기된 token 의 jti. 만료된 row 는 purge_revoked_tokens 로 정리
+    jti = models.CharField(max_length=32)
+    user = models.ForeignKey(ServiceUser, on_delete=models.CASCADE)
+    token_type = models.CharField(max_length=8)  # access | refresh
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = "user"
+        db_table = "revoked_token"
+        constraints = [
+            models.UniqueConstraint(fields=["jti"], name="unique_revoked_token_jti"),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
@@ -0,0 +1,153 @@
+from typing import List, Tuple, TypedDict
+
+import numpy as np
+from django.db import connection
+
+
+class PointsDrift(TypedDict):
+    user_id: int
+    points: int
+    history_sum: int
+    ledger_sum: int | None
+    ledger_balance: int | None
+
+
+class PointsReconciliationResult(TypedDict):
+    users: int
+    last_user_id: int
+    ledger_broken: int
+    balance_mismatch: int
+    history_mismatch: int
+    samples: List[PointsDrift]
+
+
+class PointsReconciliationService:
+    """
+    ServiceUser.points, UserPointsHistory, UserPoints ledger 가 서로 맞는지 user id 순서로 chunk 단위 검증한다.
+
+    - ledger_broken: ledger 의 points_change 합계와 마지막 version 의 points_sum 이 다름
+    - balance_mismatch: ledger 가 있는 사용자의 ServiceUser.points 가 마지막 points_sum 과 다름
+      (v1 결제는 ServiceUser.points/UserPointsHistory 만, v2 결제는 ledger 만 바꾸므로
+      두 경로를 함께 쓰는 사용자는 정상이어도 여기에 포함된다)
+    - history_mismatch: ServiceUser.points 가 UserPointsHistory 합계와 다름
+      (history 가 생기기 전에 지급된 points 도 여기에 포함된다)
+
+    조회는 lock 없이 index range scan 과 GROUP BY 로 하고, 비교는 NumPy 로 chunk 전체를 한 번에 한다.
+    어느 쪽이 맞는 값인지 알 수 없으므로 보고만 하고 고치지 않는다.
+    """
+
+    MAX_SAMPLES = 100
+
+    @staticmethod
+    def _fetch_chunk(
+        cursor, last_user_id: int, chunk_size: int
+    ) -> Tuple[np.ndarray, ...]:
+        cursor.execute(
+            "SELECT id, points FROM service_user WHERE id > %s ORDER BY id LIMIT %s",
+            [last_user_id, chunk_size],
+        )
+        users: List[Tuple[int, int]] = cursor.fetchall()
+        if not users:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, empty, empty, np.empty(0, dtype=bool)
+
+        user_ids = np.fromiter(
+            (row[0] for row in users), dtype=np.int64, count=len(users)
+        )
+        points = np.fromiter(
+            (row[1] for row in users), dtype=np.int64, count=len(users)
+        )
+        low, high = int(user_ids[0]), int(user_ids[-1])
+
+        cursor.execute(
+            """
+            SELECT user_id, sum(points_change) FROM user_points_history
+            WHERE user_id BETWEEN %s AND %s GROUP BY user_id
+            """,
+            [low, high],
+        )
+        history_sum = np.zeros(len(user_ids), dtype=np.int64)
+        if rows := cursor.fetchall():
+            history = np.array(rows, dtype=np.int64)
+            # chunk 는 [low, high] 범위의 user 를 모두 포함하므로 searchsorted 위치가 그대로 대응된다
+            history_sum[np.searchsorted(user_ids, history[:, 0])] = history[:, 1]
+
+        cursor.execute(
+            """
+            SELECT user_id,
+                   sum(points_change),
+                   (array_agg(points_sum ORDER BY version DESC))[1]
+            FROM user_points
+            WHERE user_id BETWEEN %s AND %s GROUP BY user_id
+            """,
+            [low, high],
+        )
+        ledger_sum = np.zeros(len(user_ids), dtype=np.int64)
+        ledger_balance = np.zeros(len(user_ids), dtype=np.int64)
+        has_ledger = np.zeros(len(user_ids), dtype=bool)
+        if rows := cursor.fetchall():
+            ledger = np.array(rows, dtype=np.int64)
+            positions = np.searchsorted(user_ids, ledger[:, 0])
+            ledger_sum[positions] = ledger[:, 1]
+            ledger_balance[positions] = ledger[:, 2]
+            has_ledger[positions] = True
+
+        return user_ids, points, history_sum, ledger_sum, ledger_balance, has_ledger
+
+    def reconcile(
+        self, chunk_size: int, start_after: int = 0
+    ) -> PointsReconciliationResult:
+        result: PointsReconciliationResult = {
+            "users": 0,
+            "last_user_id": start_after,
+            "ledger_broken": 0,
+            "balance_mismatch": 0,
+            "history_mismatch": 0,
+            "samples": [],
+        }
+        while True:
+            # chunk 마다 별도 query 로 읽어서 긴 transaction/snapshot 을 만들지 않는다
+            with connection.cursor() as cursor:
+                (
+                    user_ids,
+                    points,
+                    history_sum,
+                    ledger_sum,
+                    ledger_balance,
+                    has_ledger,
+                ) = self._fetch_chunk(
+                    cursor=cursor,
+                    last_user_id=result["last_user_id"],
+                    chunk_size=chunk_size,
+                )
+            if not len(user_ids):
+                return result
+
+            ledger_broken = has_ledger & (ledger_sum != ledger_balance)
+            balance_mismatch = has_ledger & (points != ledger_balance)
+            history_mismatch = points != history_sum
+
+            result["users"] += len(user_ids)
+            result["last_user_id"] = int(user_ids[-1])
+            result["ledger_broken"] += int(ledger_broken.sum())
+            result["balance_mismatch"] += int(balance_mismatch.sum())
+            result["history_mismatch"] += int(history_mismatch.sum())
+
+            drifted = np.flatnonzero(
+                ledger_broken | balance_mismatch | history_mismatch
+            )
+            for i in drifted[: self.MAX_SAMPLES - len(result["samples"])]:
+                result["samples"].append(
+                    {
+                        "user_id": int(user_ids[i]),
+                        "points": int(points[i]),
+                        "history_sum": int(history_sum[i]),
+                        "ledger_sum": int(ledger_sum[i]) if has_ledger[i] else None,
+                        "ledger_balance": int(ledger_balance[i])
+                        if has_ledger[i]
+                        else None,
+                    }
+                )
+
+
+points_reconciliation_service = PointsReconciliationService()
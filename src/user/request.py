@@ -1,5 +1,22 @@
-from ninja import Schema
+from typing import List
+
+from ninja import Field, Schema
 
 
 class UserLoginRequestBody(Schema):
     email: str
+
+
+class UserTokenRefreshRequestBody(Schema):
+    refresh_token: str
+
+
+class UserLogoutRequestBody(Schema):
+    refresh_token: str | None = None
+
+
+class PointsCampaignRequestBody(Schema):
+    code: str = Field(..., max_length=48)
+    points: int = Field(..., ge=1)
+    # 지정하지 않으면 전체 사용자 대상
+    user_ids: List[int] | None = None
@@ -1,5 +1,19 @@
+from datetime import datetime
+
 from ninja import Schema
 
 
 class UserTokenResponse(Schema):
     token: str
+    refresh_token: str
+
+
+class PointsCampaignResponse(Schema):
+    code: str
+    points: int
+    status: str
+    has_targets: bool
+    last_user_id: int
+    granted_count: int
+    created_at: datetime
+    completed_at: datetime | None
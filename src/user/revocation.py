@@ -0,0 +1,135 @@
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from config.bloom import BloomFilter
+from user.models import RevokedToken, TokenType
+
+
+class TokenRevocationList:
+    """
+    폐기된 token jti 를 worker 마다 bloom filter 로 보관한다.
+
+    - 인증마다 filter 만 확인하므로 폐기되지 않은 token 은 DB 를 조회하지 않는다.
+    - filter 에 있다고 나오면(폐기 또는 false positive) DB 로 한 번 더 확인한다.
+    - sync_interval 마다 마지막으로 읽은 id 이후의 폐기 row 만 읽어서 다른 worker 의 폐기를 반영하고,
+      rebuild_interval 마다 만료된 jti 를 빼고 filter 를 새로 만든다.
+    """
+
+    SYNC_OVERLAP_IDS = 1000
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        sync_interval: float,
+        rebuild_interval: float,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._bloom: BloomFilter | None = None
+        self._last_id: int = 0
+        self._synced_at: float = 0.0
+        self._rebuilt_at: float = 0.0
+
+    @staticmethod
+    def _rows(after_id: int) -> Iterable[Tuple[int, str]]:
+        return (
+            RevokedToken.objects.filter(id__gt=after_id, expires_at__gt=timezone.now())
+            .order_by("id")
+            .values_list("id", "jti")
+            .iterator(chunk_size=10_000)
+        )
+
+    def _rebuild(self) -> None:
+        bloom = BloomFilter(capacity=self.capacity, error_rate=self.error_rate)
+        last_id: int = 0
+        for last_id, jti in self._rows(after_id=0):
+            bloom.add(jti)
+        if bloom.saturated:
+            # 폐기 token 이 예상보다 많으면 다음 rebuild 부터 capacity 를 늘린다
+            self.capacity = bloom.count * 2
+        self._bloom, self._last_id = bloom, max(last_id, self._last_id)
+        self._rebuilt_at = time.monotonic()
+
+    def _sync(self) -> None:
+        # id 순서와 commit 순서가 다를 수 있으므로 마지막 id 이전 구간도 다시 읽는다(add 는 중복되어도 무방)
+        for last_id, jti in self._rows(after_id=self._last_id - self.SYNC_OVERLAP_IDS):
+            self._bloom.add(jti)
+            self._last_id = max(self._last_id, last_id)
+
+    def maybe_sync(self) -> None:
+        if time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        # 처음 한 번은 filter 가 만들어질 때까지 기다리고, 이후에는 다른 thread 가 sync 중이면 건너뛴다
+        if not self._lock.acquire(blocking=self._bloom is None):
+            return
+        try:
+            if time.monotonic() - self._synced_at < self.sync_interval:
+                return
+            if (
+                self._bloom is None
+                or self._bloom.saturated
+                or time.monotonic() - self._rebuilt_at >= self.rebuild_interval
+            ):
+                self._rebuild()
+            else:
+                self._sync()
+            self._synced_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, jti: str) -> bool:
+        self.maybe_sync()
+        if jti not in self._bloom:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(
+        self, jti: str, user_id: int, token_type: TokenType, expires_at: datetime
+    ) -> bool:
+        """
+        처음 폐기하면 True. 이미 폐기된 token 이면 False
+        """
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(
+                    jti=jti,
+                    user_id=user_id,
+                    token_type=token_type.value,
+                    expires_at=expires_at,
+                )
+        except IntegrityError:
+            return False
+        # 이 worker 에는 바로 반영하고, 다른 worker 는 다음 sync 때 반영
+        self.maybe_sync()
+        self._bloom.add(jti)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bloom, self._last_id = None, 0
+            self._synced_at = self._rebuilt_at = 0.0
+
+    @staticmethod
+    def purge() -> int:
+        deleted, _ = RevokedToken.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        return deleted
+
+
+token_revocation_list = TokenRevocationList(
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_ERROR_RATE,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL,
+    rebuild_interval=settings.TOKEN_REVOCATION_REBUILD_INTERVAL,
+)
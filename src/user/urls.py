@@ -1,12 +1,40 @@
+from typing import List
+
 from django.http import HttpRequest
 from ninja import Router
+from ninja.decorators import decorate_view
 
-from config.response import ErrorResponse, ObjectResponse, error_response, response
-from user.exceptions import UserNotFoundException
-from user.models import ServiceUser
-from user.request import UserLoginRequestBody
-from user.response import UserTokenResponse
-from user.authentication import authentication_service
+from config.ratelimit import rate_limit
+from config.response import (
+    ErrorResponse,
+    ObjectResponse,
+    OkResponse,
+    error_response,
+    response,
+)
+from user.campaign import points_campaign_service
+from user.exceptions import (
+    NotAuthorizedException,
+    PointsCampaignConflictException,
+    PointsCampaignNotFoundException,
+    UserNotFoundException,
+)
+from user.models import PointsCampaign, ServiceUser, TokenType
+from user.request import (
+    PointsCampaignRequestBody,
+    UserLoginRequestBody,
+    UserLogoutRequestBody,
+    UserTokenRefreshRequestBody,
+)
+from user.response import PointsCampaignResponse, UserTokenResponse
+from user.authentication import (
+    JWTPayload,
+    TokenAuthRequest,
+    TokenPair,
+    admin_auth,
+    authentication_service,
+    token_auth,
+)
 
 
 router = Router(tags=["Users"])
@@ -17,13 +45,94 @@ router = Router(tags=["Users"])
     response={
         200: ObjectResponse[UserTokenResponse],
         404: ObjectResponse[ErrorResponse],
+        429: ObjectResponse[ErrorResponse],
     },
 )
+@decorate_view(rate_limit(scope="user_login"))
 def user_login_handler(request: HttpRequest, body: UserLoginRequestBody):
     try:
         user = ServiceUser.objects.get(email=body.email)
     except ServiceUser.DoesNotExist:
         return 404, error_response(msg=UserNotFoundException.message)
-    return 200, response(
-        {"token": authentication_service.encode_token(user_id=user.id)}
-    )
+    return 200, response(authentication_service.issue_tokens(user_id=user.id))
+
+
+@router.post(
+    "/token/refresh",
+    response={
+        200: ObjectResponse[UserTokenResponse],
+        401: ObjectResponse[ErrorResponse],
+        429: ObjectResponse[ErrorResponse],
+    },
+)
+@decorate_view(rate_limit(scope="user_login"))
+def user_token_refresh_handler(request: HttpRequest, body: UserTokenRefreshRequestBody):
+    try:
+        tokens: TokenPair = authentication_service.refresh(
+            refresh_token=body.refresh_token
+        )
+    except NotAuthorizedException as e:
+        return 401, error_response(msg=e.message)
+    return 200, response(tokens)
+
+
+@router.post(
+    "/log-out",
+    response={
+        200: ObjectResponse[OkResponse],
+    },
+    auth=token_auth,
+)
+def user_logout_handler(request: TokenAuthRequest, body: UserLogoutRequestBody):
+    # access token 과 함께 보낸 refresh token 도 만료 전까지 사용할 수 없게 한다
+    payloads: List[JWTPayload] = [
+        authentication_service.decode_token(jwt_token=request.auth)
+    ]
+    if body.refresh_token:
+        try:
+            refresh: JWTPayload = authentication_service.decode_token(
+                jwt_token=body.refresh_token, token_type=TokenType.REFRESH
+            )
+        except NotAuthorizedException:
+            refresh = None
+        if refresh and refresh["user_id"] == request.user_id:
+            payloads.append(refresh)
+
+    for payload in payloads:
+        authentication_service.revoke(payload)
+    return 200, response(OkResponse())
+
+
+@router.post(
+    "/admin/campaigns",
+    response={
+        200: ObjectResponse[PointsCampaignResponse],
+        409: ObjectResponse[ErrorResponse],
+    },
+    auth=admin_auth,
+)
+def create_points_campaign_handler(
+    request: HttpRequest, body: PointsCampaignRequestBody
+):
+    # 지급은 run_points_campaign command 가 chunk 단위로 수행
+    try:
+        campaign: PointsCampaign = points_campaign_service.create_campaign(
+            code=body.code, points=body.points, user_ids=body.user_ids
+        )
+    except PointsCampaignConflictException as e:
+        return 409, error_response(msg=e.message)
+    return 200, response(campaign)
+
+
+@router.get(
+    "/admin/campaigns/{code}",
+    response={
+        200: ObjectResponse[PointsCampaignResponse],
+        404: ObjectResponse[ErrorResponse],
+    },
+    auth=admin_auth,
+)
+def points_campaign_detail_handler(request: HttpRequest, code: str):
+    if not (campaign := PointsCampaign.objects.filter(code=code).first()):
+        return 404, error_response(msg=PointsCampaignNotFoundException.message)
+    return 200, response(campaign)